@@ -50,6 +50,13 @@ class AxesFeatureBuilder:
             "dip_stat": dip_stat
         }
 
+    def windowed_metrics(self, df: pd.DataFrame, time_col: str, target_col: str,
+                         window, step=None) -> pd.DataFrame:
+        """A/B 지표를 슬라이딩/텀블링 창마다 계산한 시계열 (utils.windowed_axes)."""
+        from utils.windowed_axes import axes_timeseries
+        return axes_timeseries(df, window, step, time_col=time_col,
+                               target_col=target_col)
+
     def build(self, df: pd.DataFrame, time_col: str, target_col: str) -> Dict[str, float]:
         t = self.temporal_metrics(df, time_col, target_col)
         d = self.distributional_metrics(df[target_col])
@@ -62,11 +69,17 @@ if __name__ == "__main__":
     ap.add_argument("--time_col", default=None)
     ap.add_argument("--target_col", default=None)
     args = ap.parse_args()
-    df = pd.read_csv(args.data)
-    if not args.time_col:
-        args.time_col = df.columns[0]
-    if not args.target_col:
-        args.target_col = df.columns[-1]
+    import sys
+    from pathlib import Path
+    # 프로젝트 루트 경로 추가
+    sys.path.append(str(Path(__file__).parent.parent))
+    from utils.ingest_cache import dataset_columns, load_dataset
+    if not args.time_col or not args.target_col:
+        columns = dataset_columns(args.data)
+        args.time_col = args.time_col or columns[0]
+        args.target_col = args.target_col or columns[-1]
+    # 필요한 두 열만 읽는다 (Parquet 컬럼 프루닝)
+    df = load_dataset(args.data, columns=[args.time_col, args.target_col])
     fb = AxesFeatureBuilder()
     feats = fb.build(df, args.time_col, args.target_col)
     print(json.dumps(feats, indent=2)) 
\ No newline at end of file
@@ -4,6 +4,7 @@ CMI 대회 데이터 분석 스크립트
 데이터 구조, 결측값, 센서 종류 등을 분석하여 모델 개발 전략 수립
 """
 
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -11,6 +12,11 @@ import seaborn as sns
 from pathlib import Path
 import logging
 
+# 프로젝트 루트 경로 추가 (nebula-con/utils보다 먼저 찾도록 앞에 삽입)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.ingest_cache import dataset_columns, load_dataset  # noqa: E402
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,7 +46,7 @@ def analyze_cmi_dataset():
     if Path("train.csv").exists():
         print("\n🔍 train.csv 구조 분석:")
         try:
-            train_df = pd.read_csv("train.csv")
+            train_df = load_dataset("train.csv")
             print(f"✅ 데이터 로드 성공")
             print(f"📊 데이터 크기: {train_df.shape}")
             print(f"📋 컬럼 목록: {list(train_df.columns)}")
@@ -65,7 +71,7 @@ def analyze_cmi_dataset():
     if Path("train_demographics.csv").exists():
         print("\n🔍 train_demographics.csv 구조 분석:")
         try:
-            demo_df = pd.read_csv("train_demographics.csv")
+            demo_df = load_dataset("train_demographics.csv")
             print(f"✅ 데이터 로드 성공")
             print(f"📊 데이터 크기: {demo_df.shape}")
             print(f"📋 컬럼 목록: {list(demo_df.columns)}")
@@ -73,7 +79,7 @@ def analyze_cmi_dataset():
             # 인구통계학적 정보
             print(f"\n👥 인구통계학적 정보:")
             for col in demo_df.columns:
-                if demo_df[col].dtype == 'object':
+                if not pd.api.types.is_numeric_dtype(demo_df[col]):
                     print(f"  - {col}: {demo_df[col].value_counts().to_dict()}")
                 else:
                     print(f"  - {col}: {demo_df[col].describe().to_dict()}")
@@ -85,18 +91,19 @@ def analyze_cmi_dataset():
     if Path("test.csv").exists():
         print("\n🔍 test.csv 구조 분석:")
         try:
-            test_df = pd.read_csv("test.csv")
+            test_df = load_dataset("test.csv")
             print(f"✅ 데이터 로드 성공")
             print(f"📊 데이터 크기: {test_df.shape}")
             print(f"📋 컬럼 목록: {list(test_df.columns)}")
             
             # train과 test 비교
             if Path("train.csv").exists():
-                train_df = pd.read_csv("train.csv")
+                # train.csv를 다시 읽지 않고 캐시된 스키마만 조회
+                train_columns = dataset_columns("train.csv")
                 print(f"\n🔄 Train vs Test 비교:")
-                print(f"  - Train 컬럼 수: {len(train_df.columns)}")
+                print(f"  - Train 컬럼 수: {len(train_columns)}")
                 print(f"  - Test 컬럼 수: {len(test_df.columns)}")
-                print(f"  - 공통 컬럼: {len(set(train_df.columns) & set(test_df.columns))}")
+                print(f"  - 공통 컬럼: {len(set(train_columns) & set(test_df.columns))}")
                 
         except Exception as e:
             print(f"❌ test.csv 분석 실패: {str(e)}")
@@ -105,7 +112,7 @@ def analyze_cmi_dataset():
     if Path("sample_submission.csv").exists():
         print("\n🔍 sample_submission.csv 구조 분석:")
         try:
-            sub_df = pd.read_csv("sample_submission.csv")
+            sub_df = load_dataset("sample_submission.csv")
             print(f"✅ 데이터 로드 성공")
             print(f"📊 데이터 크기: {sub_df.shape}")
             print(f"📋 컬럼 목록: {list(sub_df.columns)}")
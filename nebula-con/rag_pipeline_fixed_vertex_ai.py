@@ -6,10 +6,17 @@ SCI 프리미엄 AI가 제시한 정확한 해결책으로 수정된 RAG 파이
 
 import json
 import logging
-from typing import Any, Dict, List
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
 from google.cloud import bigquery
 from google.api_core.exceptions import BadRequest
 
+# 프로젝트 루트 경로 추가 (nebula-con/utils보다 먼저 찾도록 앞에 삽입)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.context_budget import ContextAssembler  # noqa: E402
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,11 +25,27 @@ logger = logging.getLogger(__name__)
 class RAGPipelineFixedVertexAI:
     """SCI 프리미엄 AI 해결책으로 수정된 RAG 파이프라인"""
     
-    def __init__(self, project_id: str = 'persona-diary-service', 
-                 dataset_id: str = 'nebula_con_kaggle'):
-        """RAG 파이프라인 초기화"""
+    def __init__(self, project_id: str = 'persona-diary-service',
+                 dataset_id: str = 'nebula_con_kaggle',
+                 context_budget: int = 1024,
+                 generator=None):
+        """RAG 파이프라인 초기화
+
+        context_budget: 프롬프트 컨텍스트 토큰 예산
+        generator: ``stream(prompt)``을 가진 답변 생성기
+            (예: utils.generation.VertexGenerator). 없으면 BigQuery
+            ML.GENERATE_TEXT로 생성하며, 이 경로는 스트리밍할 수 없어
+            답변 전체가 한 조각으로 나온다.
+        """
         self.project_id = project_id
         self.dataset_id = dataset_id
+        self.generator = generator
+
+        # 검색 결과를 토큰 예산 안에서 다듬고 중복 제거해 프롬프트 구성
+        self.assembler = ContextAssembler(
+            budget_tokens=context_budget, score_key='similarity_score'
+        )
+        self.last_context_stats: Dict[str, Any] = {}
         
         # BigQuery 클라이언트 초기화
         self.bq_client = bigquery.Client(
@@ -164,30 +187,37 @@ class RAGPipelineFixedVertexAI:
             logger.error(f"텍스트 생성 실패: {e}")
             return f"텍스트 생성 중 오류 발생: {str(e)}"
     
+    def stream_text(self, prompt: str) -> Iterator[str]:
+        """생성기가 있으면 토큰 스트리밍, 없으면 ML.GENERATE_TEXT 결과 한 조각"""
+        if self.generator is not None:
+            yield from self.generator.stream(prompt)
+        else:
+            yield self.generate_text(prompt)
+
+    def stream_answer(self, query: str,
+                      search_results: List[Dict[str, Any]]) -> Iterator[str]:
+        """generate_answer의 스트리밍 버전 (대체 템플릿 답변 없음)"""
+        if not search_results:
+            yield f"죄송합니다. '{query}'에 대한 관련 정보를 찾을 수 없습니다."
+            return
+
+        prompt, self.last_context_stats = self.assembler.build_prompt(
+            query, search_results
+        )
+        yield from self.stream_text(prompt)
+
     def generate_answer(self, query: str, search_results: List[Dict[str, Any]]) -> str:
         """검색 결과를 바탕으로 AI 답변 생성"""
         if not search_results:
             return f"죄송합니다. '{query}'에 대한 관련 정보를 찾을 수 없습니다."
         
-        # 상위 결과를 바탕으로 프롬프트 구성
-        context = "\n".join([
-            f"제목: {result.get('title', 'N/A')}\n내용: {result.get('text', 'N/A')[:200]}..."
-            for result in search_results[:3]
-        ])
-        
-        prompt = f"""
-다음 정보를 바탕으로 질문에 답변해주세요:
-
-질문: {query}
-
-참고 정보:
-{context}
+        # 토큰 예산 안에서 결과를 다듬어 프롬프트 구성 (prompt_tokens 기록)
+        prompt, self.last_context_stats = self.assembler.build_prompt(
+            query, search_results
+        )
 
-위 정보를 바탕으로 정확하고 유용한 답변을 제공해주세요.
-"""
-        
         try:
-            answer = self.generate_text(prompt)
+            answer = "".join(self.stream_text(prompt))
             return answer
         except Exception as e:
             logger.error(f"AI 답변 생성 실패: {e}")
@@ -230,7 +260,9 @@ ML.GENERATE_EMBEDDING과 ML.GENERATE_TEXT를 사용하여 생성되었습니다.
                 'search_results': search_results,
                 'answer': answer,
                 'status': 'success',
-                'search_method': 'keyword_search_with_ai_generation'
+                'search_method': 'keyword_search_with_ai_generation',
+                'prompt_tokens': self.last_context_stats.get('prompt_tokens'),
+                'context_stats': self.last_context_stats
             }
             
             logger.info(f"✅ RAG 파이프라인 완료: {query}")
@@ -6,11 +6,25 @@ Grok의 최종 해결책 - NoneType 오류 100% 해결 + 사전 임베딩 계산
 
 import json
 import logging
+import sys
 import numpy as np
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 from google.cloud import bigquery
 from google.api_core.exceptions import BadRequest
 
+# 프로젝트 루트 경로 추가 (nebula-con/utils보다 먼저 찾도록 앞에 삽입)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.circuit_breaker import default_registry  # noqa: E402
+from utils.hedging import HedgedExecutor, hedge_cancelled, on_cancel  # noqa: E402
+from utils.metrics import (  # noqa: E402
+    BIGQUERY_BYTES_BILLED,
+    EMBEDDING_LATENCY,
+    REGISTRY,
+)
+from utils.tracing import span  # noqa: E402
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,13 +34,24 @@ class RAGPipelinePerfect:
     """BigQuery VECTOR_SEARCH를 사용하는 완벽한 RAG 파이프라인 - Grok 최종 해결책"""
     
     def __init__(self, bq_client: bigquery.Client, embedding_model_path: str, 
-                 dataset: str = 'your_dataset', table: str = 'hacker_news_with_emb'):
-        """RAG 파이프라인 초기화"""
+                 dataset: str = 'your_dataset', table: str = 'hacker_news_with_emb',
+                 hedge_delay_ms: Optional[float] = None):
+        """RAG 파이프라인 초기화 (hedge_delay_ms=None이면 백엔드 상태로 자동 결정)"""
         self.bq_client = bq_client
         self.embedding_model_path = embedding_model_path
         self.dataset = dataset
         self.table = table
         
+        # VECTOR_SEARCH가 지연/실패하면 키워드 검색을 병렬로 투입
+        # (차단기가 열려 있으면 즉시 거부되어 키워드 검색으로 직행)
+        self.retrieval = HedgedExecutor(
+            [('vector_search',
+              default_registry.wrap('bigquery.vector_search', self._vector_search)),
+             ('keyword_search', self._fallback_keyword_search)],
+            hedge_delay_ms=hedge_delay_ms
+        )
+        self.last_retrieval: Dict[str, Any] = {}
+
         logger.info(f"🚀 완벽한 RAG 파이프라인 초기화 완료: {dataset}.{table}")
     
     def generate_embedding(self, text: str) -> List[float]:
@@ -51,6 +76,7 @@ class RAGPipelinePerfect:
         try:
             logger.debug("Generating embedding for text: %s", text[:50])
             query_job = self.bq_client.query(query, job_config=job_config)
+            on_cancel(query_job.cancel)  # 헤징에서 지면 BigQuery 작업 취소
             results = query_job.result()
             
             for row in results:
@@ -67,11 +93,25 @@ class RAGPipelinePerfect:
             raise
     
     def search_similar_documents(self, query_text: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """VECTOR_SEARCH와 키워드 검색을 헤징 실행, 먼저 도착한 유효 결과 사용"""
+        results, info = self.retrieval.run(query_text, top_k, default=[])
+        self.last_retrieval = info
+        if info['winner']:
+            logger.info(
+                f"✅ 검색 완료 ({info['winner']}, {info['latency_ms']}ms): "
+                f"{len(results)}개 문서"
+            )
+        else:
+            logger.error(f"❌ 모든 검색 백엔드 실패: {info['errors']}")
+        return results
+
+    def _vector_search(self, query_text: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """VECTOR_SEARCH를 사용한 효율적인 유사 문서 검색 - None 오류 완전 방지"""
         try:
             # 1단계: 쿼리 임베딩 생성 (로깅 포함)
             logger.info("Starting embedding generation for query: %s", query_text[:50])
-            query_embedding = self.generate_embedding(query_text)
+            with span("embedding"), EMBEDDING_LATENCY.time(backend="bigquery_ml"):
+                query_embedding = self.generate_embedding(query_text)
             if query_embedding is None or not query_embedding:
                 raise ValueError("Query embedding is None or empty")
             
@@ -100,8 +140,18 @@ class RAGPipelinePerfect:
                 ]
             )
             
-            query_job = self.bq_client.query(search_query, job_config=job_config)
-            rows = list(query_job.result())
+            with span("vector_search", top_k=top_k) as stage:
+                query_job = self.bq_client.query(search_query, job_config=job_config)
+                on_cancel(query_job.cancel)
+                rows = list(query_job.result())
+                stage.set(
+                    rows_returned=len(rows),
+                    bytes_processed=query_job.total_bytes_processed or 0,
+                    bytes_billed=query_job.total_bytes_billed or 0
+                )
+                BIGQUERY_BYTES_BILLED.inc(
+                    query_job.total_bytes_billed or 0, stage="vector_search"
+                )
             logger.debug("Fetched %d raw rows from vector search", len(rows))
             
             # 3단계: 결과 포맷팅 (유사도 = 1 - 거리, None 명시적 체크)
@@ -124,8 +174,11 @@ class RAGPipelinePerfect:
             return scored_results
             
         except Exception as e:
+            if hedge_cancelled():
+                # 키워드 검색이 이겨 작업이 취소됨: 차단기에 실패로 기록하지 않음
+                return []
             logger.error("❌ 검색 실패: %s", str(e))
-            return self._fallback_keyword_search(query_text, top_k)
+            raise
     
     def _fallback_keyword_search(self, query_text: str, top_k: int) -> List[Dict[str, Any]]:
         """키워드 기반 대체 검색 - VECTOR_SEARCH 실패 시"""
@@ -144,8 +197,18 @@ class RAGPipelinePerfect:
             LIMIT {top_k * 2}
             """
             
-            result = self.bq_client.query(search_query)
-            rows = list(result.result())
+            with span("keyword_search", top_k=top_k) as stage:
+                result = self.bq_client.query(search_query)
+                on_cancel(result.cancel)
+                rows = list(result.result())
+                stage.set(
+                    rows_returned=len(rows),
+                    bytes_processed=result.total_bytes_processed or 0,
+                    bytes_billed=result.total_bytes_billed or 0
+                )
+                BIGQUERY_BYTES_BILLED.inc(
+                    result.total_bytes_billed or 0, stage="keyword_search"
+                )
             
             # 키워드 가중치로 점수 계산
             scored_results = []
@@ -174,7 +237,7 @@ class RAGPipelinePerfect:
             
         except Exception as e:
             logger.error(f"❌ 키워드 검색도 실패: {str(e)}")
-            return []
+            raise
     
     def calculate_cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """NumPy 기반 코사인 유사도 (대체 또는 테스트용)"""
@@ -225,7 +288,12 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
             logger.info(f"🔍 쿼리 처리 중: {query}")
             
             # 1. 유사 문서 검색
-            search_results = self.search_similar_documents(query, top_k)
+            with span("retrieval", top_k=top_k) as stage:
+                search_results = self.search_similar_documents(query, top_k)
+                stage.set(
+                    candidates_scored=len(search_results),
+                    backend=self.last_retrieval.get('winner') or 'none'
+                )
             
             if not search_results:
                 logger.warning("⚠️ 검색 결과 없음")
@@ -237,17 +305,16 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
                 }
             
             # 2. 답변 생성
-            answer = self.generate_answer_template(query, search_results)
+            with span("generation"):
+                answer = self.generate_answer_template(query, search_results)
             
             result = {
                 'query': query,
                 'search_results': search_results,
                 'answer': answer,
                 'status': 'success',
-                'search_method': (
-                    'vector_search' if len(search_results) > 0 and 
-                    'similarity_score' in search_results[0] else 'keyword_search'
-                )
+                'search_method': self.last_retrieval.get('winner'),
+                'retrieval_latency_ms': self.last_retrieval.get('latency_ms')
             }
             
             logger.info(f"✅ RAG 파이프라인 완료: {query}")
@@ -274,7 +341,8 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
             logger.info(f"🔍 테스트 쿼리 {i}/{len(test_queries)} 실행: {query}")
             
             try:
-                result = self.retrieve_and_generate(query)
+                with span("rag", query=query):
+                    result = self.retrieve_and_generate(query)
                 results.append(result)
                 
                 if result['status'] == 'success':
@@ -300,6 +368,8 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
             'total_queries': len(test_queries),
             'successful_queries': success_count,
             'success_rate': f"{success_count}/{len(test_queries)}",
+            'retrieval_stats': self.retrieval.stats(),
+            'circuit_breakers': default_registry.snapshot(),
             'results': results
         }
         
@@ -307,6 +377,7 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
         output_file = 'rag_pipeline_perfect_results.json'
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(summary, f, ensure_ascii=False, indent=2)
+        REGISTRY.write_textfile('rag_pipeline_perfect_metrics.prom')
         
         logger.info("✅ 완벽한 VECTOR_SEARCH 기반 RAG 파이프라인 실행 완료!")
         logger.info(f"성공: {success_count}/{len(test_queries)} 쿼리")
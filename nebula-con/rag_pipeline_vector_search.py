@@ -6,10 +6,24 @@ Grok이 제안한 최적의 해결책 - NoneType 오류 완전 해결
 
 import json
 import logging
-from typing import Any, Dict, List
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 from google.cloud import bigquery
 from google.api_core.exceptions import BadRequest
 
+# 프로젝트 루트 경로 추가 (nebula-con/utils보다 먼저 찾도록 앞에 삽입)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.circuit_breaker import default_registry  # noqa: E402
+from utils.hedging import HedgedExecutor, hedge_cancelled, on_cancel  # noqa: E402
+from utils.metrics import (  # noqa: E402
+    BIGQUERY_BYTES_BILLED,
+    EMBEDDING_LATENCY,
+    REGISTRY,
+)
+from utils.tracing import span  # noqa: E402
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,8 +33,9 @@ class RAGPipelineVectorSearch:
     """BigQuery VECTOR_SEARCH를 사용하는 RAG 파이프라인 - 
     Grok 최적화 버전"""
     
-    def __init__(self, project_id: str, dataset_id: str):
-        """RAG 파이프라인 초기화"""
+    def __init__(self, project_id: str, dataset_id: str,
+                 hedge_delay_ms: Optional[float] = None):
+        """RAG 파이프라인 초기화 (hedge_delay_ms=None이면 백엔드 상태로 자동 결정)"""
         self.project_id = project_id
         self.dataset_id = dataset_id
         
@@ -34,6 +49,16 @@ class RAGPipelineVectorSearch:
             f"{project_id}.{dataset_id}.embedding_model"
         )
         
+        # VECTOR_SEARCH가 지연/실패하면 키워드 검색을 병렬로 투입
+        # (차단기가 열려 있으면 즉시 거부되어 키워드 검색으로 직행)
+        self.retrieval = HedgedExecutor(
+            [('vector_search',
+              default_registry.wrap('bigquery.vector_search', self._vector_search)),
+             ('keyword_search', self._fallback_keyword_search)],
+            hedge_delay_ms=hedge_delay_ms
+        )
+        self.last_retrieval: Dict[str, Any] = {}
+
         logger.info(
             f"🚀 RAG 파이프라인 초기화 완료: {project_id}.{dataset_id}"
         )
@@ -59,6 +84,7 @@ class RAGPipelineVectorSearch:
         
         try:
             query_job = self.bq_client.query(query, job_config=job_config)
+            on_cancel(query_job.cancel)  # 헤징에서 지면 BigQuery 작업 취소
             results = query_job.result()
             
             for row in results:
@@ -77,10 +103,27 @@ class RAGPipelineVectorSearch:
     
     def search_similar_documents(self, query_text: str, top_k: int = 5, 
                                 table: str = 'hacker_news_with_emb') -> List[Dict[str, Any]]:
+        """VECTOR_SEARCH와 키워드 검색을 헤징 실행, 먼저 도착한 유효 결과 사용"""
+        results, info = self.retrieval.run(
+            query_text, top_k, table=table, default=[]
+        )
+        self.last_retrieval = info
+        if info['winner']:
+            logger.info(
+                f"✅ 검색 완료 ({info['winner']}, {info['latency_ms']}ms): "
+                f"{len(results)}개 문서"
+            )
+        else:
+            logger.error(f"❌ 모든 검색 백엔드 실패: {info['errors']}")
+        return results
+
+    def _vector_search(self, query_text: str, top_k: int = 5,
+                       table: str = 'hacker_news_with_emb') -> List[Dict[str, Any]]:
         """VECTOR_SEARCH를 사용한 효율적인 유사 문서 검색"""
         try:
             # 1. 쿼리 임베딩 생성 - 실패 시 에러 발생
-            query_embedding = self.generate_embedding(query_text)
+            with span("embedding"), EMBEDDING_LATENCY.time(backend="bigquery_ml"):
+                query_embedding = self.generate_embedding(query_text)
             if not query_embedding:
                 raise ValueError("Query embedding is empty")
             
@@ -110,8 +153,18 @@ class RAGPipelineVectorSearch:
                 ]
             )
             
-            result = self.bq_client.query(search_query, job_config=job_config)
-            rows = list(result.result())
+            with span("vector_search", top_k=top_k) as stage:
+                result = self.bq_client.query(search_query, job_config=job_config)
+                on_cancel(result.cancel)
+                rows = list(result.result())
+                stage.set(
+                    rows_returned=len(rows),
+                    bytes_processed=result.total_bytes_processed or 0,
+                    bytes_billed=result.total_bytes_billed or 0
+                )
+                BIGQUERY_BYTES_BILLED.inc(
+                    result.total_bytes_billed or 0, stage="vector_search"
+                )
             
             # 3. 결과 포맷팅 (유사도 = 1 - 거리)
             scored_results = []
@@ -132,12 +185,14 @@ class RAGPipelineVectorSearch:
             return scored_results
             
         except Exception as e:
+            if hedge_cancelled():
+                # 키워드 검색이 이겨 작업이 취소됨: 차단기에 실패로 기록하지 않음
+                return []
             logger.error(f"❌ VECTOR_SEARCH 검색 실패: {str(e)}")
-            logger.info("🔍 키워드 기반 대체 검색 실행...")
-            return self._fallback_keyword_search(query_text, top_k)
+            raise
     
-    def _fallback_keyword_search(self, query_text: str, 
-                                top_k: int = 5) -> List[Dict[str, Any]]:
+    def _fallback_keyword_search(self, query_text: str, top_k: int = 5,
+                                **_: Any) -> List[Dict[str, Any]]:
         """키워드 기반 대체 검색 - VECTOR_SEARCH 실패 시"""
         try:
             # 간단한 키워드 매칭
@@ -153,8 +208,18 @@ class RAGPipelineVectorSearch:
             LIMIT {top_k * 2}
             """
             
-            result = self.bq_client.query(search_query)
-            rows = list(result.result())
+            with span("keyword_search", top_k=top_k) as stage:
+                result = self.bq_client.query(search_query)
+                on_cancel(result.cancel)
+                rows = list(result.result())
+                stage.set(
+                    rows_returned=len(rows),
+                    bytes_processed=result.total_bytes_processed or 0,
+                    bytes_billed=result.total_bytes_billed or 0
+                )
+                BIGQUERY_BYTES_BILLED.inc(
+                    result.total_bytes_billed or 0, stage="keyword_search"
+                )
             
             # 키워드 가중치로 점수 계산
             scored_results = []
@@ -183,7 +248,7 @@ class RAGPipelineVectorSearch:
             
         except Exception as e:
             logger.error(f"❌ 키워드 검색도 실패: {str(e)}")
-            return []
+            raise
     
     def generate_answer_template(self, query: str, 
                                search_results: List[Dict[str, Any]]) -> str:
@@ -214,7 +279,12 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
             logger.info(f"🔍 쿼리 처리 중: {query}")
             
             # 1. 유사 문서 검색
-            search_results = self.search_similar_documents(query, top_k)
+            with span("retrieval", top_k=top_k) as stage:
+                search_results = self.search_similar_documents(query, top_k)
+                stage.set(
+                    candidates_scored=len(search_results),
+                    backend=self.last_retrieval.get('winner') or 'none'
+                )
             
             if not search_results:
                 logger.warning("⚠️ 검색 결과 없음")
@@ -226,17 +296,16 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
                 }
             
             # 2. 답변 생성
-            answer = self.generate_answer_template(query, search_results)
+            with span("generation"):
+                answer = self.generate_answer_template(query, search_results)
             
             result = {
                 'query': query,
                 'search_results': search_results,
                 'answer': answer,
                 'status': 'success',
-                'search_method': (
-                    'vector_search' if len(search_results) > 0 and 
-                    'similarity_score' in search_results[0] else 'keyword_search'
-                )
+                'search_method': self.last_retrieval.get('winner'),
+                'retrieval_latency_ms': self.last_retrieval.get('latency_ms')
             }
             
             logger.info(f"✅ RAG 파이프라인 완료: {query}")
@@ -263,7 +332,8 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
             logger.info(f"🔍 테스트 쿼리 {i}/{len(test_queries)} 실행: {query}")
             
             try:
-                result = self.retrieve_and_generate(query)
+                with span("rag", query=query):
+                    result = self.retrieve_and_generate(query)
                 results.append(result)
                 
                 if result['status'] == 'success':
@@ -289,6 +359,8 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
             'total_queries': len(test_queries),
             'successful_queries': success_count,
             'success_rate': f"{success_count}/{len(test_queries)}",
+            'retrieval_stats': self.retrieval.stats(),
+            'circuit_breakers': default_registry.snapshot(),
             'results': results
         }
         
@@ -296,6 +368,7 @@ ML.GENERATE_EMBEDDING과 VECTOR_SEARCH를 사용하여 생성되었습니다.
         output_file = 'rag_pipeline_vector_search_results.json'
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(summary, f, ensure_ascii=False, indent=2)
+        REGISTRY.write_textfile('rag_pipeline_vector_search_metrics.prom')
         
         logger.info("✅ VECTOR_SEARCH 기반 RAG 파이프라인 실행 완료!")
         logger.info(f"성공: {success_count}/{len(test_queries)} 쿼리")
@@ -6,28 +6,68 @@ BigQuery ML 우회하여 완전한 AI 기반 RAG 구현
 
 import json
 import logging
-from typing import Any, Dict, List
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
 import numpy as np
 from google.cloud import bigquery
 from google.cloud import aiplatform
-from vertexai.language_models import TextEmbeddingModel, TextGenerationModel
+from vertexai.language_models import TextEmbeddingModel
+
+# 프로젝트 루트 경로 추가 (nebula-con/utils보다 먼저 찾도록 앞에 삽입)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.context_budget import ContextAssembler  # noqa: E402
+from utils.generation import VertexGenerator  # noqa: E402
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# ContextAssembler.build_prompt에 넘기는 프롬프트 ({query}, {context})
+ANSWER_PROMPT_TEMPLATE = """
+다음 질문에 대해 제공된 컨텍스트를 바탕으로 정확하고 유용한 답변을 생성해주세요.
+
+질문: {query}
+
+컨텍스트:
+{context}
+
+요구사항:
+1. 컨텍스트의 정보를 바탕으로 답변하세요
+2. 구체적이고 실용적인 조언을 제공하세요
+3. 한국어로 답변하세요
+4. 답변 끝에 "이 답변은 Vertex AI의 text-embedding-004와 \
+gemini-1.5-flash-001 모델을 사용하여 생성되었습니다."라고 표시하세요
+
+답변:
+"""
+
 
 class RAGPipelineVertexAISDK:
     """Vertex AI Python SDK를 직접 사용하는 RAG 파이프라인"""
 
     def __init__(self, project_id: str = 'persona-diary-service',
                  dataset_id: str = 'nebula_con_kaggle',
-                 location: str = 'us-central1'):
-        """RAG 파이프라인 초기화"""
+                 location: str = 'us-central1',
+                 context_budget: int = 1024,
+                 generator=None):
+        """RAG 파이프라인 초기화
+
+        context_budget: 프롬프트 컨텍스트 토큰 예산
+        generator: ``stream(prompt)``을 가진 답변 생성기
+            (기본: gemini-1.5-flash-001 VertexGenerator, 토큰 스트리밍)
+        """
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.location = location
 
+        # 검색 결과를 토큰 예산 안에서 다듬고 중복 제거해 프롬프트 구성
+        self.assembler = ContextAssembler(
+            budget_tokens=context_budget, score_key='similarity_score'
+        )
+        self.last_context_stats: Dict[str, Any] = {}
+
         # BigQuery 클라이언트 초기화
         self.bq_client = bigquery.Client(
             project=project_id, location=location
@@ -38,7 +78,9 @@ class RAGPipelineVertexAISDK:
 
         # Vertex AI 모델 초기화
         self.embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-004")
-        self.generation_model = TextGenerationModel.from_pretrained("gemini-1.5-flash-001")
+        self.generator = generator or VertexGenerator(
+            model_name="gemini-1.5-flash-001", project=project_id, location=location
+        )
 
         logger.info(
             f"🚀 Vertex AI SDK RAG 파이프라인 초기화 완료: "
@@ -175,47 +217,28 @@ class RAGPipelineVertexAISDK:
             logger.error(f"❌ 유사도 검색 실패: {e}")
             return []
 
-    def generate_ai_answer(self, query: str, search_results: List[Dict[str, Any]]) -> str:
-        """AI 기반 답변 생성"""
-        try:
-            if not search_results:
-                return f"죄송합니다. '{query}'에 대한 관련 정보를 찾을 수 없습니다."
-            
-            # 컨텍스트 구성
-            context = ""
-            for i, doc in enumerate(search_results[:3]):  # 상위 3개 문서만 사용
-                context += f"문서 {i+1}:\n"
-                context += f"제목: {doc.get('title', 'N/A')}\n"
-                context += f"내용: {doc.get('text', 'N/A')[:300]}...\n"
-                context += f"유사도 점수: {doc.get('similarity_score', 0):.3f}\n\n"
-            
-            # 프롬프트 구성
-            prompt = f"""
-다음 질문에 대해 제공된 컨텍스트를 바탕으로 정확하고 유용한 답변을 생성해주세요.
-
-질문: {query}
+    def stream_ai_answer(self, query: str,
+                         search_results: List[Dict[str, Any]]) -> Iterator[str]:
+        """AI 답변을 생성되는 대로 조각 단위로 반환 (stream=True)"""
+        if not search_results:
+            yield f"죄송합니다. '{query}'에 대한 관련 정보를 찾을 수 없습니다."
+            return
 
-컨텍스트:
-{context}
+        # 토큰 예산 안에서 결과를 다듬어 프롬프트 구성 (prompt_tokens 기록)
+        prompt, self.last_context_stats = self.assembler.build_prompt(
+            query, search_results, template=ANSWER_PROMPT_TEMPLATE
+        )
 
-요구사항:
-1. 컨텍스트의 정보를 바탕으로 답변하세요
-2. 구체적이고 실용적인 조언을 제공하세요
-3. 한국어로 답변하세요
-4. 답변 끝에 "이 답변은 Vertex AI의 text-embedding-004와 gemini-1.5-flash-001 모델을 사용하여 생성되었습니다."라고 표시하세요
+        logger.info("🧠 AI 답변 생성 중 (스트리밍)...")
+        yield from self.generator.stream(prompt)
 
-답변:
-"""
-            
-            logger.info("🧠 AI 답변 생성 중...")
-            
-            # Vertex AI로 답변 생성
-            response = self.generation_model.predict(prompt)
-            answer = response.text
-            
+    def generate_ai_answer(self, query: str, search_results: List[Dict[str, Any]]) -> str:
+        """AI 기반 답변 생성 (stream_ai_answer 조각을 모아 반환)"""
+        try:
+            answer = "".join(self.stream_ai_answer(query, search_results))
             logger.info("✅ AI 답변 생성 완료")
             return answer
-            
+
         except Exception as e:
             logger.error(f"❌ AI 답변 생성 실패: {e}")
             return f"AI 답변 생성 중 오류가 발생했습니다: {str(e)}"
@@ -256,7 +279,9 @@ class RAGPipelineVertexAISDK:
                 'status': 'success',
                 'search_method': 'vertex_ai_embedding_similarity',
                 'location': self.location,
-                'models_used': ['text-embedding-004', 'gemini-1.5-flash-001']
+                'models_used': ['text-embedding-004', 'gemini-1.5-flash-001'],
+                'prompt_tokens': self.last_context_stats.get('prompt_tokens'),
+                'context_stats': self.last_context_stats
             }
             
             logger.info(f"✅ RAG 파이프라인 완료: {query}")
@@ -1,7 +1,10 @@
 
 import argparse
 import json
+import sys
 import time
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 from scipy.stats import ks_2samp
@@ -9,6 +12,11 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import f1_score
 from sklearn.model_selection import train_test_split
 
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from utils.ingest_cache import load_dataset  # noqa: E402
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--data", required=True)
@@ -17,13 +25,13 @@ def main():
     ap.add_argument("--out_retention", default="data/retention_metrics.json")
     args = ap.parse_args()
 
-    df = pd.read_csv(args.data)
+    df = load_dataset(args.data)
     # Separate features/target
     X_all = df.iloc[:, :-1]
     y = df.iloc[:, -1]
 
     # Convert target to numeric if needed while keeping it a Series
-    if y.dtype == "O":
+    if y.dtype == "O" or isinstance(y.dtype, pd.CategoricalDtype):
         try:
             y = pd.Series(pd.Categorical(y).codes, index=y.index)
         except Exception:
@@ -54,11 +62,11 @@ def main():
     # Retention metrics if shifted data provided
     if args.shifted_data:
         try:
-            df_shift = pd.read_csv(args.shifted_data)
+            df_shift = load_dataset(args.shifted_data)
             X_shift_all = df_shift.iloc[:, :-1]
             y_shift = df_shift.iloc[:, -1]
 
-            if y_shift.dtype == "O":
+            if y_shift.dtype == "O" or isinstance(y_shift.dtype, pd.CategoricalDtype):
                 try:
                     y_shift = pd.Series(
                         pd.Categorical(y_shift).codes, index=y_shift.index
@@ -0,0 +1,297 @@
+"""데이터셋 카탈로그 전체에 대해 profile + axes 지표를 병렬 계산합니다.
+
+카탈로그는 디렉터리(``*.csv``/``*.parquet``) 또는 매니페스트
+(``.json``: 경로 목록 또는 ``{"name", "path"}`` 목록, 그 외: 한 줄에 경로
+하나)입니다. 데이터셋마다 별도 프로세스에서 ``profile``/``compute_axes``를
+실행하며 ``--timeout``을 넘기면 해당 프로세스를 종료합니다. 결과는 파일
+내용 해시로 캐시되어 바뀌지 않은 데이터셋은 다시 계산하지 않고 (해시는
+적재 캐시의 크기/mtime 인덱스를 재사용해 바뀐 파일만 다시 읽음), 모든
+데이터셋의 axes 지표를 하나의 표(``axes_table.parquet``/``.json``)로
+저장해 데이터셋 간 비교에 씁니다::
+
+    python pipelines/catalog_runner.py --catalog data/raw --workers 4
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import sys
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pipelines.dataset_ingest import compute_axes, ingest_csv, profile  # noqa: E402
+from utils.ingest_cache import indexed_hash  # noqa: E402
+
+# compute_axes/profile 정의가 바뀌면 올려서 결과 캐시를 무효화
+CATALOG_VERSION = 1
+DATA_SUFFIXES = (".csv", ".parquet")
+
+
+def discover_datasets(catalog: str) -> List[Dict[str, str]]:
+    """
+    카탈로그(디렉터리 또는 매니페스트)의 데이터셋 목록.
+
+    Args:
+        catalog: 데이터 디렉터리 또는 매니페스트 파일 경로
+
+    Returns:
+        list: ``{"name", "path"}`` 목록 (디렉터리는 이름순)
+    """
+    root = Path(catalog)
+    if root.is_dir():
+        paths = sorted(p for p in root.rglob("*") if p.suffix in DATA_SUFFIXES)
+        return [{"name": str(p.relative_to(root)), "path": str(p)} for p in paths]
+
+    if root.suffix == ".json":
+        with open(root, encoding="utf-8") as f:
+            entries = json.load(f)
+    else:
+        entries = [
+            line.strip()
+            for line in root.read_text(encoding="utf-8").splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+    datasets = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"path": entry}
+        path = Path(entry["path"])
+        # 상대 경로는 매니페스트 위치 기준
+        if not path.is_absolute():
+            path = root.parent / path
+        datasets.append({"name": entry.get("name", path.name), "path": str(path)})
+    return datasets
+
+
+def process_dataset(path: str) -> Dict[str, Any]:
+    """데이터셋 하나의 profile과 axes 지표."""
+    start = time.perf_counter()
+    df = ingest_csv(path)
+    prof = profile(df, path=path)
+    axes = compute_axes(df)
+    return {
+        "profile": prof,
+        "axes": axes,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _worker(path: str, conn) -> None:
+    try:
+        conn.send(("ok", process_dataset(path)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _cache_path(cache_dir: Path, digest: str) -> Path:
+    return cache_dir / f"{digest}.v{CATALOG_VERSION}.json"
+
+
+def _run_isolated(
+    todo: List[Dict[str, Any]], workers: int, timeout: Optional[float]
+) -> Dict[str, Dict[str, Any]]:
+    """데이터셋별 프로세스를 최대 ``workers``개 동시 실행 (시간 초과 시 종료)."""
+    ctx = multiprocessing.get_context()
+    pending = deque(todo)
+    running: Dict[Any, Dict[str, Any]] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+
+    while pending or running:
+        while pending and len(running) < workers:
+            item = pending.popleft()
+            recv, send = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_worker, args=(item["path"], send), daemon=True)
+            proc.start()
+            send.close()
+            running[recv] = {"item": item, "proc": proc, "start": time.monotonic()}
+
+        for conn in wait(list(running), timeout=0.1):
+            job = running.pop(conn)
+            try:
+                status, payload = conn.recv()
+            except EOFError:
+                job["proc"].join()
+                status = "error"
+                payload = f"worker exited with code {job['proc'].exitcode}"
+            conn.close()
+            job["proc"].join()
+            results[job["item"]["hash"]] = (
+                {"status": "ok", **payload}
+                if status == "ok"
+                else {"status": "error", "error": payload}
+            )
+
+        if timeout is None:
+            continue
+        now = time.monotonic()
+        for conn, job in list(running.items()):
+            if now - job["start"] > timeout:
+                job["proc"].terminate()
+                job["proc"].join()
+                conn.close()
+                del running[conn]
+                results[job["item"]["hash"]] = {
+                    "status": "timeout",
+                    "error": f"exceeded {timeout}s",
+                }
+    return results
+
+
+def run_catalog(
+    datasets: List[Dict[str, str]],
+    cache_dir: str = "metrics/catalog/cache",
+    workers: int = 2,
+    timeout: Optional[float] = 600.0,
+    use_cache: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    카탈로그의 모든 데이터셋에 대해 profile/axes를 계산합니다.
+
+    Args:
+        datasets: ``discover_datasets`` 결과
+        cache_dir: 내용 해시별 결과 캐시 디렉터리
+        workers: 동시 실행 프로세스 수 (0이면 현재 프로세스에서 순차, 시간 제한 없음)
+        timeout: 데이터셋당 제한 시간(초), None이면 무제한
+        use_cache: False면 캐시를 무시하고 모두 다시 계산
+
+    Returns:
+        list: 데이터셋별 ``name/path/hash/status`` 와 profile, axes 결과
+    """
+    cache = Path(cache_dir)
+    cache.mkdir(parents=True, exist_ok=True)
+
+    entries, todo = [], []
+    for dataset in datasets:
+        # 크기/mtime이 그대로인 파일은 적재 캐시 인덱스의 해시를 재사용
+        entry = {**dataset, "hash": indexed_hash(dataset["path"])}
+        cached = _cache_path(cache, entry["hash"])
+        if use_cache and cached.exists():
+            with open(cached, encoding="utf-8") as f:
+                entry.update(json.load(f), status="cached")
+        elif all(e["hash"] != entry["hash"] for e in todo):
+            todo.append(entry)
+        entries.append(entry)
+
+    if workers and workers > 0:
+        results = _run_isolated(todo, workers, timeout)
+    else:
+        results = {}
+        for item in todo:
+            try:
+                results[item["hash"]] = {
+                    "status": "ok",
+                    **process_dataset(item["path"]),
+                }
+            except Exception as e:
+                results[item["hash"]] = {
+                    "status": "error",
+                    "error": f"{type(e).__name__}: {e}",
+                }
+
+    for digest, result in results.items():
+        if result["status"] == "ok":
+            with open(_cache_path(cache, digest), "w", encoding="utf-8") as f:
+                json.dump(_jsonable(result), f, indent=2)
+    for entry in entries:
+        if entry.get("status") != "cached":
+            entry.update(results[entry["hash"]])
+    return entries
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item"):
+        return _jsonable(value.item())
+    return value
+
+
+def axes_table(entries: List[Dict[str, Any]]) -> pd.DataFrame:
+    """데이터셋당 한 행: 식별 정보, 크기, 상태와 axes 지표 열."""
+    rows = []
+    for entry in entries:
+        prof = entry.get("profile") or {}
+        rows.append(
+            {
+                "name": entry["name"],
+                "path": entry["path"],
+                "hash": entry["hash"],
+                "status": entry["status"],
+                "error": entry.get("error"),
+                "rows": prof.get("rows"),
+                "cols": prof.get("cols"),
+                "seconds": entry.get("seconds"),
+                **(entry.get("axes") or {}),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def write_table(table: pd.DataFrame, out_dir: str) -> Dict[str, str]:
+    """표를 Parquet과 JSON(레코드 목록)으로 저장합니다."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = {
+        "parquet": str(out / "axes_table.parquet"),
+        "json": str(out / "axes_table.json"),
+    }
+    table.to_parquet(paths["parquet"], index=False)
+    with open(paths["json"], "w", encoding="utf-8") as f:
+        json.dump(_jsonable(table.to_dict(orient="records")), f, indent=2)
+    return paths
+
+
+def main(argv=None):
+    """카탈로그를 병렬 처리하고 통합 axes 표를 저장합니다."""
+    ap = argparse.ArgumentParser(
+        description="Compute profile and axes metrics for every dataset in a catalog."
+    )
+    ap.add_argument(
+        "--catalog", required=True, help="Dataset directory or manifest file."
+    )
+    ap.add_argument(
+        "--out_dir", default="metrics/catalog", help="Output directory for the table."
+    )
+    ap.add_argument(
+        "--workers", type=int, default=2, help="Concurrent worker processes."
+    )
+    ap.add_argument(
+        "--timeout", type=float, default=600.0, help="Per-dataset timeout (seconds)."
+    )
+    ap.add_argument("--no_cache", action="store_true", help="Recompute every dataset.")
+    args = ap.parse_args(argv)
+
+    datasets = discover_datasets(args.catalog)
+    print(f"🚀 카탈로그 처리 시작: {len(datasets)}개 데이터셋")
+    entries = run_catalog(
+        datasets,
+        cache_dir=str(Path(args.out_dir) / "cache"),
+        workers=args.workers,
+        timeout=args.timeout,
+        use_cache=not args.no_cache,
+    )
+    table = axes_table(entries)
+    paths = write_table(table, args.out_dir)
+    counts = table["status"].value_counts().to_dict()
+    print(f"✅ 처리 결과: {counts}")
+    print(f"✅ 통합 axes 표 저장 완료: {paths['parquet']}, {paths['json']}")
+    return table
+
+
+if __name__ == "__main__":
+    main()
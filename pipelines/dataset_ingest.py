@@ -1,167 +1,113 @@
-<<<<<<< HEAD
-import pandas as pd
-import json
-import hashlib
-import time
-import argparse
-=======
 import argparse
 import hashlib
 import json
+import sys
 import time
->>>>>>> 96f5cd1 (fix: Resolve all remaining merge conflicts (ci.yml, run_baseline.py, dataset_ingest.py, requirements.txt, utils, tests))
 from pathlib import Path
-import sys
-
-# axes 모듈이 sys.path에 추가되어야 임포트 가능
-sys.path.append('.')
-from axes.feature_builder import compute_axes # axes 모듈에서 compute_axes 임포트
+from typing import Optional
 
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
 
-from utils.dip import approximate_dip
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.axes_cache import cached_axes  # noqa: E402
+from utils.density import density_metrics  # noqa: E402
+from utils.dip import dip_columns, dip_test  # noqa: E402
+from utils.grouped_axes import grouped_axes  # noqa: E402
+from utils.ingest_cache import load_dataset  # noqa: E402
+from utils.profiling import head_hash, profile_file  # noqa: E402
+from utils.psi import (  # noqa: E402
+    batch_psi,
+    half_split_pairs,
+    population_stability_index,
+)
+from utils.windowed_axes import axes_timeseries  # noqa: E402
 
 
-def ingest_csv(path: str) -> pd.DataFrame:
-    """CSV 파일을 읽어 DataFrame으로 반환합니다."""
-    return pd.read_csv(path)
+def ingest_csv(path: str, use_cache: bool = True) -> pd.DataFrame:
+    """CSV 파일을 읽어 DataFrame으로 반환합니다 (Parquet 적재 캐시 경유)."""
+    return load_dataset(path, use_cache=use_cache)
 
 
-def profile(df: pd.DataFrame) -> dict:
-    """DataFrame의 기본 통계 프로파일을 생성합니다."""
+def profile(df: pd.DataFrame, path: Optional[str] = None) -> dict:
+    """DataFrame의 기본 통계 프로파일을 생성합니다.
+
+    ``path``를 주면 ``hash_head100``은 적재 캐시의 dtype(float32, datetime)과
+    무관하게 원본 파일 앞부분에서 계산합니다 (``--streaming`` 경로와 동일).
+    """
+    if path is not None:
+        hash_head100 = head_hash(path)
+    else:
+        hash_head100 = hashlib.md5(str(df.head(100).to_dict()).encode()).hexdigest()
     return {
         "rows": int(len(df)),
         "cols": int(df.shape[1]),
         "null_pct": df.isna().mean().round(4).to_dict(),
         "numeric_desc": df.describe(include="number").round(4).to_dict(),
-        "hash_head100": hashlib.md5(str(df.head(100).to_dict()).encode()).hexdigest(),
+        "hash_head100": hash_head100,
     }
 
 
-def population_stability_index(expected, actual, bins=10, min_samples=50):
-    """Calculate Population Stability Index (PSI) between two distributions."""
-    expected = np.array(expected, dtype=float)
-    actual = np.array(actual, dtype=float)
-
-    expected = expected[~np.isnan(expected)]
-    actual = actual[~np.isnan(actual)]
-
-    if len(expected) < min_samples or len(actual) < min_samples:
-        return 0.0
-
-    if np.array_equal(expected, actual):
-        return 0.0
-
-    global_min = min(np.min(expected), np.min(actual))
-    global_max = max(np.max(expected), np.max(actual))
-
-    if global_min == global_max:
-        return 0.0
-
-    epsilon = 1e-10
-    bin_edges = np.linspace(global_min - epsilon, global_max + epsilon, bins + 1)
-
-    expected_hist, _ = np.histogram(expected, bins=bin_edges)
-    actual_hist, _ = np.histogram(actual, bins=bin_edges)
-
-    expected_hist = expected_hist.astype(float) + 1e-10
-    actual_hist = actual_hist.astype(float) + 1e-10
-
-    expected_p = expected_hist / np.sum(expected_hist)
-    actual_p = actual_hist / np.sum(actual_hist)
-
-    psi = 0.0
-    for i in range(len(expected_p)):
-        if expected_p[i] > 0 and actual_p[i] > 0:
-            psi += (actual_p[i] - expected_p[i]) * np.log(actual_p[i] / expected_p[i])
-
-    return float(psi)
-
-
 def compute_density_metrics(
     X: np.ndarray, k_range=range(2, 6), min_samples=40, random_state=42
 ):
-    """Compute semantic density metrics for clustering analysis."""
-    if X is None or len(X.shape) != 2:
-        return None, None, None
-    n, d = X.shape
-    if n < min_samples or d < 2:
-        return None, None, None
-
-    mask = ~np.isnan(X).any(axis=1)
-    Xc = X[mask]
-    if len(Xc) < min_samples:
+    """Compute semantic density metrics for clustering analysis.
+
+    Rows are sampled down to a fixed budget and clustered with warm-started
+    MiniBatchKMeans (see ``utils.density``), so the cost does not grow with
+    the dataset. Returns ``(intra_cluster_density, silhouette_approx, k)``.
+    """
+    metrics = density_metrics(
+        X, k_range=k_range, min_samples=min_samples, random_state=random_state
+    )
+    if metrics is None:
         return None, None, None
+    return (
+        metrics["intra_cluster_density"],
+        metrics["silhouette_approx"],
+        metrics["density_k"],
+    )
 
-    scaler = StandardScaler()
-    Xs = scaler.fit_transform(Xc)
-
-    best_score = -1
-    best_k = None
-    best_intra = None
-    # best_inter = None  # 미사용 변수
-
-    global_center = Xs.mean(axis=0)
-    global_mean_center_dist = np.mean(np.linalg.norm(Xs - global_center, axis=1))
-    global_ref = 2 * global_mean_center_dist
-
-    for k in k_range:
-        try:
-            km = KMeans(n_clusters=k, n_init=10, random_state=random_state)
-            labels = km.fit_predict(Xs)
-            centers = km.cluster_centers_
-        except Exception:
-            continue
-
-        dist_to_center = np.linalg.norm(Xs - centers[labels], axis=1)
-        intra = 2 * np.mean(dist_to_center)
-
-        if k > 1:
-            dists = []
-            for i in range(k):
-                for j in range(i + 1, k):
-                    dists.append(np.linalg.norm(centers[i] - centers[j]))
-            inter = np.mean(dists) if dists else None
-        else:
-            inter = None
-
-        if inter is not None and inter > 1e-9 and inter > intra:
-            sil_approx = (inter - intra) / (inter + 1e-9)
-        else:
-            sil_approx = 0.0
-
-        if sil_approx > best_score:
-            best_score = sil_approx
-            best_k = k
-            best_intra = intra
-            # best_inter = inter  # 미사용 변수
 
-    if best_k is None or best_intra is None:
-        return None, None, None
+def _is_text(series: pd.Series) -> bool:
+    """object 또는 문자열 dtype 여부."""
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
 
-    intra_density = best_intra / (global_ref + 1e-9)
 
-    return float(intra_density), float(best_score), int(best_k)
+def compute_axes(
+    df: pd.DataFrame,
+    group_col=None,
+    workers: Optional[int] = None,
+    density: bool = False,
+):
+    """Compute all 4 axes metrics (A/B/C/D).
 
+    With ``group_col`` every entity/sequence is treated as its own series
+    and a DataFrame with one row of metrics per group is returned (see
+    ``utils.grouped_axes``); ``workers`` sizes the process pool used for
+    the per-group dip/density part (default: CPU count) and ``density``
+    opts in to the per-group C-axis clustering.
+    """
+    if group_col is not None:
+        return grouped_axes(df, group_col, workers=workers, density=density)
 
-def compute_axes(df: pd.DataFrame) -> dict:
-    """Compute all 4 axes metrics (A/B/C/D)."""
     # Handle timestamp and target columns
     time_col = df.columns[0]  # First column as timestamp
     target_col = df.columns[-1]  # Last column as target
 
-    # Convert timestamp if needed
-    if df[time_col].dtype == "O":
+    # Convert timestamp if needed (적재 캐시를 거치면 이미 datetime)
+    if _is_text(df[time_col]):
         try:
             df[time_col] = pd.to_datetime(df[time_col])
         except Exception:
             pass
 
     # Convert target to numeric if possible
-    if df[target_col].dtype == "O":
+    if _is_text(df[target_col]) or isinstance(
+        df[target_col].dtype, pd.CategoricalDtype
+    ):
         try:
             df[target_col] = pd.Categorical(df[target_col]).codes
         except Exception:
@@ -169,13 +115,21 @@ def compute_axes(df: pd.DataFrame) -> dict:
             if len(numeric_cols) > 0:
                 target_col = numeric_cols[-1]
 
-    s = df.sort_values(time_col)[target_col].astype(float)
+    ordered = df.sort_values(time_col, kind="stable")
+    s = ordered[target_col].astype(float)
+    # 타깃을 제외한 수치 피처 행렬 (시간순)
+    features = (
+        ordered.select_dtypes(include=[np.number])
+        .drop(columns=[target_col], errors="ignore")
+        .to_numpy(dtype=np.float64, na_value=np.nan)
+    )
 
     # A-axis: Temporal Stability
     if len(s) < 30:
         st_var_ratio = np.nan
         seasonal_corr = np.nan
         psi_trigger_rate = np.nan
+        psi_feature_max = np.nan
     else:
         global_var = float(s.var())
         win = min(24, max(5, len(s) // 10))
@@ -193,8 +147,14 @@ def compute_axes(df: pd.DataFrame) -> dict:
             psi_trigger_rate = population_stability_index(
                 baseline, current, bins=10, min_samples=50
             )
+            # 전체 수치 피처 PSI를 한 번의 스캔으로 (공유 분위수 구간)
+            feature_psi = batch_psi(
+                features, half_split_pairs(n), bins=10, min_samples=50
+            )
+            psi_feature_max = float(feature_psi.max()) if feature_psi.size else 0.0
         else:
             psi_trigger_rate = 0.0
+            psi_feature_max = 0.0
 
     # B-axis: Distributional Shape
     s_clean = s.astype(float).dropna()
@@ -206,11 +166,22 @@ def compute_axes(df: pd.DataFrame) -> dict:
     outlier_ratio = float(
         ((s_clean < q1 - 1.5 * iqr) | (s_clean > q3 + 1.5 * iqr)).mean()
     )
-    dip_stat = approximate_dip(s_clean.values)  # Hartigan dip test implemented
+    # Hartigan dip test (exact GCM/LCM) for the target and every feature
+    if len(s_clean) >= 40:
+        dip = dip_test(s_clean.values)
+        dip_stat, dip_pvalue = dip["dip"], dip["p_value"]
+    else:
+        dip_stat, dip_pvalue = None, None
+    # 고유값이 3개 미만인 열(이진 플래그 등)은 dip이 NaN이라 제외
+    feature_dips = dip_columns(features)
+    feature_dips = feature_dips["dip"][feature_dips["n"] >= 40]
+    feature_dips = feature_dips[~np.isnan(feature_dips)]
+    dip_feature_max = float(feature_dips.max()) if feature_dips.size else None
 
     # C-axis: Semantic Density
     try:
-        num_df = df.select_dtypes(include=["int64", "float64", "float32"])
+        # 적재 캐시가 정수/실수를 축소하므로 모든 수치 dtype 포함
+        num_df = df.select_dtypes(include=[np.number])
         drop_cols = []
         for c in num_df.columns:
             if c.lower().startswith("time") or c.lower().endswith("stamp"):
@@ -229,62 +200,159 @@ def compute_axes(df: pd.DataFrame) -> dict:
             float(seasonal_corr) if seasonal_corr is not None else np.nan
         ),
         "psi_trigger_rate": psi_trigger_rate,
+        "psi_feature_max": psi_feature_max,
         "sk_k_score": sk_k_score,
         "outlier_ratio": outlier_ratio,
         "dip_stat": dip_stat,
+        "dip_pvalue": dip_pvalue,
+        "dip_feature_max": dip_feature_max,
         "intra_cluster_density": intra_density,
         "silhouette_approx": sil_approx,
         "density_k": k_used,
     }
 
 
-def main():
-<<<<<<< HEAD
+def _window_arg(value):
+    """정수면 행 수, 아니면 시간 간격 문자열 ("1D", "30min")."""
+    if value is None:
+        return None
+    return int(value) if str(value).isdigit() else value
+
+
+def main(argv=None):
     """데이터셋을 수집하고 프로파일 및 axes 지표를 생성합니다."""
-    ap = argparse.ArgumentParser(description="Ingest CSV data and generate dataset profile and axes metrics.")
+    ap = argparse.ArgumentParser(
+        description="Ingest CSV data and generate dataset profile and axes metrics."
+    )
     ap.add_argument("--input", required=True, help="Input CSV file path.")
-    ap.add_argument("--out_profile", default="metrics/dataset_profile.json", help="Output path for dataset profile JSON.")
-    ap.add_argument("--out_axes", default="metrics/axes_metrics.json", help="Output path for axes metrics JSON.")
-    args = ap.parse_args()
+    ap.add_argument(
+        "--out_profile",
+        default="metrics/dataset_profile.json",
+        help="Output path for dataset profile JSON.",
+    )
+    ap.add_argument(
+        "--out_axes",
+        default="metrics/axes_metrics.json",
+        help="Output path for axes metrics JSON.",
+    )
+    ap.add_argument(
+        "--window",
+        help="Also write an axes time series over windows (rows, or e.g. 1D).",
+    )
+    ap.add_argument(
+        "--step", help="Window offset (default: window, i.e. tumbling windows)."
+    )
+    ap.add_argument(
+        "--out_axes_ts",
+        default="metrics/axes_timeseries.json",
+        help="Output path for the windowed axes time series JSON.",
+    )
+    ap.add_argument(
+        "--group_col",
+        help="Also write axes metrics per entity/sequence of this column.",
+    )
+    ap.add_argument(
+        "--out_axes_groups",
+        default="metrics/axes_groups.json",
+        help="Output path for the per-group axes metrics JSON.",
+    )
+    ap.add_argument(
+        "--axes_cache",
+        action="store_true",
+        help="Reuse cached axes metrics whose input columns are unchanged.",
+    )
+    ap.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Parse the CSV directly instead of via the Parquet ingest cache.",
+    )
+    ap.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Profile the file in chunks (bounded memory, sketch quartiles).",
+    )
+    ap.add_argument(
+        "--batch_rows", type=int, default=100_000, help="Rows per streamed chunk."
+    )
+    ap.add_argument(
+        "--group_density",
+        action="store_true",
+        help="Also compute the C-axis clustering per group (slow for many groups).",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=(
+            "Process pool size for streamed chunk summaries (default: in-process) "
+            "and grouped axes (default: CPU count)."
+        ),
+    )
+    ap.add_argument(
+        "--profile_only",
+        action="store_true",
+        help="Skip axes metrics (no full in-memory load with --streaming).",
+    )
+    args = ap.parse_args(argv)
 
     print(f"🚀 데이터 수집 시작: {args.input}")
-    df = ingest_csv(args.input)
-    print(f"✅ 데이터 로딩 완료. {len(df)} 행, {df.shape[1]} 열.")
+    df = None
+    if not (args.streaming and args.profile_only):
+        df = ingest_csv(args.input, use_cache=not args.no_cache)
+        print(f"✅ 데이터 로딩 완료. {len(df)} 행, {df.shape[1]} 열.")
 
     # 1. 데이터 프로파일 생성 및 저장
-=======
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--input", required=True)
-    ap.add_argument("--out_profile", default="data/dataset_profile.json")
-    ap.add_argument("--out_axes", default="data/axes_metrics.json")
-    args = ap.parse_args()
-
-    df = ingest_csv(args.input)
-
-    # Generate profile
->>>>>>> 96f5cd1 (fix: Resolve all remaining merge conflicts (ci.yml, run_baseline.py, dataset_ingest.py, requirements.txt, utils, tests))
-    prof = {"generated_at": time.time(), **profile(df)}
+    if args.streaming:
+        prof_body = profile_file(
+            args.input, batch_rows=args.batch_rows, workers=args.workers or 0
+        )
+    else:
+        prof_body = profile(df, path=args.input)
+    prof = {"generated_at": time.time(), **prof_body}
     Path(args.out_profile).parent.mkdir(parents=True, exist_ok=True)
     with open(args.out_profile, "w", encoding="utf-8") as f:
         json.dump(prof, f, indent=2)
     print(f"✅ 데이터 프로파일 저장 완료: {args.out_profile}")
+    if args.profile_only:
+        return prof
 
     # 2. Axes 지표 생성 및 저장
     print("🧠 Axes 지표 계산 시작...")
-    axes_metrics = compute_axes(df) 
+    if args.axes_cache:
+        axes_metrics, report = cached_axes(df, str(Path(args.input).resolve()))
+        print(
+            f"♻️ 재사용 {len(report['reused'])}, 증분 {len(report['incremental'])}, "
+            f"재계산 {len(report['recomputed'])}"
+        )
+    else:
+        axes_metrics = compute_axes(df)
     axes_output = {"generated_at": time.time(), **axes_metrics}
     Path(args.out_axes).parent.mkdir(parents=True, exist_ok=True)
     with open(args.out_axes, "w", encoding="utf-8") as f:
         json.dump(axes_output, f, indent=2)
     print(f"✅ Axes 지표 저장 완료: {args.out_axes}")
 
-    print("🎉 데이터 수집 및 분석 파이프라인 완료!")
+    # 3. (선택) 창별 axes 시계열
+    if args.window:
+        series = axes_timeseries(df, _window_arg(args.window), _window_arg(args.step))
+        Path(args.out_axes_ts).parent.mkdir(parents=True, exist_ok=True)
+        series.to_json(args.out_axes_ts, orient="records", date_format="iso", indent=2)
+        print(f"✅ Axes 시계열 저장 완료: {args.out_axes_ts} ({len(series)}개 창)")
+
+    # 4. (선택) 그룹(개체/시퀀스)별 axes 지표
+    if args.group_col:
+        groups = compute_axes(
+            df,
+            group_col=args.group_col,
+            workers=args.workers,
+            density=args.group_density,
+        )
+        Path(args.out_axes_groups).parent.mkdir(parents=True, exist_ok=True)
+        groups.reset_index().to_json(args.out_axes_groups, orient="records", indent=2)
+        print(f"✅ 그룹별 Axes 지표 저장 완료: {args.out_axes_groups}")
 
-    # Generate axes metrics
-    axes = compute_axes(df)
-    with open(args.out_axes, "w", encoding="utf-8") as f:
-        json.dump(axes, f, indent=2)
-    print("AXES_SAVED", args.out_axes)
+    print("🎉 데이터 수집 및 분석 파이프라인 완료!")
+    return axes_output
 
 
 if __name__ == "__main__":
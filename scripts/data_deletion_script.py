@@ -18,8 +18,7 @@ import logging
 import hashlib
 import subprocess
 from datetime import datetime, timedelta
-from typing import Dict, List, Bool
-import psutil
+from typing import Dict, List
 
 # 로깅 설정
 logging.basicConfig(
@@ -72,7 +71,7 @@ class ENODataDeletionManager:
             }
         }
     
-    def secure_memory_clear(self, data_obj) -> Bool:
+    def secure_memory_clear(self, data_obj) -> bool:
         """메모리 안전 삭제"""
         try:
             if data_obj is not None:
@@ -96,7 +95,7 @@ class ENODataDeletionManager:
             logger.error(f"메모리 삭제 실패: {e}")
             return False
     
-    def secure_file_delete(self, file_path: str) -> Bool:
+    def secure_file_delete(self, file_path: str) -> bool:
         """파일 안전 삭제"""
         try:
             if not os.path.exists(file_path):
@@ -131,7 +130,7 @@ class ENODataDeletionManager:
             logger.error(f"파일 삭제 실패 {file_path}: {e}")
             return False
     
-    def database_purge(self, db_path: str, retention_hours: int = 24) -> Bool:
+    def database_purge(self, db_path: str, retention_hours: int = 24) -> bool:
         """데이터베이스 만료 데이터 퍼지"""
         try:
             with sqlite3.connect(db_path) as conn:
@@ -169,7 +168,7 @@ class ENODataDeletionManager:
             logger.error(f"데이터베이스 퍼지 실패: {e}")
             return False
     
-    def anonymize_logs(self, db_path: str, anonymize_days: int = 30) -> Bool:
+    def anonymize_logs(self, db_path: str, anonymize_days: int = 30) -> bool:
         """로그 데이터 익명화"""
         try:
             with sqlite3.connect(db_path) as conn:
@@ -216,7 +215,7 @@ class ENODataDeletionManager:
             logger.error(f"로그 익명화 실패: {e}")
             return False
     
-    def immediate_session_cleanup(self, session_id: str) -> Bool:
+    def immediate_session_cleanup(self, session_id: str) -> bool:
         """세션 종료 시 즉시 삭제"""
         try:
             deletion_event = {
@@ -280,12 +279,12 @@ class ENODataDeletionManager:
         
         return temp_files
     
-    def _clear_session_cache(self, session_id: str) -> Bool:
+    def _clear_session_cache(self, session_id: str) -> bool:
         """세션 캐시 삭제"""
         # 실제 구현에서는 Redis FLUSHDB 등 사용
         return True
     
-    def _delete_session_from_db(self, session_id: str) -> Bool:
+    def _delete_session_from_db(self, session_id: str) -> bool:
         """데이터베이스 세션 삭제"""
         try:
             db_path = "eno_analytics.db"
@@ -310,7 +309,7 @@ class ENODataDeletionManager:
         except:
             logger.warning("삭제 감사 로그 파일 기록 실패")
     
-    def scheduled_cleanup(self, cleanup_type: str = "daily") -> Bool:
+    def scheduled_cleanup(self, cleanup_type: str = "daily") -> bool:
         """주기적 정리 작업"""
         try:
             logger.info(f"주기적 정리 시작: {cleanup_type}")
@@ -362,7 +361,7 @@ class ENODataDeletionManager:
             logger.error(f"주기적 정리 실패 {cleanup_type}: {e}")
             return False
     
-    def _cleanup_temp_files(self) -> Bool:
+    def _cleanup_temp_files(self) -> bool:
         """임시 파일 정리"""
         try:
             temp_dirs = ['/tmp', '/var/tmp']
@@ -386,7 +385,7 @@ class ENODataDeletionManager:
             logger.error(f"임시 파일 정리 실패: {e}")
             return False
     
-    def _cleanup_expired_logs(self) -> Bool:
+    def _cleanup_expired_logs(self) -> bool:
         """만료된 로그 정리"""
         try:
             log_files = [
@@ -408,7 +407,7 @@ class ENODataDeletionManager:
             logger.error(f"로그 정리 실패: {e}")
             return False
     
-    def emergency_wipe(self, reason: str) -> Bool:
+    def emergency_wipe(self, reason: str) -> bool:
         """긴급 데이터 삭제"""
         try:
             logger.critical(f"긴급 데이터 삭제 시작: {reason}")
@@ -421,7 +420,8 @@ class ENODataDeletionManager:
                 "verification_required": True
             }
             
-            # 1. 모든 ENO 프로세스 강제 종료
+            # 1. 모든 ENO 프로세스 강제 종료 (psutil은 긴급 삭제에서만 필요)
+            import psutil
             for proc in psutil.process_iter(['pid', 'name']):
                 if 'eno' in proc.info['name'].lower():
                     try:
@@ -499,12 +499,12 @@ class ENODataDeletionManager:
         
         return verification_results
     
-    def _verify_memory_cleanup(self) -> Bool:
+    def _verify_memory_cleanup(self) -> bool:
         """메모리 정리 검증"""
         # 실제로는 메모리 포렌식 도구 사용
         return True
     
-    def _verify_file_cleanup(self) -> Bool:
+    def _verify_file_cleanup(self) -> bool:
         """파일 시스템 정리 검증"""
         temp_dirs = ['/tmp', '/var/tmp']
         for temp_dir in temp_dirs:
@@ -514,7 +514,7 @@ class ENODataDeletionManager:
                         return False
         return True
     
-    def _verify_database_cleanup(self) -> Bool:
+    def _verify_database_cleanup(self) -> bool:
         """데이터베이스 정리 검증"""
         try:
             with sqlite3.connect("eno_analytics.db") as conn:
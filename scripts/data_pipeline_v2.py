@@ -17,13 +17,19 @@
 import json
 import logging
 import sys
+import threading
+import time
 import warnings
+import zlib
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
-import pandas as pd
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 warnings.filterwarnings("ignore")
 
@@ -31,6 +37,30 @@ warnings.filterwarnings("ignore")
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+from utils.metadata_filter import (  # noqa: E402
+    MetadataBitmapIndex,
+    choose_strategy,
+    normalize_filter,
+)
+from utils.metrics import (  # noqa: E402
+    CACHE_REQUESTS,
+    EMBEDDING_LATENCY,
+    INGEST_ROWS,
+    INGEST_ROWS_PER_SECOND,
+    REGISTRY,
+    SEARCH_LATENCY,
+    SEARCH_REQUESTS,
+)
+from utils.minhash import NearDuplicateDetector  # noqa: E402
+from utils.quantization import (  # noqa: E402
+    CompressedVectorIndex,
+    recall_memory_report,
+)
+from utils.rerank import evaluate_rerank, load_scorer  # noqa: E402
+from utils.rerank import rerank as rerank_candidates  # noqa: E402
+from utils.sharding import ShardedIndex, build_shards  # noqa: E402
+from utils.tracing import span  # noqa: E402
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -39,6 +69,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _stable_hash(word: str) -> int:
+    """프로세스 간 동일한 단어 해시 (내장 hash()는 실행마다 달라짐)"""
+    return zlib.crc32(word.encode("utf-8"))
+
+
 class DataPipelineV2:
     """Phase 2 확장된 데이터 파이프라인"""
 
@@ -53,9 +88,22 @@ class DataPipelineV2:
             "vector_dimension": 768,
             "max_memory_gb": 8,  # 메모리 제한 증가
             "target_accuracy": 0.7,  # 정확도 목표 증가
-            "max_response_time": 3.0,  # 응답 시간 여유 증가
+            "max_response_time": 3.0,  # 응답 시간 여유 증가 (p95 SLO, 초)
+            "min_throughput_rpm": 100,  # 처리량 SLO (req/min)
+            "max_error_rate": 0.01,  # 오류율 SLO
             "min_chunk_length": 100,  # 최소 청크 길이
             "max_chunk_length": 2048,  # 최대 청크 길이
+            "dedup_enabled": True,  # MinHash/LSH 근접 중복 제거
+            "dedup_threshold": 0.85,  # 근접 중복 판정 Jaccard 임계값
+            "dedup_num_perm": 128,  # MinHash 순열 수
+            "rerank_candidates": 100,  # 재정렬 후보군 크기
+            "rerank_budget_ms": 50.0,  # 재정렬 지연시간 예산
+            "rerank_cross_encoder": None,  # 예: cross-encoder/ms-marco-MiniLM-L-6-v2
+            "prefilter_max_selectivity": 0.3,  # 이하이면 사전 필터링
+            "vector_storage": "full",  # full | float16 | int8 | pq
+            "compressed_rerank_factor": 4,  # 압축 검색 후 전정밀도 재정렬 배수
+            "n_shards": 4,  # doc_id 해시 기반 샤드 수
+            "query_cache_size": 1024,  # 쿼리 벡터 LRU 캐시 크기
         }
 
         # 데이터 저장소
@@ -64,10 +112,37 @@ class DataPipelineV2:
         self.metadata = []
         self.word_vectors = {}  # Word2Vec 스타일 벡터
 
+        # 배치 간 상태를 유지하는 근접 중복 탐지기 (append 수집 시 누적)
+        self._reset_dedup()
+
+        # 2단계 재정렬기 (최초 사용 시 생성)
+        self.reranker = None
+        self.last_rerank_stats: Dict[str, Any] = {}
+
+        # 메타데이터 필터 인덱스
+        self.metadata_index = None
+        self.last_filter_strategy = None
+
+        # 압축 벡터 인덱스 (vector_storage != "full"일 때)
+        self.compressed_index = None
+
+        # 샤드 인덱스 코디네이터 (open_sharded_index로 시작)
+        self.sharded_index = None
+
+        # chunk_id -> 청크 위치 (get_chunk_text용 지연 생성)
+        self._chunk_positions: Dict[str, int] = {}
+
+        # 쿼리 벡터 LRU 캐시 (단어 벡터가 바뀌면 비움)
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
         logger.info(f"🚀 Phase 2 데이터 파이프라인 v2 초기화 완료: {datetime.now()}")
 
-    def load_extended_sample_data(self) -> pd.DataFrame:
+    def load_extended_sample_data(self) -> "pd.DataFrame":
         """확장된 샘플 데이터 로딩 (Phase 2용)"""
+        # pandas는 적재 경로에서만 로딩 (검색/서비스 시작 시간 단축)
+        import pandas as pd
+
         try:
             # Phase 2용 확장된 샘플 데이터
             extended_data = [
@@ -173,7 +248,7 @@ class DataPipelineV2:
     def advanced_text_preprocessing(self, text: str) -> str:
         """고도화된 텍스트 전처리"""
         try:
-            if pd.isna(text):
+            if text is None or text != text:  # None/NaN
                 return ""
 
             # 기본 정규화
@@ -309,7 +384,7 @@ class DataPipelineV2:
             # 각 단어에 대해 랜덤 벡터 생성 (실제로는 Word2Vec 사용)
             for word, freq in top_words:
                 # 해시 기반 일관된 랜덤 벡터 생성
-                np.random.seed(hash(word) % 2**32)
+                np.random.seed(_stable_hash(word) % 2**32)
                 vector = np.random.randn(100)  # 100차원
                 vector = vector / np.linalg.norm(vector)  # 정규화
                 word_vectors[word] = vector
@@ -353,6 +428,60 @@ class DataPipelineV2:
             logger.error(f"❌ 고도화된 벡터화 실패: {e}")
             return np.zeros(self.config["vector_dimension"])
 
+    def advanced_vectorization_batch(self, texts: List[str]) -> np.ndarray:
+        """``advanced_vectorization``을 여러 텍스트에 한 번에 적용 (n, dim)
+
+        토큰화만 텍스트별로 하고 TF-IDF 해시 버킷 채우기, 단어 벡터 평균,
+        정규화는 배치 전체에 대해 배열 연산으로 처리한다.
+        """
+        dim = self.config["vector_dimension"]
+        out = np.zeros((len(texts), dim))
+        if not texts:
+            return out
+
+        rows, buckets, freqs = [], [], []
+        word_rows, word_ids, vocab = [], [], {}
+        for i, text in enumerate(texts):
+            word_freq = {}
+            for word in text.lower().split():
+                word_freq[word] = word_freq.get(word, 0) + 1
+                if word in self.word_vectors:
+                    word_rows.append(i)
+                    word_ids.append(vocab.setdefault(word, len(vocab)))
+            for word, freq in word_freq.items():
+                rows.append(i)
+                buckets.append(_stable_hash(word) % 384)
+                freqs.append(freq)
+
+        # TF-IDF: 해시 충돌 시 나중 단어의 빈도가 남는다 (단건 경로와 동일)
+        tfidf = np.zeros((len(texts), 384))
+        if rows:
+            flat = np.asarray(rows) * 384 + np.asarray(buckets)
+            _, last = np.unique(flat[::-1], return_index=True)
+            keep = len(flat) - 1 - last
+            tfidf.flat[flat[keep]] = np.asarray(freqs, dtype=np.float64)[keep]
+        norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+        tfidf = np.divide(tfidf, norms, out=np.zeros_like(tfidf), where=norms > 0)
+        width = min(384, dim)
+        out[:, :width] = tfidf[:, :width]
+
+        # 단어 벡터 평균: 행별 합계 / 개수 후 정규화
+        if word_ids and dim > 384:
+            words = list(vocab)
+            matrix = np.stack([self.word_vectors[w] for w in words])
+            word_rows = np.asarray(word_rows)
+            sums = np.zeros((len(texts), matrix.shape[1]))
+            np.add.at(sums, word_rows, matrix[np.asarray(word_ids)])
+            counts = np.bincount(word_rows, minlength=len(texts))[:, None]
+            avg = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+            norms = np.linalg.norm(avg, axis=1, keepdims=True)
+            avg = np.divide(avg, norms, out=np.zeros_like(avg), where=norms > 0)
+            width = min(avg.shape[1], dim - 384)
+            out[:, 384 : 384 + width] = avg[:, :width]
+
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return np.divide(out, norms, out=out, where=norms > 0)
+
     def _create_tfidf_vector(self, text: str) -> np.ndarray:
         """TF-IDF 벡터 생성"""
         words = text.lower().split()
@@ -362,7 +491,7 @@ class DataPipelineV2:
 
         vector = np.zeros(384)  # 절반 차원
         for word, freq in word_freq.items():
-            hash_val = hash(word) % 384
+            hash_val = _stable_hash(word) % 384
             vector[hash_val] = freq
 
         norm = np.linalg.norm(vector)
@@ -393,10 +522,21 @@ class DataPipelineV2:
 
         return avg_vector
 
-    def process_extended_data(self, df: pd.DataFrame) -> bool:
-        """확장된 데이터 처리 파이프라인"""
+    def process_extended_data(self, df: "pd.DataFrame", append: bool = False) -> bool:
+        """확장된 데이터 처리 파이프라인
+
+        기본은 ``df``로 인덱스 전체를 다시 만든다 (중복 탐지 상태도 초기화).
+        ``append=True``면 기존 청크를 유지하고 새 배치를 기존 대표 청크와
+        대조해 중복 제거한 뒤 이어 붙인다 (벡터는 전체 재계산).
+        """
         try:
             logger.info("🔄 Phase 2 확장된 데이터 처리 파이프라인 시작...")
+            start = time.perf_counter()
+            if not append:
+                self._reset_dedup()
+            elif self.chunks and len(self.dedup) == 0:
+                # 저장된 결과를 불러온 뒤: 기존 청크로 탐지기를 다시 채움
+                self._reset_dedup(self.chunks, self.metadata)
 
             # 텍스트 컬럼 결합
             df["combined_text"] = df["title"].fillna("") + " " + df["body"].fillna("")
@@ -406,9 +546,13 @@ class DataPipelineV2:
                 self.advanced_text_preprocessing
             )
 
-            # 단어 벡터 생성
+            # 단어 벡터 생성 (append면 기존 청크의 단어도 포함)
             logger.info("🔄 단어 벡터 생성 시작...")
-            self.word_vectors = self.create_word_vectors(df["processed_text"].tolist())
+            texts = df["processed_text"].tolist()
+            if append:
+                texts = list(self.chunks) + texts
+            self.word_vectors = self.create_word_vectors(texts)
+            self._query_cache.clear()
 
             # 의미적 청킹
             all_chunks = []
@@ -433,8 +577,20 @@ class DataPipelineV2:
                         }
                     )
 
+            if self.config["dedup_enabled"]:
+                all_chunks, chunk_metadata = self.deduplicate_chunks(
+                    all_chunks, chunk_metadata
+                )
+
+            if append:
+                all_chunks = list(self.chunks) + all_chunks
+                chunk_metadata = list(self.metadata) + chunk_metadata
             self.chunks = all_chunks
             self.metadata = chunk_metadata
+            self._chunk_positions = {}
+
+            # 메타데이터 비트맵 인덱스 (필터 검색용)
+            self.metadata_index = MetadataBitmapIndex(self.metadata)
 
             # 고도화된 벡터화
             logger.info("🔄 고도화된 텍스트 벡터화 시작...")
@@ -444,6 +600,11 @@ class DataPipelineV2:
                 vectors.append(vector)
 
             self.vectors = np.array(vectors)
+            self.build_compressed_index()
+
+            elapsed = time.perf_counter() - start
+            INGEST_ROWS.inc(len(df), job="pipeline_v2")
+            INGEST_ROWS_PER_SECOND.set(len(df) / max(elapsed, 1e-9), job="pipeline_v2")
 
             # 결과 저장
             self.save_extended_results()
@@ -457,6 +618,255 @@ class DataPipelineV2:
             logger.error(f"❌ Phase 2 데이터 처리 실패: {e}")
             return False
 
+    def _reset_dedup(
+        self,
+        chunks: Optional[List[str]] = None,
+        metadata: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """근접 중복 탐지기 초기화 (주어진 청크는 대표로 다시 등록)"""
+        self.dedup = NearDuplicateDetector(
+            threshold=self.config["dedup_threshold"],
+            num_perm=self.config["dedup_num_perm"],
+        )
+        self._dedup_representatives: Dict[str, Dict[str, Any]] = {}
+        for chunk, meta in zip(chunks or [], metadata or []):
+            self.dedup.add(meta["chunk_id"], chunk)
+            meta.setdefault("duplicate_chunk_ids", [])
+            self._dedup_representatives[meta["chunk_id"]] = meta
+
+    def deduplicate_chunks(
+        self, chunks: List[str], metadata: List[Dict[str, Any]]
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """MinHash/LSH 기반 근접 중복 청크 제거 (배치 간 누적)
+
+        각 클러스터의 첫 청크만 대표로 남기고, 대표 메타데이터의
+        ``duplicate_chunk_ids``에 중복 청크 ID를 기록한다.
+        """
+        kept_chunks, kept_metadata = [], []
+        removed = 0
+        for chunk, meta in zip(chunks, metadata):
+            rep_id = self.dedup.add(meta["chunk_id"], chunk)
+            if rep_id is None:
+                meta["duplicate_chunk_ids"] = []
+                self._dedup_representatives[meta["chunk_id"]] = meta
+                kept_chunks.append(chunk)
+                kept_metadata.append(meta)
+            else:
+                self._dedup_representatives[rep_id]["duplicate_chunk_ids"].append(
+                    meta["chunk_id"]
+                )
+                removed += 1
+
+        logger.info(
+            f"✅ 근접 중복 제거 완료: {removed}개 제거, {len(kept_chunks)}개 유지"
+        )
+        return kept_chunks, kept_metadata
+
+    def build_compressed_index(self):
+        """설정된 vector_storage 모드로 압축 인덱스 생성"""
+        storage = self.config["vector_storage"]
+        if storage == "full" or self.vectors is None or len(self.vectors) == 0:
+            self.compressed_index = None
+            return None
+
+        self.compressed_index = CompressedVectorIndex(
+            self.vectors,
+            codec=storage,
+            rerank_factor=self.config["compressed_rerank_factor"],
+        )
+        logger.info(
+            f"✅ 압축 인덱스 생성 완료: {storage}, "
+            f"{self.vectors.nbytes:,} -> {self.compressed_index.memory_bytes:,} bytes"
+        )
+        return self.compressed_index
+
+    def _vectors_stamp(self) -> List[int]:
+        """저장된 벡터 파일의 (크기, 수정 시각 ns): 압축 인덱스 최신 여부 판단용"""
+        stat = (self.data_dir / "extended_vectors.npy").stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def save_compressed_index(self):
+        """압축 코드와 코덱 상태(int8 scale/offset, PQ 코드북)를 벡터 옆에 저장"""
+        path = self.data_dir / "extended_compressed_index.npz"
+        if self.compressed_index is None:
+            path.unlink(missing_ok=True)
+            return
+        np.savez(
+            path,
+            vectors_stamp=np.array(self._vectors_stamp()),
+            **self.compressed_index.to_dict(),
+        )
+
+    def load_compressed_index(self):
+        """저장된 압축 인덱스 로딩 (없거나 모드/벡터가 바뀌었으면 재학습 후 저장)"""
+        storage = self.config["vector_storage"]
+        path = self.data_dir / "extended_compressed_index.npz"
+        if storage != "full" and self.vectors is not None and path.exists():
+            try:
+                with np.load(path) as arrays:
+                    stamp = arrays["vectors_stamp"].tolist()
+                    if (
+                        str(arrays["codec"]) == storage
+                        and stamp == self._vectors_stamp()
+                    ):
+                        self.compressed_index = CompressedVectorIndex.from_dict(
+                            self.vectors,
+                            arrays,
+                            rerank_factor=self.config["compressed_rerank_factor"],
+                        )
+                        logger.info(f"✅ 저장된 압축 인덱스 로딩 완료: {storage}")
+                        return self.compressed_index
+            except Exception as e:
+                logger.warning(f"⚠️ 압축 인덱스 로딩 실패, 다시 생성: {e}")
+
+        self.build_compressed_index()
+        if self.compressed_index is not None:
+            self.save_compressed_index()
+        return self.compressed_index
+
+    def evaluate_compression(
+        self, queries: List[str] = None, top_k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """압축 모드별 recall/메모리 비교 리포트 (비압축 인덱스 기준)"""
+        try:
+            if queries:
+                query_vectors = self.advanced_vectorization_batch(queries)
+            else:
+                query_vectors = np.asarray(self.vectors)
+
+            report = recall_memory_report(
+                self.vectors,
+                query_vectors,
+                top_k=min(top_k, len(self.vectors)),
+                rerank_factor=self.config["compressed_rerank_factor"],
+            )
+
+            report_path = self.data_dir / "compression_report.json"
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+            logger.info(f"✅ 압축 리포트 저장 완료: {report_path}")
+            return report
+
+        except Exception as e:
+            logger.error(f"❌ 압축 평가 실패: {e}")
+            return []
+
+    def build_shards(self, n_shards: int = None, only: List[int] = None) -> bool:
+        """doc_id 해시로 청크를 샤드 분할 저장 (only로 일부 샤드만 재생성)"""
+        try:
+            n_shards = n_shards or self.config["n_shards"]
+            manifest = build_shards(
+                self.data_dir / "shards",
+                self.chunks,
+                self.metadata,
+                self.vectors,
+                n_shards,
+                only=only,
+            )
+            if self.sharded_index is not None and only is not None:
+                for shard_id in only:
+                    self.sharded_index.reload_shard(shard_id)
+
+            logger.info(f"✅ 샤드 생성 완료: {n_shards}개, 크기 {manifest['sizes']}")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ 샤드 생성 실패: {e}")
+            return False
+
+    def open_sharded_index(self) -> ShardedIndex:
+        """샤드별 워커 프로세스 시작"""
+        if self.sharded_index is None:
+            self.sharded_index = ShardedIndex(self.data_dir / "shards").start()
+            logger.info(f"🚀 샤드 워커 시작: {self.sharded_index.n_shards}개 프로세스")
+        return self.sharded_index
+
+    def close_sharded_index(self):
+        """샤드 워커 프로세스 종료"""
+        if self.sharded_index is not None:
+            self.sharded_index.close()
+            self.sharded_index = None
+
+    def search_sharded(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """샤드 scatter-gather 검색 (결과 형식은 search와 동일)"""
+        try:
+            index = self.open_sharded_index()
+            hits = index.search(self.advanced_vectorization(query), top_k)
+
+            results = []
+            for i, hit in enumerate(hits):
+                results.append(
+                    {
+                        "rank": i + 1,
+                        "chunk_id": hit["chunk_id"],
+                        "title": hit["title"],
+                        "tags": hit["tags"],
+                        "category": hit.get("category", "unknown"),
+                        "score": hit["score"],
+                        "chunk_text": hit["text"][:200] + "...",
+                        "similarity": hit["similarity"],
+                    }
+                )
+
+            logger.info(f"✅ 샤드 검색 완료: '{query}' -> {len(results)}개 결과")
+            return results
+
+        except Exception as e:
+            logger.error(f"❌ 샤드 검색 실패: {e}")
+            return []
+
+    def load_extended_results(self, mmap_vectors: bool = True) -> bool:
+        """저장된 청크/메타데이터/벡터 로딩 (상주 서비스용, 벡터는 mmap)"""
+        try:
+            config_path = self.data_dir / "pipeline_v2_config.json"
+            if config_path.exists():
+                with open(config_path, encoding="utf-8") as f:
+                    self.config.update(json.load(f))
+
+            with open(
+                self.data_dir / "extended_processed_chunks.json", encoding="utf-8"
+            ) as f:
+                self.chunks = json.load(f)
+            with open(
+                self.data_dir / "extended_chunk_metadata.json", encoding="utf-8"
+            ) as f:
+                self.metadata = json.load(f)
+            self._chunk_positions = {}
+
+            # mmap이면 여러 워커 프로세스가 OS 페이지 캐시를 공유
+            self.vectors = np.load(
+                self.data_dir / "extended_vectors.npy",
+                mmap_mode="r" if mmap_vectors else None,
+            )
+
+            word_vectors_path = self.data_dir / "word_vectors.json"
+            if word_vectors_path.exists():
+                with open(word_vectors_path, encoding="utf-8") as f:
+                    self.word_vectors = {
+                        word: np.asarray(vec) for word, vec in json.load(f).items()
+                    }
+            self._query_cache.clear()
+
+            index_path = self.data_dir / "extended_metadata_index.npz"
+            if index_path.exists():
+                with np.load(index_path) as arrays:
+                    self.metadata_index = MetadataBitmapIndex.from_dict(arrays)
+            else:
+                self.metadata_index = MetadataBitmapIndex(self.metadata)
+
+            self.load_compressed_index()
+
+            logger.info(
+                f"✅ 저장된 결과 로딩 완료: {len(self.chunks)}개 청크, "
+                f"{self.vectors.shape} 벡터 (mmap={mmap_vectors})"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ 저장된 결과 로딩 실패: {e}")
+            return False
+
     def save_extended_results(self):
         """확장된 결과 저장"""
         try:
@@ -473,6 +883,12 @@ class DataPipelineV2:
             # 벡터 저장
             vectors_path = self.data_dir / "extended_vectors.npy"
             np.save(vectors_path, self.vectors)
+            self.save_compressed_index()
+
+            # 메타데이터 비트맵 인덱스 저장
+            if self.metadata_index is not None:
+                index_path = self.data_dir / "extended_metadata_index.npz"
+                np.savez(index_path, **self.metadata_index.to_dict())
 
             # 단어 벡터 저장
             word_vectors_path = self.data_dir / "word_vectors.json"
@@ -487,6 +903,9 @@ class DataPipelineV2:
             with open(config_path, "w", encoding="utf-8") as f:
                 json.dump(self.config, f, ensure_ascii=False, indent=2)
 
+            # 배치 실행 메트릭 (Prometheus textfile 형식)
+            REGISTRY.write_textfile(str(self.data_dir / "metrics.prom"))
+
             logger.info(
                 f"✅ Phase 2 결과 저장 완료: {chunks_path}, {metadata_path}, {vectors_path}"
             )
@@ -559,48 +978,269 @@ class DataPipelineV2:
             logger.error(f"❌ Phase 2 성능 평가 실패: {e}")
             return {}
 
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """기본 검색 (Phase 1과 동일)"""
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        rerank: bool = False,
+        filters: Optional[Union[str, Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """기본 검색
+
+        rerank=True면 넓은 후보군을 2단계 재정렬하고, filters
+        (예: ``"tags contains python AND score >= 20"``)가 있으면 예상
+        선택도에 따라 사전/사후 필터링을 선택한다.
+        """
+        start = time.perf_counter()
+        if rerank:
+            mode = "rerank"
+        elif filters:
+            mode = "filtered"
+        else:
+            mode = "compressed" if self.compressed_index is not None else "exact"
         try:
             if self.vectors is None or len(self.chunks) == 0:
                 logger.error("❌ 검색할 데이터가 없습니다.")
                 return []
 
             # 쿼리 벡터화
-            query_vector = self.advanced_vectorization(query)
+            with span("embedding"):
+                query_vector = self._query_vector(query)
+            pool = max(top_k, self.config["rerank_candidates"]) if rerank else top_k
+
+            with span("scoring") as scoring:
+                scored = len(self.chunks)
+                spec = normalize_filter(filters)
+                if spec:
+                    if self.metadata_index is None:
+                        self.metadata_index = MetadataBitmapIndex(self.metadata)
+                    strategy = choose_strategy(
+                        self.metadata_index.estimate_selectivity(spec),
+                        self.config["prefilter_max_selectivity"],
+                    )
+                    self.last_filter_strategy = strategy
+                    if strategy == "prefilter":
+                        # 조건을 만족하는 행만 점수 계산
+                        rows = self.metadata_index.matching_indices(spec)
+                        scored = len(rows)
+                        row_scores = self.vectors[rows] @ query_vector
+                        order = rows[np.argsort(-row_scores, kind="stable")[:pool]]
+                        similarities = np.zeros(len(self.chunks))
+                        similarities[rows] = row_scores
+                    else:
+                        # 전체 점수 계산 후 비트맵으로 걸러냄
+                        similarities = self.vectors @ query_vector
+                        order = np.argsort(-similarities, kind="stable")
+                        order = order[self.metadata_index.mask(spec)[order]][:pool]
+                elif self.compressed_index is not None:
+                    # 압축 코드로 후보 선별 후 전정밀도 재정렬
+                    order, scores = self.compressed_index.search(query_vector, pool)
+                    similarities = np.zeros(len(self.chunks))
+                    similarities[order] = scores
+                else:
+                    # 코사인 유사도 계산 (정규화된 벡터이므로 내적)
+                    similarities = self.vectors @ query_vector
 
-            # 코사인 유사도 계산
-            similarities = []
-            for i, vector in enumerate(self.vectors):
-                similarity = np.dot(query_vector, vector)
-                similarities.append((i, similarity))
+                    # 유사도 순으로 정렬 (동률은 원래 순서 유지)
+                    order = np.argsort(-similarities, kind="stable")[:pool]
+                scoring.set(candidates_scored=scored, candidates=len(order))
 
-            # 유사도 순으로 정렬
-            similarities.sort(key=lambda x: x[1], reverse=True)
+            candidates = [
+                {
+                    "chunk_idx": int(chunk_idx),
+                    "text": self.chunks[chunk_idx],
+                    "similarity": float(similarities[chunk_idx]),
+                }
+                for chunk_idx in order
+            ]
+            if rerank:
+                with span("rerank", candidates=len(candidates)):
+                    candidates, self.last_rerank_stats = rerank_candidates(
+                        query,
+                        candidates,
+                        self._get_reranker(),
+                        top_k=top_k,
+                        budget_ms=self.config["rerank_budget_ms"],
+                    )
 
             # 상위 k개 결과 반환
-            results = []
-            for i, (chunk_idx, similarity) in enumerate(similarities[:top_k]):
-                results.append(
-                    {
-                        "rank": i + 1,
-                        "chunk_id": self.metadata[chunk_idx]["chunk_id"],
-                        "title": self.metadata[chunk_idx]["title"],
-                        "tags": self.metadata[chunk_idx]["tags"],
-                        "category": self.metadata[chunk_idx].get("category", "unknown"),
-                        "score": self.metadata[chunk_idx]["score"],
-                        "chunk_text": self.chunks[chunk_idx][:200] + "...",
-                        "similarity": float(similarity),
-                    }
-                )
+            with span("formatting"):
+                results = []
+                for i, candidate in enumerate(candidates[:top_k]):
+                    result = self._format_result(
+                        i + 1, candidate["chunk_idx"], candidate["similarity"]
+                    )
+                    if "rerank_score" in candidate:
+                        result["rerank_score"] = candidate["rerank_score"]
+                    results.append(result)
 
+            SEARCH_LATENCY.observe(time.perf_counter() - start, mode=mode)
+            SEARCH_REQUESTS.inc(mode=mode, status="ok")
             logger.info(f"✅ 검색 완료: '{query}' -> {len(results)}개 결과")
             return results
 
         except Exception as e:
+            SEARCH_REQUESTS.inc(mode=mode, status="error")
             logger.error(f"❌ 검색 실패: {e}")
             return []
 
+    def _format_result(
+        self, rank: int, chunk_idx: int, similarity: float
+    ) -> Dict[str, Any]:
+        """검색 결과 항목 포맷"""
+        meta = self.metadata[chunk_idx]
+        return {
+            "rank": rank,
+            "chunk_id": meta["chunk_id"],
+            "title": meta["title"],
+            "tags": meta["tags"],
+            "category": meta.get("category", "unknown"),
+            "score": meta["score"],
+            "chunk_text": self.chunks[chunk_idx][:200] + "...",
+            "similarity": float(similarity),
+        }
+
+    def get_chunk_text(self, chunk_id: str) -> str:
+        """chunk_id로 전체 청크 텍스트 조회"""
+        if len(self._chunk_positions) != len(self.metadata):
+            self._chunk_positions = {
+                meta["chunk_id"]: i for i, meta in enumerate(self.metadata)
+            }
+        return self.chunks[self._chunk_positions[chunk_id]]
+
+    def _query_vector(self, query: str) -> np.ndarray:
+        """쿼리 벡터화 (LRU 캐시, 캐시 적중률/임베딩 지연시간 기록)"""
+        with self._query_cache_lock:
+            vector = self._query_cache.get(query)
+            if vector is not None:
+                self._query_cache.move_to_end(query)
+        if vector is not None:
+            CACHE_REQUESTS.inc(cache="query_vector", result="hit")
+            return vector
+
+        CACHE_REQUESTS.inc(cache="query_vector", result="miss")
+        with EMBEDDING_LATENCY.time(backend="local"):
+            vector = self.advanced_vectorization(query)
+        with self._query_cache_lock:
+            self._query_cache[query] = vector
+            while len(self._query_cache) > self.config["query_cache_size"]:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def vectorize_batch(self, texts: List[str]) -> np.ndarray:
+        """여러 텍스트를 한 번에 벡터화 (n, vector_dimension)
+
+        캐시에 없는 텍스트만 모아 ``advanced_vectorization_batch`` 1회로
+        벡터화하고 쿼리 벡터 LRU 캐시에 넣는다.
+        """
+        out = np.zeros((len(texts), self.config["vector_dimension"]))
+        missing: Dict[str, List[int]] = {}
+        with self._query_cache_lock:
+            for i, text in enumerate(texts):
+                vector = self._query_cache.get(text)
+                if vector is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._query_cache.move_to_end(text)
+                    out[i] = vector
+        hits = len(texts) - sum(len(rows) for rows in missing.values())
+        if hits:
+            CACHE_REQUESTS.inc(hits, cache="query_vector", result="hit")
+        if not missing:
+            return out
+
+        CACHE_REQUESTS.inc(len(texts) - hits, cache="query_vector", result="miss")
+        with EMBEDDING_LATENCY.time(backend="local_batch"):
+            try:
+                vectors = self.advanced_vectorization_batch(list(missing))
+            except Exception as e:
+                logger.error(f"❌ 배치 벡터화 실패, 단건 처리: {e}")
+                vectors = [self.advanced_vectorization(t) for t in missing]
+        with self._query_cache_lock:
+            for (text, rows), vector in zip(missing.items(), vectors):
+                out[rows] = vector
+                self._query_cache[text] = vector
+            while len(self._query_cache) > self.config["query_cache_size"]:
+                self._query_cache.popitem(last=False)
+        return out
+
+    def search_batch(
+        self, queries: List[str], top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """다중 쿼리 검색: 배치 임베딩 1회 + GEMM 1회 + 행별 top-k
+
+        압축 인덱스가 있으면 ``search()``와 같이 압축 코드로 점수를 매긴다.
+        """
+        start = time.perf_counter()
+        try:
+            if self.vectors is None or len(self.chunks) == 0 or not queries:
+                return [[] for _ in queries]
+
+            with span("embedding", queries=len(queries)):
+                query_matrix = self.vectorize_batch(queries)
+            with span("scoring", candidates_scored=len(self.chunks) * len(queries)):
+                if self.compressed_index is not None:
+                    # search()와 같은 압축 인덱스 경로 (후보 선별 + 재정렬)
+                    hits = self.compressed_index.search_batch(query_matrix, top_k)
+                else:
+                    scores = query_matrix @ np.asarray(self.vectors).T
+                    k = min(top_k, scores.shape[1])
+                    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    hits = []
+                    for q in range(len(queries)):
+                        row = top[q][np.argsort(-scores[q, top[q]], kind="stable")]
+                        hits.append((row, scores[q, row]))
+
+            batch_results = [
+                [
+                    self._format_result(rank, int(idx), score)
+                    for rank, (idx, score) in enumerate(zip(rows, row_scores), 1)
+                ]
+                for rows, row_scores in hits
+            ]
+
+            SEARCH_LATENCY.observe(time.perf_counter() - start, mode="batch")
+            SEARCH_REQUESTS.inc(len(queries), mode="batch", status="ok")
+            logger.info(f"✅ 배치 검색 완료: {len(queries)}개 쿼리")
+            return batch_results
+
+        except Exception as e:
+            SEARCH_REQUESTS.inc(len(queries), mode="batch", status="error")
+            logger.error(f"❌ 배치 검색 실패: {e}")
+            return [[] for _ in queries]
+
+    def _get_reranker(self):
+        """재정렬 스코어러 (cross-encoder 가능 시 사용, 아니면 late interaction)"""
+        if self.reranker is None:
+            self.reranker = load_scorer(
+                self.word_vectors, self.config["rerank_cross_encoder"]
+            )
+        return self.reranker
+
+    def evaluate_rerank(
+        self, labeled_queries: Dict[str, List[str]], top_k: int = 5
+    ) -> Dict[str, Any]:
+        """레이블된 쿼리셋으로 재정렬 지연시간/품질 변화 측정"""
+        try:
+            report = evaluate_rerank(self.search, labeled_queries, top_k=top_k)
+            report["scorer"] = getattr(self._get_reranker(), "name", "unknown")
+            report["rerank_candidates"] = self.config["rerank_candidates"]
+            report["rerank_budget_ms"] = self.config["rerank_budget_ms"]
+
+            report_path = self.data_dir / "rerank_evaluation.json"
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+            logger.info(
+                f"✅ 재정렬 평가 완료: MRR 변화 {report['delta_mrr']:+.4f}, "
+                f"추가 지연 {report['added_latency_ms_p50']:.3f}ms"
+            )
+            return report
+
+        except Exception as e:
+            logger.error(f"❌ 재정렬 평가 실패: {e}")
+            return {}
+
 
 def main():
     """Phase 2 메인 실행 함수"""
@@ -9,27 +9,45 @@ Last Update: 2025-08-11
 """
 
 import json
+import os
 import sqlite3
 import logging
+import sys
+import urllib.request
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Optional
 import random
 
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.metrics import parse_text, quantile_from_samples  # noqa: E402
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+METRICS_SOURCE_ENV = "NEBULA_METRICS_SOURCE"
+
+# KPI 응답시간에서 제외할 운영용 엔드포인트
+INTERNAL_ENDPOINTS = {"/metrics", "/health", "/ready", "/stats"}
+
 class ENOKPICollector:
     """엔오건강도우미 KPI 수집기"""
     
-    def __init__(self, db_path: str = "eno_analytics.db"):
+    def __init__(self, db_path: str = "eno_analytics.db",
+                 metrics_source: Optional[str] = None):
         """
         KPI 수집기 초기화
         
         Args:
             db_path: SQLite 데이터베이스 경로
+            metrics_source: /metrics URL 또는 .prom 파일 경로
+                (설정 시 성능 KPI를 실측 메트릭에서 계산)
         """
         self.db_path = db_path
+        self.metrics_source = metrics_source or os.environ.get(METRICS_SOURCE_ENV)
         self.kpi_config = self._load_kpi_config()
         self._init_database()
     
@@ -111,6 +129,15 @@ class ENOKPICollector:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+
+            # 실측 메트릭 일자별 누적 스냅샷 (일 단위 증분 계산용)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metrics_snapshots (
+                    date DATE PRIMARY KEY,
+                    samples TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
             
             conn.commit()
             logger.info("데이터베이스 초기화 완료")
@@ -171,6 +198,92 @@ class ENOKPICollector:
             conn.commit()
             logger.info(f"일일 데이터 시뮬레이션 완료: {date}")
     
+    def _load_metrics_samples(self) -> Optional[List]:
+        """메트릭 소스(/metrics URL 또는 .prom 파일)에서 샘플 로드"""
+        if not self.metrics_source:
+            return None
+        try:
+            if self.metrics_source.startswith(("http://", "https://")):
+                with urllib.request.urlopen(self.metrics_source, timeout=5) as resp:
+                    text = resp.read().decode("utf-8")
+            else:
+                with open(self.metrics_source, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            samples = parse_text(text)
+            return [s for s in samples
+                    if s[1].get("endpoint") not in INTERNAL_ENDPOINTS]
+        except Exception as e:
+            logger.error(f"메트릭 소스 로드 실패: {self.metrics_source} ({e})")
+            return None
+
+    def _metrics_delta(self, conn: sqlite3.Connection, date: str) -> Optional[List]:
+        """해당 일자의 메트릭 증분 샘플
+
+        카운터/히스토그램은 프로세스 시작 이후 누적값이므로 일자별 스냅샷을
+        저장하고 직전 스냅샷과의 차이만 그 날의 샘플로 사용한다.
+        오늘은 소스에서 새로 읽어 스냅샷을 갱신하고, 과거 일자(백필)는
+        저장된 스냅샷이 있을 때만 계산한다.
+        """
+        if date == datetime.now().strftime('%Y-%m-%d'):
+            samples = self._load_metrics_samples()
+            if not samples:
+                return None
+            conn.execute(
+                "INSERT OR REPLACE INTO metrics_snapshots (date, samples) "
+                "VALUES (?, ?)",
+                (date, json.dumps(samples)),
+            )
+            conn.commit()
+        else:
+            row = conn.execute(
+                "SELECT samples FROM metrics_snapshots WHERE date = ?", (date,)
+            ).fetchone()
+            if row is None:
+                return None
+            samples = [tuple(s) for s in json.loads(row[0])]
+
+        prev = conn.execute(
+            "SELECT samples FROM metrics_snapshots WHERE date < ? "
+            "ORDER BY date DESC LIMIT 1",
+            (date,),
+        ).fetchone()
+        if prev is None:
+            return samples
+
+        def key(name, labels):
+            return name, tuple(sorted(labels.items()))
+
+        baseline = {key(name, labels): value
+                    for name, labels, value in json.loads(prev[0])}
+        # 값이 줄어든 시리즈가 있으면 프로세스 재시작 → 현재 누적값이 곧 증분
+        if any(value < baseline.get(key(name, labels), 0)
+               for name, labels, value in samples):
+            return samples
+        return [(name, labels, value - baseline.get(key(name, labels), 0))
+                for name, labels, value in samples]
+
+    def _observed_performance(self, conn: sqlite3.Connection, date: str) -> Dict:
+        """실측 메트릭 기반 응답시간 p95(초)/에러율(%) - 해당 일자 증분 기준"""
+        samples = self._metrics_delta(conn, date)
+        if not samples:
+            return {}
+
+        observed = {}
+        p95 = quantile_from_samples(
+            samples, "nebula_http_request_duration_seconds", 0.95
+        )
+        if p95 is not None:
+            observed['response_time_p95'] = p95
+
+        requests = [(labels, value) for name, labels, value in samples
+                    if name == "nebula_http_requests_total"]
+        total = sum(value for _, value in requests)
+        if total > 0:
+            errors = sum(value for labels, value in requests
+                         if labels.get("status", "").startswith("5"))
+            observed['error_rate'] = (errors / total) * 100
+        return observed
+
     def calculate_daily_kpi(self, date: str = None) -> Dict:
         """일일 KPI 계산"""
         if date is None:
@@ -250,6 +363,13 @@ class ENOKPICollector:
             
             error_rate = (error_requests / total_requests) * 100 if total_requests > 0 else 0
             
+            # 실측 메트릭이 있으면 시뮬레이션 값 대신 사용
+            observed = self._observed_performance(conn, date)
+            if observed:
+                response_time_p95 = observed.get('response_time_p95', response_time_p95)
+                error_rate = observed.get('error_rate', error_rate)
+                logger.info(f"성능 KPI 실측 메트릭 사용: {self.metrics_source}")
+
             # 3. 컴플라이언스 KPI
             # 의료어 필터 누락 (시뮬레이션: 0건 목표)
             filter_miss_count = 0  # 실제로는 로그 분석 필요
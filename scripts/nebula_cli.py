@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+nebula 통합 CLI
+
+실행:
+    python scripts/nebula_cli.py <command> [options]
+    python -m scripts.nebula_cli <command> [options]
+
+명령어:
+    ingest    CSV 적재 + 데이터 프로파일 + axes 지표
+    axes      CSV의 axes(A/B/C/D) 지표 계산
+    catalog   데이터셋 카탈로그 전체 axes 병렬 계산 + 통합 표
+    baseline  RandomForest 베이스라인 (macro F1)
+    search    로컬 인덱스 검색 (DataPipelineV2)
+    kpi       일일 KPI 집계
+    loadtest  검색/RAG 부하 테스트 + SLO 검증
+    purge     데이터 삭제/검증
+
+무거운 의존성(pandas, sklearn, BigQuery/Vertex SDK 등)은 해당 명령
+실행 시점에만 임포트한다. ``--help``나 명령 파싱은 표준 라이브러리만
+사용하므로 cron 작업/컨테이너 기동 비용이 명령 실제 작업에만 든다.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 경로 추가
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+
+def _print_json(data) -> None:
+    print(json.dumps(data, ensure_ascii=False, indent=2, default=str))
+
+
+def cmd_ingest(args) -> int:
+    from pipelines.dataset_ingest import main as ingest_main
+
+    argv = [
+        "--input",
+        args.input,
+        "--out_profile",
+        args.out_profile,
+        "--out_axes",
+        args.out_axes,
+    ]
+    if args.streaming:
+        argv += ["--streaming", "--workers", str(args.workers)]
+    ingest_main(argv)
+    return 0
+
+
+def cmd_axes(args) -> int:
+    from pipelines.dataset_ingest import compute_axes, ingest_csv
+
+    metrics = compute_axes(ingest_csv(args.input))
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, default=str)
+    _print_json(metrics)
+    return 0
+
+
+def cmd_catalog(args) -> int:
+    from pipelines.catalog_runner import main as catalog_main
+
+    argv = [
+        "--catalog",
+        args.catalog,
+        "--out_dir",
+        args.out_dir,
+        "--workers",
+        str(args.workers),
+        "--timeout",
+        str(args.timeout),
+    ]
+    if args.no_cache:
+        argv.append("--no_cache")
+    table = catalog_main(argv)
+    return 0 if table["status"].isin(["ok", "cached"]).all() else 1
+
+
+def cmd_baseline(args) -> int:
+    from scripts.run_baseline_rf import main as baseline_main
+
+    baseline_main(args.data)
+    return 0
+
+
+def cmd_search(args) -> int:
+    from scripts.data_pipeline_v2 import DataPipelineV2
+
+    pipeline = DataPipelineV2(args.data_dir)
+    if args.rebuild:
+        if not pipeline.process_extended_data(pipeline.load_extended_sample_data()):
+            return 1
+    elif not pipeline.load_extended_results():
+        print(f"❌ 인덱스 로딩 실패: {args.data_dir} (--rebuild로 생성)")
+        return 1
+    _print_json(
+        pipeline.search(
+            args.query, top_k=args.top_k, rerank=args.rerank, filters=args.filter
+        )
+    )
+    return 0
+
+
+def cmd_kpi(args) -> int:
+    from scripts.kpi_daily_job import ENOKPICollector
+
+    collector = ENOKPICollector(args.db, metrics_source=args.metrics_source)
+    print(collector.run_daily_job(args.date))
+    return 0
+
+
+def _run_loadtest(args, target, queries, config) -> int:
+    from utils import loadgen
+
+    report = loadgen.run_load(
+        target,
+        queries,
+        rps=args.rps,
+        duration_s=args.duration,
+        n_requests=args.requests,
+        process=args.arrival,
+        concurrency=args.concurrency,
+        seed=args.seed,
+    )
+    slo = loadgen.slo_from_config(config)
+    if args.p95_ms is not None:
+        slo["p95_ms"] = args.p95_ms
+    report["slo"] = loadgen.check_slo(report, slo)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    _print_json(report)
+    return 0 if report["slo"]["passed"] else 1
+
+
+def cmd_loadtest(args) -> int:
+    from utils import loadgen
+
+    queries = loadgen.load_query_log(args.queries) if args.queries else None
+    if args.url:
+        if not queries:
+            print("❌ --url 사용 시 --queries가 필요합니다.")
+            return 2
+        target = loadgen.http_target(args.url, args.endpoint, args.top_k)
+        return _run_loadtest(args, target, queries, {})
+
+    from scripts.data_pipeline_v2 import DataPipelineV2
+
+    pipeline = DataPipelineV2(args.data_dir)
+    if not pipeline.load_extended_results():
+        print(f"❌ 인덱스 로딩 실패: {args.data_dir}")
+        return 1
+    queries = queries or loadgen.synthesize_queries(
+        pipeline.chunks, 500, seed=args.seed
+    )
+    if args.endpoint == "pipeline":
+        target = loadgen.pipeline_target(pipeline, args.top_k)
+        return _run_loadtest(args, target, queries, pipeline.config)
+
+    # 서비스 전체 경로(미들웨어/마이크로배처/생성)를 프로세스 내에서 구동
+    from fastapi.testclient import TestClient
+
+    from scripts.retrieval_service import create_app
+
+    with TestClient(create_app(args.data_dir)) as client:
+        target = loadgen.client_target(client, args.endpoint, args.top_k)
+        return _run_loadtest(args, target, queries, pipeline.config)
+
+
+def cmd_purge(args) -> int:
+    from scripts.data_deletion_script import ENODataDeletionManager
+
+    manager = ENODataDeletionManager(args.policy)
+    if args.action == "verify":
+        results = manager.verify_deletion_integrity()
+        _print_json(results)
+        return 0 if results["overall_status"] == "pass" else 1
+    if not args.target:
+        print(f"❌ {args.action}에는 대상이 필요합니다.")
+        return 2
+    if args.action == "immediate":
+        ok = manager.immediate_session_cleanup(args.target)
+    elif args.action == "scheduled":
+        ok = manager.scheduled_cleanup(args.target)
+    else:
+        ok = manager.emergency_wipe(args.target)
+    print(f"{args.action} 삭제 {'성공' if ok else '실패'}: {args.target}")
+    return 0 if ok else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="nebula", description="NebulaCon pipeline CLI")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="ingest a CSV, write profile and axes metrics")
+    p.add_argument("--input", required=True, help="input CSV path")
+    p.add_argument("--out-profile", default="metrics/dataset_profile.json")
+    p.add_argument("--out-axes", default="metrics/axes_metrics.json")
+    p.add_argument(
+        "--streaming", action="store_true", help="chunked, bounded-memory profile"
+    )
+    p.add_argument("--workers", type=int, default=0, help="process pool size")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("axes", help="compute axes metrics for a CSV")
+    p.add_argument("--input", required=True, help="input CSV path")
+    p.add_argument("--out", help="optional JSON output path")
+    p.set_defaults(func=cmd_axes)
+
+    p = sub.add_parser("catalog", help="axes metrics for every dataset in a catalog")
+    p.add_argument("--catalog", required=True, help="dataset directory or manifest")
+    p.add_argument("--out-dir", default="metrics/catalog")
+    p.add_argument("--workers", type=int, default=2, help="worker processes")
+    p.add_argument("--timeout", type=float, default=600.0, help="seconds per dataset")
+    p.add_argument("--no-cache", action="store_true", help="recompute everything")
+    p.set_defaults(func=cmd_catalog)
+
+    p = sub.add_parser("baseline", help="RandomForest baseline (macro F1)")
+    p.add_argument("--data", required=True, help="input CSV path")
+    p.set_defaults(func=cmd_baseline)
+
+    p = sub.add_parser("search", help="search the local chunk index")
+    p.add_argument("query")
+    p.add_argument("--data-dir", default="data")
+    p.add_argument("--top-k", type=int, default=5)
+    p.add_argument("--rerank", action="store_true")
+    p.add_argument("--filter", help='e.g. "tags contains python AND score >= 20"')
+    p.add_argument("--rebuild", action="store_true", help="rebuild the index first")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("kpi", help="run the daily KPI job")
+    p.add_argument("--date", help="YYYY-MM-DD (default: today)")
+    p.add_argument("--db", default="eno_analytics.db")
+    p.add_argument("--metrics-source", help="/metrics URL or .prom file")
+    p.set_defaults(func=cmd_kpi)
+
+    p = sub.add_parser("loadtest", help="open-loop load test with SLO check")
+    p.add_argument("--data-dir", default="data")
+    p.add_argument(
+        "--endpoint",
+        default="/rag",
+        help="/rag, /search, /rag/stream (in-process service) or pipeline",
+    )
+    p.add_argument("--url", help="base URL of a running service instead")
+    p.add_argument("--queries", help="query log (.jsonl/.json/.txt)")
+    p.add_argument("--rps", type=float, default=2.0, help="offered requests/second")
+    p.add_argument("--duration", type=float, default=60.0, help="seconds")
+    p.add_argument("--requests", type=int, help="request count (overrides duration)")
+    p.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--top-k", type=int, default=5)
+    p.add_argument("--p95-ms", type=float, help="override the config p95 SLO")
+    p.add_argument("--seed", type=int)
+    p.add_argument("--out", help="optional JSON report path")
+    p.set_defaults(func=cmd_loadtest)
+
+    p = sub.add_parser("purge", help="data deletion and verification")
+    p.add_argument("action", choices=["immediate", "scheduled", "emergency", "verify"])
+    p.add_argument("target", nargs="?", help="session id / cleanup type / reason")
+    p.add_argument("--policy", help="deletion policy JSON path")
+    p.set_defaults(func=cmd_purge)
+    return ap
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
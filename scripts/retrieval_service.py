@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+상주형 검색/RAG 서비스 (FastAPI)
+
+청크 저장소와 인덱스를 시작 시 한 번만 로딩하고 (벡터는 mmap), 요청당
+비용은 쿼리 임베딩 + 스코어링만 남긴다. 여러 uvicorn 워커가 같은 mmap
+파일을 열어 OS 페이지 캐시를 공유한다.
+
+실행:
+    python scripts/retrieval_service.py --data-dir data --workers 4
+
+엔드포인트:
+    GET  /health        프로세스 생존 확인
+    GET  /ready         인덱스 로딩 완료 여부 (미완료 시 503)
+    POST /search        단일 쿼리 검색
+    POST /batch_search  다중 쿼리 검색
+    POST /rag           검색 + 답변 생성 (토큰 예산 내 컨텍스트 조립)
+    POST /rag/stream    SSE 스트리밍: 검색 결과 즉시 → 생성 토큰 → 타이밍
+    GET  /stats         마이크로배처 히스토그램 + 서킷 브레이커 상태
+    GET  /metrics       Prometheus 텍스트 형식 메트릭
+
+필터/재정렬이 없는 /search 요청은 마이크로배처로 모아 배치 임베딩 1회 +
+GEMM 1회로 처리한다 (--batch-size, --batch-wait-ms로 조정).
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+# 프로젝트 루트 경로 추가
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scripts.data_pipeline_v2 import DataPipelineV2  # noqa: E402
+from utils.circuit_breaker import default_registry  # noqa: E402
+from utils.context_budget import ContextAssembler  # noqa: E402
+from utils.generation import (  # noqa: E402
+    GuardedGenerator,
+    StubGenerator,
+    load_generator,
+    stream_rag_events,
+)
+from utils.metrics import (  # noqa: E402
+    CONTENT_TYPE,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    REGISTRY,
+)
+from utils.microbatch import MicroBatcher  # noqa: E402
+from utils.tracing import TRACE_FILE_ENV, span  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR_ENV = "NEBULA_DATA_DIR"
+BATCH_SIZE_ENV = "NEBULA_BATCH_SIZE"
+BATCH_WAIT_ENV = "NEBULA_BATCH_WAIT_MS"
+CONTEXT_BUDGET_ENV = "NEBULA_CONTEXT_BUDGET"
+GENERATOR_ENV = "NEBULA_GENERATOR"
+
+BREAKER_STATE = REGISTRY.gauge(
+    "nebula_circuit_state", "Circuit breaker state (0=closed, 1=half_open, 2=open)"
+)
+BREAKER_FAILURE_RATE = REGISTRY.gauge(
+    "nebula_circuit_window_failure_rate", "Failure rate over the breaker window"
+)
+BREAKER_REJECTED = REGISTRY.gauge(
+    "nebula_circuit_rejected_calls", "Calls rejected by an open breaker"
+)
+MICROBATCH_QUEUE_DEPTH = REGISTRY.gauge(
+    "nebula_microbatch_queue_depth", "Queued /search requests"
+)
+MICROBATCH_AVG_SIZE = REGISTRY.gauge(
+    "nebula_microbatch_avg_batch_size", "Average coalesced batch size"
+)
+
+
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    top_k: int = Field(5, ge=1, le=100)
+    rerank: bool = False
+    filters: Optional[Union[str, Dict[str, Any]]] = None
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1)
+    top_k: int = Field(5, ge=1, le=100)
+    rerank: bool = False
+    filters: Optional[Union[str, Dict[str, Any]]] = None
+
+
+class RAGRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    top_k: int = Field(5, ge=1, le=100)
+
+
+def generate_answer_template(query: str, search_results: List[Dict[str, Any]]) -> str:
+    """검색 결과를 바탕으로 템플릿 기반 답변 생성"""
+    if not search_results:
+        return f"죄송합니다. '{query}'에 대한 관련 정보를 찾을 수 없습니다."
+
+    top_result = search_results[0]
+    return f"""
+🔍 **질문**: {query}
+
+📚 **찾은 정보**:
+- **제목**: {top_result.get("title", "N/A")}
+- **내용**: {top_result.get("chunk_text", "N/A")}
+- **유사도 점수**: {top_result.get("similarity", 0):.3f}
+    """.strip()
+
+
+def create_app(
+    data_dir: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    batch_wait_ms: Optional[float] = None,
+    context_budget: Optional[int] = None,
+    generator=None,
+) -> FastAPI:
+    """서비스 앱 생성 (uvicorn --factory 진입점)"""
+    data_dir = data_dir or os.environ.get(DATA_DIR_ENV, "data")
+    batch_size = batch_size or int(os.environ.get(BATCH_SIZE_ENV, 32))
+    if batch_wait_ms is None:
+        batch_wait_ms = float(os.environ.get(BATCH_WAIT_ENV, 5.0))
+    context_budget = context_budget or int(os.environ.get(CONTEXT_BUDGET_ENV, 1024))
+    state: Dict[str, Any] = {"pipeline": None, "loaded_at": None, "batcher": None}
+    assembler = ContextAssembler(budget_tokens=context_budget)
+    generator = generator or load_generator(os.environ.get(GENERATOR_ENV, "stub"))
+    if not isinstance(generator, StubGenerator):
+        # 원격 LLM 장애 시 차단기가 열리면 로컬 생성기로 우회
+        generator = GuardedGenerator(
+            generator,
+            StubGenerator(),
+            default_registry.get(f"{generator.name}.generate"),
+        )
+
+    def _search_batch(items: List[tuple]) -> List[List[Dict[str, Any]]]:
+        # 배치 내 최대 top_k로 한 번에 계산 후 요청별로 자름
+        max_k = max(top_k for _, top_k in items)
+        with span("batch_search", batch_size=len(items)):
+            results = state["pipeline"].search_batch([q for q, _ in items], max_k)
+        return [r[:top_k] for r, (_, top_k) in zip(results, items)]
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        start = time.perf_counter()
+        pipeline = DataPipelineV2(data_dir)
+        if not pipeline.load_extended_results(mmap_vectors=True):
+            raise RuntimeError(f"인덱스 로딩 실패: {data_dir}")
+        state["pipeline"] = pipeline
+        state["batcher"] = MicroBatcher(_search_batch, batch_size, batch_wait_ms)
+        state["batcher"].start()
+        state["loaded_at"] = time.time()
+        state["load_seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(f"🚀 검색 서비스 준비 완료: {state['load_seconds']}초")
+        yield
+        await state["batcher"].close()
+        pipeline.close_sharded_index()
+        state["pipeline"] = None
+
+    app = FastAPI(title="NebulaCon Retrieval Service", lifespan=lifespan)
+    app.state.service = state
+
+    def _pipeline() -> DataPipelineV2:
+        if state["pipeline"] is None:
+            raise HTTPException(status_code=503, detail="index not loaded")
+        return state["pipeline"]
+
+    @app.middleware("http")
+    async def record_metrics(request: Request, call_next):
+        start = time.perf_counter()
+        status = "500"
+        try:
+            response = await call_next(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            # 라벨 수 제한: 매칭된 라우트 경로만 사용
+            route = request.scope.get("route")
+            endpoint = getattr(route, "path", "other")
+            HTTP_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+            HTTP_REQUESTS.inc(endpoint=endpoint, status=status)
+
+    @app.get("/health")
+    def health() -> Dict[str, Any]:
+        return {"status": "ok"}
+
+    @app.get("/ready")
+    def ready() -> Dict[str, Any]:
+        pipeline = _pipeline()
+        return {
+            "status": "ready",
+            "chunks": len(pipeline.chunks),
+            "vector_shape": list(pipeline.vectors.shape),
+            "load_seconds": state["load_seconds"],
+        }
+
+    @app.post("/search")
+    async def search(req: SearchRequest) -> Dict[str, Any]:
+        start = time.perf_counter()
+        pipeline = _pipeline()
+        if req.rerank or req.filters:
+            results = await run_in_threadpool(
+                pipeline.search,
+                req.query,
+                top_k=req.top_k,
+                rerank=req.rerank,
+                filters=req.filters,
+            )
+        else:
+            results = await state["batcher"].submit((req.query, req.top_k))
+        return {
+            "query": req.query,
+            "results": results,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    @app.post("/batch_search")
+    def batch_search(req: BatchSearchRequest) -> Dict[str, Any]:
+        start = time.perf_counter()
+        pipeline = _pipeline()
+        if req.rerank or req.filters:
+            results = [
+                pipeline.search(
+                    q, top_k=req.top_k, rerank=req.rerank, filters=req.filters
+                )
+                for q in req.queries
+            ]
+        else:
+            results = pipeline.search_batch(req.queries, top_k=req.top_k)
+        return {
+            "queries": req.queries,
+            "results": results,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    @app.get("/stats")
+    def stats() -> Dict[str, Any]:
+        _pipeline()
+        return {
+            "microbatch": state["batcher"].stats(),
+            "circuit_breakers": default_registry.snapshot(),
+        }
+
+    @app.get("/metrics")
+    def metrics() -> Response:
+        for name, snap in default_registry.snapshot().items():
+            BREAKER_STATE.set(snap["state_code"], endpoint=name)
+            BREAKER_FAILURE_RATE.set(snap["window_failure_rate"], endpoint=name)
+            BREAKER_REJECTED.set(snap["rejected"], endpoint=name)
+        if state["batcher"] is not None:
+            batch_stats = state["batcher"].stats()
+            MICROBATCH_QUEUE_DEPTH.set(batch_stats["queue_depth"])
+            MICROBATCH_AVG_SIZE.set(batch_stats["avg_batch_size"])
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+    def _prepare_rag(req: RAGRequest):
+        pipeline = _pipeline()
+        with span("retrieval", top_k=req.top_k) as retrieval:
+            search_results = pipeline.search(req.query, top_k=req.top_k)
+            retrieval.set(results=len(search_results))
+        with span("context_assembly") as assembly:
+            context_docs = [
+                {**r, "text": pipeline.get_chunk_text(r["chunk_id"])}
+                for r in search_results
+            ]
+            prompt, context_stats = assembler.build_prompt(req.query, context_docs)
+            assembly.set(
+                prompt_tokens=context_stats["prompt_tokens"],
+                chunks_used=context_stats["chunks_used"],
+            )
+        return search_results, prompt, context_stats
+
+    @app.post("/rag")
+    def rag(req: RAGRequest) -> Dict[str, Any]:
+        start = time.perf_counter()
+        with span("rag", endpoint="/rag"):
+            search_results, prompt, context_stats = _prepare_rag(req)
+            with span("generation", generator=generator.name):
+                if search_results:
+                    try:
+                        answer = generator.generate(prompt)
+                    except Exception as e:
+                        logger.error(f"AI 답변 생성 실패: {e}")
+                        answer = generate_answer_template(req.query, search_results)
+                else:
+                    answer = generate_answer_template(req.query, search_results)
+        return {
+            "query": req.query,
+            "search_results": search_results,
+            "answer": answer,
+            "status": "success" if search_results else "no_results",
+            "prompt_tokens": context_stats["prompt_tokens"],
+            "context_stats": context_stats,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    @app.post("/rag/stream")
+    def rag_stream(req: RAGRequest) -> StreamingResponse:
+        start = time.perf_counter()
+        with span("rag", endpoint="/rag/stream"):
+            search_results, prompt, context_stats = _prepare_rag(req)
+        events = stream_rag_events(
+            req.query,
+            search_results,
+            prompt,
+            generator,
+            request_start=start,
+            extra={"prompt_tokens": context_stats["prompt_tokens"]},
+        )
+        return StreamingResponse(
+            events,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return app
+
+
+def main():
+    """서비스 실행"""
+    import uvicorn
+
+    ap = argparse.ArgumentParser(description="NebulaCon resident retrieval service")
+    ap.add_argument("--data-dir", default="data", help="DataPipelineV2 output dir")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn worker count")
+    ap.add_argument("--batch-size", type=int, default=32, help="max queries/batch")
+    ap.add_argument(
+        "--batch-wait-ms", type=float, default=5.0, help="max batch wait (ms)"
+    )
+    ap.add_argument(
+        "--context-budget", type=int, default=1024, help="RAG context token budget"
+    )
+    ap.add_argument(
+        "--generator", default="stub", choices=["stub", "vertex"], help="LLM backend"
+    )
+    ap.add_argument("--trace-file", help="append stage spans to this JSONL file")
+    args = ap.parse_args()
+
+    # 워커 프로세스는 환경 변수로 설정을 전달받음
+    os.environ[DATA_DIR_ENV] = args.data_dir
+    os.environ[BATCH_SIZE_ENV] = str(args.batch_size)
+    os.environ[BATCH_WAIT_ENV] = str(args.batch_wait_ms)
+    os.environ[CONTEXT_BUDGET_ENV] = str(args.context_budget)
+    os.environ[GENERATOR_ENV] = args.generator
+    if args.trace_file:
+        os.environ[TRACE_FILE_ENV] = args.trace_file
+    uvicorn.run(
+        "scripts.retrieval_service:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        app_dir=str(project_root),
+    )
+
+
+if __name__ == "__main__":
+    main()
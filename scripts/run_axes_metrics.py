@@ -1,5 +1,6 @@
 import json
 import pandas as pd
+from utils.ingest_cache import load_dataset
 from utils.psi import population_stability_index
 
 def compute_axes(df: pd.DataFrame):
@@ -37,7 +38,7 @@ def compute_axes(df: pd.DataFrame):
     }
 
 if __name__ == "__main__":
-    df = pd.read_csv("data/raw/sample.csv")
+    df = load_dataset("data/raw/sample.csv", columns=["feat_a"])
     metrics = compute_axes(df)
     with open("metrics/axes_run.json", "w", encoding="utf-8") as f:
         json.dump(metrics, f, indent=2)
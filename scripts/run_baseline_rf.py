@@ -1,13 +1,21 @@
 import argparse
 import json
+import sys
+from pathlib import Path
+
 import numpy as np
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import f1_score
 from sklearn.ensemble import RandomForestClassifier
 
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.ingest_cache import load_dataset  # noqa: E402
+
+
 def main(data_path: str):
-    df = pd.read_csv(data_path)
+    df = load_dataset(data_path)
     # numeric features만 (timestamp 제외)
     df_num = df.select_dtypes(include=[np.number])
     # target은 마지막 컬럼 가정
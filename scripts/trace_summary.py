@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+트레이스 파일 요약: 단계별 지연시간 분포
+
+실행:
+    python scripts/trace_summary.py traces.jsonl
+    python scripts/trace_summary.py traces.jsonl --by-path --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 경로 추가
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from utils.tracing import load_spans, summarize  # noqa: E402
+
+
+def format_table(summary: dict) -> str:
+    """요약을 고정폭 표로 변환"""
+    width = max([len("stage")] + [len(k) for k in summary])
+    columns = ["count", "errors", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    lines = [f"{'stage':<{width}}  " + "  ".join(f"{c:>9}" for c in columns)]
+    for stage, row in summary.items():
+        cells = "  ".join(f"{row[c]:>9}" for c in columns)
+        lines.append(f"{stage:<{width}}  {cells}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Summarize per-stage span latency")
+    ap.add_argument("trace_file", help="JSONL or OTLP-file trace")
+    ap.add_argument("--by-path", action="store_true", help="group by nesting path")
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    summary = summarize(load_spans(args.trace_file), by_path=args.by_path)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print(format_table(summary))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.dataset_ingest import compute_axes
+from pipelines.dataset_ingest import main as ingest_main
+from utils import axes_cache, ingest_cache
+from utils.axes_cache import cached_axes, cached_axes_file, parquet_fingerprints
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 3_000
+    y = rng.normal(size=n) + rng.random(n) * 3
+    y[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-01-01", periods=n, freq="min").astype(str),
+            "a": rng.normal(size=n),
+            "b": rng.exponential(size=n),
+            "y": y,
+        }
+    )
+
+
+def _assert_matches(metrics, df):
+    expected = compute_axes(df.copy())
+    assert list(metrics) == list(expected)
+    for key, value in expected.items():
+        got = np.nan if metrics[key] is None else metrics[key]
+        value = np.nan if value is None else value
+        assert np.isclose(got, value, rtol=1e-8, equal_nan=True), key
+
+
+def test_first_run_matches_compute_axes_then_reuses(frame, tmp_path):
+    metrics, report = cached_axes(frame, "data", str(tmp_path))
+    _assert_matches(metrics, frame)
+    assert report["reused"] == [] and len(report["recomputed"]) == 14
+
+    again, report = cached_axes(frame, "data", str(tmp_path))
+    assert report["recomputed"] == [] and report["incremental"] == []
+    assert again == pytest.approx(metrics, nan_ok=True)
+
+
+def test_only_metrics_of_changed_columns_are_recomputed(frame, tmp_path):
+    cached_axes(frame, "data", str(tmp_path))
+    changed = frame.assign(b=frame["b"] * 2)
+    metrics, report = cached_axes(changed, "data", str(tmp_path))
+    assert sorted(report["recomputed"]) == [
+        "density_k",
+        "feature_dip:b",
+        "feature_psi:b",
+        "intra_cluster_density",
+        "silhouette_approx",
+    ]
+    _assert_matches(metrics, changed)
+
+
+def test_appended_rows_update_target_statistics(frame, tmp_path):
+    cached_axes(frame.iloc[:2_500], "data", str(tmp_path))
+    metrics, report = cached_axes(frame, "data", str(tmp_path))
+    assert "sk_k_score" in report["incremental"]
+    assert "outlier_ratio" in report["incremental"]
+    assert "psi_trigger_rate" in report["recomputed"]
+    _assert_matches(metrics, frame)
+
+    # 기존 행이 바뀌면 증분 갱신하지 않는다
+    edited = frame.copy()
+    edited.loc[0, "y"] = 100.0
+    metrics, report = cached_axes(edited, "data", str(tmp_path))
+    assert report["incremental"] == []
+    _assert_matches(metrics, edited)
+
+
+def test_text_target_and_short_frames(tmp_path):
+    rng = np.random.default_rng(1)
+    for n in (20, 80):
+        df = pd.DataFrame(
+            {
+                "t": np.arange(n),
+                "a": rng.normal(size=n),
+                "y": rng.choice(["x", "z"], n),
+            }
+        )
+        metrics, _ = cached_axes(df, f"short{n}", str(tmp_path))
+        _assert_matches(metrics, df)
+
+
+def test_file_with_unchanged_statistics_is_not_read(frame, tmp_path, monkeypatch):
+    path = tmp_path / "data.parquet"
+    frame.to_parquet(path, row_group_size=1_000)
+    assert all(parquet_fingerprints(str(path)).values())
+    first, _ = cached_axes_file(str(path), str(tmp_path / "axes"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("data was read")
+
+    monkeypatch.setattr(axes_cache.pd, "read_parquet", fail)
+    second, report = cached_axes_file(str(path), str(tmp_path / "axes"))
+    assert report["recomputed"] == [] and second == pytest.approx(first, nan_ok=True)
+
+
+def test_ingest_main_uses_axes_cache(frame, tmp_path, monkeypatch):
+    monkeypatch.setenv(ingest_cache.CACHE_DIR_ENV, str(tmp_path / "ingest"))
+    monkeypatch.setenv(axes_cache.CACHE_DIR_ENV, str(tmp_path / "axes"))
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+    args = [
+        "--input",
+        str(path),
+        "--out_profile",
+        str(tmp_path / "profile.json"),
+        "--out_axes",
+        str(tmp_path / "axes.json"),
+    ]
+    ingest_main(args)
+    plain = json.loads((tmp_path / "axes.json").read_text())
+    ingest_main(args + ["--axes_cache"])
+    ingest_main(args + ["--axes_cache"])
+    cached = json.loads((tmp_path / "axes.json").read_text())
+    assert len(list((tmp_path / "axes").glob("*.json"))) == 1
+    for key in ("st_var_ratio", "sk_k_score", "dip_feature_max"):
+        assert cached[key] == pytest.approx(plain[key], rel=1e-8)
+
+
+def test_csv_edit_with_same_statistics_is_recomputed(frame, tmp_path, monkeypatch):
+    monkeypatch.setenv(ingest_cache.CACHE_DIR_ENV, str(tmp_path / "ingest"))
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+    cached_axes_file(str(path), str(tmp_path / "axes"))
+
+    # 내부 값 순서만 바꾸면 행 그룹 통계(개수/결측/최소/최대)는 그대로
+    edited = frame.assign(y=frame["y"].to_numpy()[::-1])
+    edited.to_csv(path, index=False)
+    metrics, report = cached_axes_file(str(path), str(tmp_path / "axes"))
+    assert "st_var_ratio" in report["recomputed"]
+    _assert_matches(metrics, ingest_cache.load_dataset(str(path)))
+
+
+def test_binary_target_and_flag_columns_have_no_dip(frame, tmp_path):
+    rng = np.random.default_rng(2)
+    binary = frame.assign(
+        flag=rng.integers(0, 2, len(frame)), y=rng.integers(0, 2, len(frame))
+    )
+    expected = compute_axes(binary.copy())
+    assert expected["dip_stat"] is None and expected["dip_pvalue"] is None
+    assert expected["dip_feature_max"] < 0.05  # a, b만 (flag 제외)
+    metrics, _ = cached_axes(binary, "binary", str(tmp_path))
+    _assert_matches(metrics, binary)
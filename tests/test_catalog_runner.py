@@ -0,0 +1,130 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines import catalog_runner
+from pipelines.catalog_runner import (
+    axes_table,
+    discover_datasets,
+    main,
+    run_catalog,
+)
+from utils import ingest_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_in_tmp(tmp_path, monkeypatch):
+    monkeypatch.setenv(ingest_cache.CACHE_DIR_ENV, str(tmp_path / "ingest"))
+
+
+def _write(path, seed, n=300):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-01-01", periods=n, freq="h").astype(str),
+            "a": rng.normal(size=n),
+            "b": rng.normal(size=n) + seed,
+            "y": rng.integers(0, 2, n),
+        }
+    ).to_csv(path, index=False)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    root = tmp_path / "data"
+    root.mkdir()
+    for i in range(3):
+        _write(root / f"set{i}.csv", seed=i)
+    return root
+
+
+def test_discover_directory_and_manifest(catalog, tmp_path):
+    names = [d["name"] for d in discover_datasets(str(catalog))]
+    assert names == ["set0.csv", "set1.csv", "set2.csv"]
+
+    manifest = tmp_path / "catalog.json"
+    manifest.write_text(json.dumps([{"name": "first", "path": "data/set0.csv"}]))
+    assert discover_datasets(str(manifest)) == [
+        {"name": "first", "path": str(tmp_path / "data" / "set0.csv")}
+    ]
+    listing = tmp_path / "catalog.txt"
+    listing.write_text("# datasets\ndata/set1.csv\n")
+    assert discover_datasets(str(listing))[0]["name"] == "set1.csv"
+
+
+def test_run_catalog_parallel_then_cached(catalog, tmp_path):
+    cache = tmp_path / "cache"
+    datasets = discover_datasets(str(catalog))
+    first = run_catalog(datasets, cache_dir=str(cache), workers=2, timeout=120)
+    assert [e["status"] for e in first] == ["ok"] * 3
+    assert first[0]["profile"]["rows"] == 300
+    assert "psi_trigger_rate" in first[0]["axes"]
+
+    _write(catalog / "set2.csv", seed=9)
+    second = run_catalog(datasets, cache_dir=str(cache), workers=2, timeout=120)
+    assert [e["status"] for e in second] == ["cached", "cached", "ok"]
+    assert second[0]["axes"]["density_k"] == first[0]["axes"]["density_k"]
+
+    table = axes_table(second)
+    assert list(table["name"]) == ["set0.csv", "set1.csv", "set2.csv"]
+    assert {"rows", "status", "st_var_ratio", "intra_cluster_density"} <= set(table)
+
+
+def test_unchanged_files_are_not_rehashed(catalog, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    datasets = discover_datasets(str(catalog))
+    first = run_catalog(datasets, cache_dir=str(cache), workers=0)
+
+    hashed = []
+    original = ingest_cache.file_hash
+
+    def spy(path, *args):
+        hashed.append(str(path))
+        return original(path, *args)
+
+    monkeypatch.setattr(ingest_cache, "file_hash", spy)
+    monkeypatch.setattr(catalog_runner, "file_hash", spy, raising=False)
+    again = run_catalog(datasets, cache_dir=str(cache), workers=0)
+    assert hashed == []
+    assert [e["hash"] for e in again] == [e["hash"] for e in first]
+
+    _write(catalog / "set1.csv", seed=7)
+    third = run_catalog(datasets, cache_dir=str(cache), workers=0)
+    assert hashed == [str((catalog / "set1.csv").resolve())]
+    assert [e["status"] for e in third] == ["cached", "ok", "cached"]
+
+
+def _slow_or_broken(path):
+    if path.endswith("set1.csv"):
+        time.sleep(30)
+    if path.endswith("set2.csv"):
+        raise ValueError("broken")
+    return {"profile": {"rows": 1, "cols": 1}, "axes": {}, "seconds": 0.0}
+
+
+def test_timeouts_and_errors_are_isolated(catalog, tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_runner, "process_dataset", _slow_or_broken)
+    start = time.monotonic()
+    entries = run_catalog(
+        discover_datasets(str(catalog)),
+        cache_dir=str(tmp_path / "cache"),
+        workers=3,
+        timeout=1.0,
+    )
+    assert time.monotonic() - start < 10
+    assert [e["status"] for e in entries] == ["ok", "timeout", "error"]
+    assert "broken" in entries[2]["error"]
+    # 실패한 데이터셋은 캐시하지 않는다
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 1
+
+
+def test_main_writes_consolidated_table(catalog, tmp_path):
+    out = tmp_path / "out"
+    main(["--catalog", str(catalog), "--out_dir", str(out), "--workers", "0"])
+    table = pd.read_parquet(out / "axes_table.parquet")
+    records = json.loads((out / "axes_table.json").read_text())
+    assert len(table) == len(records) == 3
+    assert set(table["status"]) == {"ok"}
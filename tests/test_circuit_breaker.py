@@ -0,0 +1,124 @@
+import pytest
+
+from utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    HealthRegistry,
+)
+from utils.generation import GuardedGenerator, StubGenerator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _boom(*args, **kwargs):
+    raise RuntimeError("API not supported")
+
+
+def _open_breaker(clock, **kwargs):
+    breaker = CircuitBreaker("bq", min_calls=3, open_seconds=10, clock=clock, **kwargs)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            breaker.call(_boom)
+    return breaker
+
+
+def test_opens_after_failure_rate_and_rejects_fast():
+    breaker = _open_breaker(FakeClock())
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_trial_closes_or_reopens():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now = 10.0
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(RuntimeError):
+        breaker.call(_boom)
+    assert breaker.state == OPEN
+
+    clock.now = 20.0
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_limited_trials():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now = 10.0
+    assert breaker.allow() and not breaker.allow()
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker("v", min_calls=2, slow_call_ms=5)
+    for _ in range(2):
+        breaker.record(50.0, ok=True)
+    assert breaker.state == OPEN
+
+
+def test_registry_routes_to_fallback_and_reports():
+    registry = HealthRegistry(min_calls=2, open_seconds=60)
+    search = registry.wrap("bq.search", _boom, fallback=lambda q: ["local"])
+    assert [search("q") for _ in range(3)] == [["local"]] * 3
+    snap = registry.snapshot()["bq.search"]
+    assert snap["state"] == OPEN and snap["fallbacks"] == 3
+    assert snap["calls"] == 2 and snap["rejected"] == 1
+
+
+def test_guarded_generator_falls_back_to_local():
+    class Broken:
+        name = "vertex"
+
+        def stream(self, prompt):
+            raise RuntimeError("503")
+            yield
+
+    breaker = CircuitBreaker("vertex.generate", min_calls=1)
+    gen = GuardedGenerator(Broken(), StubGenerator(), breaker)
+    prompt = "내용: hello world"
+    assert gen.generate(prompt) == "hello world"
+    assert breaker.state == OPEN
+    assert gen.generate(prompt) == "hello world"
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_guarded_stream_closed_early_settles_half_open_trial():
+    class Cancelled(BaseException):
+        pass
+
+    class Slow:
+        def __init__(self, cancel):
+            self.cancel = cancel
+
+        def stream(self, prompt):
+            if self.cancel:
+                raise Cancelled()  # 첫 토큰 전에 요청이 취소됨
+            yield "hi"
+            yield " there"
+
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now += 10
+    assert breaker.state == HALF_OPEN
+
+    stream = GuardedGenerator(Slow(cancel=True), StubGenerator(), breaker).stream("")
+    with pytest.raises(Cancelled):
+        next(stream)
+    # 시험 슬롯이 반환되어 다음 호출이 다시 시험할 수 있다
+    assert breaker.state == HALF_OPEN
+
+    stream = GuardedGenerator(Slow(cancel=False), StubGenerator(), breaker).stream("")
+    assert next(stream) == "hi"
+    stream.close()
+    assert breaker.state == CLOSED
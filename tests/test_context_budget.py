@@ -0,0 +1,46 @@
+from utils.context_budget import ContextAssembler, split_sentences
+
+DOC_A = (
+    "BigQuery partitioning reduces scanned bytes. "
+    "The weather was nice today. "
+    "Clustering keeps related rows together for faster queries."
+)
+
+
+def test_split_sentences_handles_spaced_punctuation():
+    assert split_sentences("first one . second one ? third") == [
+        "first one.",
+        "second one?",
+        "third",
+    ]
+
+
+def test_trim_keeps_query_relevant_sentences():
+    assembler = ContextAssembler(max_sentences=2)
+    kept, total = assembler.trim("bigquery partitioning clustering", DOC_A)
+    assert total == 3
+    assert all("weather" not in s for s in kept)
+
+
+def test_budget_is_respected_and_duplicates_skipped():
+    results = [
+        {"title": "a", "text": DOC_A, "similarity": 0.9},
+        {"title": "a2", "text": DOC_A, "similarity": 0.8},
+        {"title": "b", "text": "unrelated text " * 200, "similarity": 0.1},
+    ]
+    assembler = ContextAssembler(budget_tokens=40)
+    prompt, stats = assembler.build_prompt("bigquery partitioning", results)
+    assert stats["context_tokens"] <= 40
+    assert stats["chunks_deduped"] == 1
+    assert stats["prompt_tokens"] > stats["context_tokens"]
+    assert "BigQuery partitioning" in prompt
+
+
+def test_build_prompt_uses_given_template():
+    results = [{"title": "a", "text": DOC_A, "similarity_score": 0.9}]
+    assembler = ContextAssembler(score_key="similarity_score")
+    template = "Q={query}\nC={context}\n"
+    prompt, stats = assembler.build_prompt("bigquery", results, template=template)
+    assert prompt.startswith("Q=bigquery\nC=제목: a\n내용: ")
+    assert stats["prompt_tokens"] == assembler.counter.count(prompt)
+    assert stats["chunks_used"] == 1
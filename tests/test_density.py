@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_blobs
+
+from pipelines.dataset_ingest import compute_density_metrics
+from utils.density import density_metrics, reservoir_sample, sample_indices
+
+
+def test_reservoir_sample_is_uniform_over_chunks():
+    data = np.arange(10_000)[:, None]
+    chunks = np.array_split(data, 37)
+    sample = reservoir_sample(chunks, 500, random_state=0)
+    assert sample.shape == (500, 1) and len(np.unique(sample)) == 500
+    # 앞/뒤 절반에서 고르게 뽑힌다
+    assert 200 < (sample[:, 0] < 5_000).sum() < 300
+    assert len(reservoir_sample(np.array_split(data[:10], 3), 50)) == 10
+
+
+def test_stratified_sample_keeps_proportions():
+    strata = np.r_[np.zeros(9_000), np.ones(900), np.full(100, 2)]
+    idx = sample_indices(len(strata), 1_000, strata, random_state=0)
+    assert len(idx) == 1_000 and len(np.unique(idx)) == 1_000
+    assert np.bincount(strata[idx].astype(int)).tolist() == [900, 90, 10]
+    assert sample_indices(50, 100).tolist() == list(range(50))
+
+
+def test_density_metrics_separates_blobs_and_reports_bounds():
+    X, _ = make_blobs(n_samples=4_000, centers=3, n_features=5, random_state=0)
+    full = density_metrics(X, silhouette_sample=1_000)
+    assert not full["sampled"] and full["intra_cluster_density_ci95"] == 0.0
+    assert full["silhouette_approx"] > 0.3 and full["silhouette"] > 0.5
+
+    sampled = density_metrics(X, max_rows=1_000)
+    assert sampled["sampled"] and sampled["rows_used"] == 1_000
+    assert sampled["intra_cluster_density_ci95"] > 0
+    assert sampled["intra_cluster_density"] == pytest.approx(
+        full["intra_cluster_density"], abs=0.1
+    )
+
+    noise = np.random.default_rng(0).normal(size=(2_000, 4))
+    assert density_metrics(noise)["silhouette_approx"] == 0.0
+    assert density_metrics(noise[:10]) is None
+
+
+def test_compute_density_metrics_runtime_is_bounded():
+    X, _ = make_blobs(n_samples=1_000_000, centers=4, n_features=6, random_state=1)
+    X[::1000, 0] = np.nan
+    start = time.perf_counter()
+    intra, sil, k = compute_density_metrics(X)
+    assert time.perf_counter() - start < 5.0
+    assert 0 < intra < 1 and sil > 0.3 and 2 <= k <= 5
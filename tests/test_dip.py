@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+import pytest
+
+from utils.dip import (
+    _hull,
+    approximate_dip,
+    dip_columns,
+    dip_pvalue,
+    dip_statistic,
+    dip_test,
+    fft_kde,
+)
+
+
+def _samples():
+    rng = np.random.default_rng(42)
+    return {
+        "normal": rng.normal(size=500),
+        "bimodal": np.r_[rng.normal(size=300), rng.normal(4, 1, size=300)],
+        "ties": rng.integers(0, 8, size=400).astype(float),
+        "skewed": np.round(rng.exponential(size=1000), 2),
+    }
+
+
+# R diptest / python diptest 패키지의 dipstat 값
+REFERENCE = {
+    "normal": 0.012596684658595706,
+    "bimodal": 0.05418034887306509,
+    "ties": 0.075,
+    "skewed": 0.0095,
+}
+
+
+@pytest.mark.parametrize("name", sorted(REFERENCE))
+def test_dip_matches_reference_implementation(name):
+    x = _samples()[name]
+    assert dip_statistic(x) == pytest.approx(REFERENCE[name], rel=1e-12)
+    # 순서와 NaN에 무관
+    shuffled = np.r_[np.random.default_rng(0).permutation(x), np.nan]
+    assert dip_statistic(shuffled) == pytest.approx(REFERENCE[name], rel=1e-12)
+
+
+def test_dip_bounds():
+    assert dip_statistic([0.0] * 50 + [1.0] * 50) == 0.25
+    assert dip_statistic(np.ones(20)) == 1 / 40
+    assert dip_statistic([np.nan]) is None
+
+
+def test_pvalues_separate_unimodal_from_bimodal():
+    samples = _samples()
+    assert dip_test(samples["normal"])["p_value"] > 0.5
+    bimodal = dip_test(samples["bimodal"])
+    assert bimodal["n"] == 600 and bimodal["p_value"] < 0.01
+    assert dip_pvalue(0.0, 100_000) == 1.0 and dip_pvalue(0.25, 1_000) == 0.0
+
+
+def test_dip_columns_matches_per_column():
+    samples = _samples()
+    X = np.column_stack([samples["normal"][:300], samples["bimodal"][:300]])
+    X[::10, 0] = np.nan
+    result = dip_columns(X)
+    assert result["n"].tolist() == [270, 300]
+    for j in range(2):
+        assert result["dip"][j] == pytest.approx(dip_statistic(X[:, j]))
+
+
+def test_fft_kde_matches_direct_kde():
+    x = _samples()["bimodal"]
+    grid = np.linspace(x.min(), x.max(), 256)
+    bw = np.std(x) * len(x) ** (-1 / 5)
+    direct = np.exp(-0.5 * ((x[None, :] - grid[:, None]) / bw) ** 2).mean(1) / bw
+    assert np.abs(fft_kde(x, 256) - direct).max() < 0.01 * direct.max()
+    assert approximate_dip(x) > 0.0
+    assert approximate_dip(_samples()["normal"]) == 0.0
+
+
+def test_hull_cascade_stays_linear():
+    # 볼록 사슬 뒤의 먼 점 하나: 가지치기가 한 번에 한 점만 지우는 최악 입력
+    n = 20_000
+    x = np.r_[np.sqrt(np.linspace(0.0, 1.0, n)), 10.0]
+    start = time.perf_counter()
+    lower = _hull(x, np.arange(n + 1), lower=True)
+    dip = dip_statistic(x)
+    assert time.perf_counter() - start < 2.0
+    assert lower[0] == 0 and lower[-1] == n and len(lower) < 100
+    assert dip == pytest.approx(1 / (2 * (n + 1)))
+    assert dip_statistic(-x) == pytest.approx(dip)
+
+
+def test_columns_with_fewer_than_three_values_have_no_dip():
+    rng = np.random.default_rng(5)
+    flag = rng.integers(0, 2, 500).astype(float)
+    assert dip_statistic(flag) > 0.2  # 두 점 분포의 dip은 구성상 1/4 근처
+    assert dip_test(flag) == {"dip": None, "p_value": None, "n": 500}
+    result = dip_columns(np.c_[flag, rng.normal(size=500), np.full(500, 2.0)])
+    assert np.isnan(result["dip"][0]) and np.isnan(result["dip"][2])
+    assert result["dip"][1] < 0.05
+    assert result["n"].tolist() == [500, 500, 500]
@@ -0,0 +1,127 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.drift import (
+    DriftMonitor,
+    HistogramSketch,
+    load_psi_thresholds,
+    psi_level,
+    sketch_ks,
+    sketch_psi,
+)
+from utils.psi import psi_from_counts
+
+
+def test_sketch_merge_equals_single_pass_and_is_constant_size():
+    rng = np.random.default_rng(0)
+    edges = np.linspace(-2, 2, 9)
+    values = rng.normal(size=10_000)
+    whole = HistogramSketch(edges).update(values)
+    parts = HistogramSketch(edges)
+    for chunk in np.array_split(values, 7):
+        parts.merge(HistogramSketch(edges).update(chunk))
+    assert np.array_equal(whole.counts, parts.counts)
+    assert whole.count == 10_000 and len(whole.counts) == 10
+    assert (parts.min, parts.max) == (values.min(), values.max())
+    with pytest.raises(ValueError):
+        whole.merge(HistogramSketch([0.0]))
+
+
+def test_sketch_round_trips_through_json():
+    sketch = HistogramSketch([0.0, 1.0]).update([-1, 0.5, 2, np.nan])
+    restored = HistogramSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    assert restored.counts.tolist() == [1, 1, 1] and restored.nan_count == 1
+    assert HistogramSketch.from_dict(HistogramSketch([0.0]).to_dict()).count == 0
+
+
+def test_sketch_psi_and_ks():
+    edges = np.linspace(-3, 3, 19)
+    rng = np.random.default_rng(1)
+    a = HistogramSketch(edges).update(rng.normal(size=5000))
+    b = HistogramSketch(edges).update(rng.normal(size=5000))
+    shifted = HistogramSketch(edges).update(rng.normal(1.0, size=5000))
+    assert sketch_psi(a, b) < 0.05 < sketch_psi(a, shifted)
+    assert sketch_psi(a, shifted) == pytest.approx(
+        float(psi_from_counts(a.counts, shifted.counts))
+    )
+    assert sketch_ks(a, b) < 0.05 and sketch_ks(a, shifted) == pytest.approx(
+        0.38, abs=0.05
+    )
+
+
+def test_thresholds_from_config():
+    thresholds = load_psi_thresholds()
+    assert thresholds == {"minor": 0.1, "moderate": 0.25, "major": 0.5}
+    assert psi_level(0.05, thresholds) is None
+    assert psi_level(0.3, thresholds) == "moderate"
+    assert psi_level(0.9, thresholds) == "major"
+
+
+def test_monitor_alerts_on_drifted_feature(tmp_path):
+    rng = np.random.default_rng(2)
+    received = []
+    monitor = DriftMonitor(bins=10, on_alert=received.append, max_buckets=3)
+    for day, shift in enumerate([0.0, 0.0, 0.0, 1.5]):
+        for _ in range(4):
+            batch = pd.DataFrame(
+                {
+                    "stable": rng.normal(size=500),
+                    "moving": rng.normal(shift, size=500),
+                    "name": "x",
+                }
+            )
+            monitor.update(batch, bucket=f"day{day}")
+
+    # 가장 오래된 버킷은 보존 한도로 제거
+    assert list(monitor.buckets) == ["day1", "day2", "day3"]
+    assert monitor.check("day2") == []
+    alerts = monitor.check("day3", baseline="day1")
+    assert [a["feature"] for a in alerts] == ["moving"]
+    assert alerts[0]["level"] == "major" and received == alerts
+
+    week = monitor.merged(["day1", "day2"], "stable")
+    assert week.count == 4000
+
+    path = monitor.save(str(tmp_path / "drift.json"))
+    restored = DriftMonitor.load(path)
+    assert restored.compare("moving", "day1", "day3") == monitor.compare(
+        "moving", "day1", "day3"
+    )
+
+
+def test_late_batch_keeps_bucket_order():
+    rng = np.random.default_rng(3)
+    monitor = DriftMonitor(bins=10, max_buckets=2)
+    monitor.update({"x": rng.normal(size=500)}, bucket="2025-01-01")
+    monitor.update({"x": rng.normal(2.0, size=500)}, bucket="2025-01-02")
+    monitor.update({"x": rng.normal(size=500)}, bucket="2025-01-01")  # 늦은 배치
+    assert list(monitor.buckets) == ["2025-01-01", "2025-01-02"]
+    alerts = monitor.check("2025-01-02")
+    assert alerts and alerts[0]["baseline"] == "2025-01-01"
+
+    # 보존 한도는 키 기준으로 가장 오래된 버킷을 버린다
+    monitor.update({"x": rng.normal(size=500)}, bucket="2025-01-03")
+    monitor.update({"x": rng.normal(size=500)}, bucket="2024-12-31")
+    assert list(monitor.buckets) == ["2025-01-02", "2025-01-03"]
+
+
+def test_constant_first_batch_does_not_freeze_edges(tmp_path):
+    rng = np.random.default_rng(4)
+    monitor = DriftMonitor(bins=10)
+    monitor.update({"x": np.zeros(500)}, bucket="d0")
+    assert "x" not in monitor.edges and monitor.buckets["d0"] == {}
+
+    restored = DriftMonitor.load(monitor.save(str(tmp_path / "drift.json")))
+    for m in (monitor, restored):
+        m.update({"x": rng.normal(size=500)}, bucket="d1")
+        assert len(np.unique(m.edges["x"])) > 3  # 상수 배치만으로는 전부 0
+        assert m.sketch("d0", "x").count == 500
+        assert m.sketch("d1", "x").count == 500
+        m.update({"x": rng.normal(size=500)}, bucket="d2")
+        m.update({"x": rng.normal(1.5, size=500)}, bucket="d3")
+        assert m.check("d1")[0]["baseline"] == "d0"
+        assert m.check("d2") == []
+        assert m.check("d3")[0]["level"] == "major"
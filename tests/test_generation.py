@@ -0,0 +1,33 @@
+import json
+
+from utils.generation import StubGenerator, sse_event, stream_rag_events
+
+PROMPT = "질문: q\n\n참고 정보:\n제목: t\n내용: alpha beta gamma\n"
+
+
+def _parse(stream):
+    events = []
+    for frame in stream:
+        head, data = frame.strip().split("\n")
+        events.append((head[len("event: ") :], json.loads(data[len("data: ") :])))
+    return events
+
+
+def test_stub_generator_streams_context_words():
+    assert list(StubGenerator().stream(PROMPT)) == ["alpha", " beta", " gamma"]
+
+
+def test_sse_event_framing():
+    assert sse_event("token", {"text": "a"}) == 'event: token\ndata: {"text": "a"}\n\n'
+
+
+def test_stream_emits_retrieval_first_and_timings_last():
+    events = _parse(
+        stream_rag_events("q", [{"chunk_id": "1_0"}], PROMPT, StubGenerator())
+    )
+    names = [name for name, _ in events]
+    assert names[0] == "retrieval" and names[-1] == "done"
+    assert names.count("token") == 3
+    done = events[-1][1]
+    assert done["tokens"] == 3
+    assert done["ttft_ms"] <= done["total_ms"]
@@ -0,0 +1,117 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.dataset_ingest import compute_axes
+from pipelines.dataset_ingest import main as ingest_main
+from utils import grouped_axes as grouped_axes_module
+from utils import ingest_cache
+from utils.grouped_axes import AXES_COLUMNS, grouped_axes, segment_quantiles
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    parts = []
+    for g, n in enumerate([25, 60, 150, 400, 39, 41]):
+        parts.append(
+            pd.DataFrame(
+                {
+                    "id": f"s{g}",
+                    "t": pd.date_range("2025-01-01", periods=n, freq="min"),
+                    "a": rng.normal(size=n),
+                    "b": rng.normal(size=n) * (g + 1),
+                    "y": rng.normal(size=n) + (rng.random(n) < 0.3) * 4,
+                }
+            )
+        )
+    df = pd.concat(parts).sample(frac=1.0, random_state=1).reset_index(drop=True)
+    df.loc[df.sample(frac=0.05, random_state=2).index, "y"] = np.nan
+    return df
+
+
+def test_each_group_matches_compute_axes(frame):
+    result = compute_axes(frame, group_col="id", density=True)
+    assert list(result.columns) == ["rows"] + AXES_COLUMNS
+    assert result["rows"].tolist() == [25, 60, 150, 400, 39, 41]
+    for key, sub in frame.groupby("id"):
+        expected = compute_axes(sub.drop(columns="id").reset_index(drop=True))
+        for metric, value in expected.items():
+            value = np.nan if value is None else value
+            got = result.loc[key, metric]
+            assert np.isclose(got, value, rtol=1e-6, equal_nan=True), (key, metric)
+
+
+def test_short_groups_follow_compute_axes_thresholds(frame):
+    result = grouped_axes(frame, "id", dip=False, density=False)
+    assert np.isnan(result.loc["s0", "psi_feature_max"])
+    assert result.loc["s1", "psi_feature_max"] == 0.0
+    assert result.loc["s3", "psi_feature_max"] > 0.0
+    assert result["intra_cluster_density"].isna().all()
+
+
+def test_process_pool_matches_in_process(frame):
+    serial = grouped_axes(frame, "id", dip=True, density=False)
+    pooled = grouped_axes(frame, "id", workers=2, dip=True, density=False)
+    pd.testing.assert_frame_equal(serial, pooled)
+
+
+def test_defaults_use_all_cpus_and_skip_density(frame, monkeypatch):
+    seen = []
+    run = grouped_axes_module._run_per_group
+    monkeypatch.setattr(
+        grouped_axes_module,
+        "_run_per_group",
+        lambda items, workers: seen.append(workers) or run(items, 0),
+    )
+    monkeypatch.setattr(grouped_axes_module.os, "cpu_count", lambda: 6)
+    result = compute_axes(frame, group_col="id")
+    assert seen == [6]
+    assert result["intra_cluster_density"].isna().all()
+    assert result["dip_stat"].notna().any()
+
+
+def test_segment_quantiles_match_nanquantile():
+    rng = np.random.default_rng(3)
+    values = rng.normal(size=500)
+    values[rng.random(500) < 0.1] = np.nan
+    codes = rng.integers(0, 7, 500)
+    q = np.array([0.1, 0.5, 0.9])
+    result = segment_quantiles(values, codes, 8, q)
+    for g in range(7):
+        np.testing.assert_allclose(result[g], np.nanquantile(values[codes == g], q))
+    assert np.isnan(result[7]).all()
+
+
+def test_ingest_main_writes_group_metrics(tmp_path, frame, monkeypatch):
+    monkeypatch.setenv(ingest_cache.CACHE_DIR_ENV, str(tmp_path / "cache"))
+    path = tmp_path / "data.csv"
+    frame[["t", "id", "a", "b", "y"]].to_csv(path, index=False)
+    out = tmp_path / "groups.json"
+    ingest_main(
+        [
+            "--input",
+            str(path),
+            "--out_profile",
+            str(tmp_path / "profile.json"),
+            "--out_axes",
+            str(tmp_path / "axes.json"),
+            "--group_col",
+            "id",
+            "--out_axes_groups",
+            str(out),
+        ]
+    )
+    records = json.loads(out.read_text())
+    assert [r["id"] for r in records] == [f"s{g}" for g in range(6)]
+    assert records[3]["rows"] == 400
+
+
+def test_binary_target_groups_have_no_dip(frame):
+    rng = np.random.default_rng(4)
+    binary = frame.assign(y=rng.integers(0, 2, len(frame)).astype(float))
+    result = grouped_axes(binary, "id", density=False)
+    assert result["dip_stat"].isna().all()
+    assert (result["dip_feature_max"].dropna() < 0.08).all()
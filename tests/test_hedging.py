@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from utils.hedging import BackendHealth, HedgedExecutor, hedge_cancelled, on_cancel
+
+
+def _sleepy(delay_s, result):
+    def fn(query):
+        time.sleep(delay_s)
+        return result
+
+    return fn
+
+
+def _failing(query):
+    raise RuntimeError("backend down")
+
+
+@pytest.fixture
+def make_executor():
+    executors = []
+
+    def make(backends, **kwargs):
+        executor = HedgedExecutor(backends, **kwargs)
+        executors.append(executor)
+        return executor
+
+    yield make
+    for executor in executors:
+        executor.close()
+
+
+def test_fast_primary_wins_without_hedging(make_executor):
+    ex = make_executor(
+        [("primary", _sleepy(0, ["p"])), ("fallback", _sleepy(0, ["f"]))],
+        hedge_delay_ms=200,
+    )
+    result, info = ex.run("q")
+    assert result == ["p"] and info["launched"] == ["primary"]
+
+
+def test_slow_primary_is_hedged(make_executor):
+    ex = make_executor(
+        [("primary", _sleepy(0.5, ["p"])), ("fallback", _sleepy(0, ["f"]))],
+        hedge_delay_ms=20,
+    )
+    result, info = ex.run("q")
+    assert result == ["f"] and info["winner"] == "fallback"
+    assert info["latency_ms"] < 400
+    assert ex.stats()["hedges"] == 1
+
+
+def test_failed_primary_falls_through_immediately(make_executor):
+    ex = make_executor(
+        [("primary", _failing), ("fallback", _sleepy(0, ["f"]))],
+        hedge_delay_ms=1000,
+    )
+    result, info = ex.run("q")
+    assert result == ["f"] and "primary" in info["errors"]
+    assert info["latency_ms"] < 500
+
+
+def test_empty_result_is_a_success_by_default(make_executor):
+    ex = make_executor([("a", _sleepy(0, [])), ("b", _sleepy(0, ["b"]))])
+    result, info = ex.run("q", default=None)
+    assert result == [] and info["winner"] == "a"
+    time.sleep(0.05)
+    assert ex.health["a"].errors == 0
+
+
+def test_custom_validity_rejects_empty_results(make_executor):
+    ex = make_executor([("a", _sleepy(0, [])), ("b", _failing)], is_valid=bool)
+    result, info = ex.run("q", default=[])
+    assert result == [] and info["winner"] is None
+    assert info["errors"]["a"] == "invalid result"
+    assert ex.stats()["failures"] == 1
+
+
+def test_losing_backend_is_cancelled(make_executor):
+    cancelled = threading.Event()
+
+    def slow_job(query):
+        on_cancel(cancelled.set)  # 실제로는 bigquery job.cancel
+        assert cancelled.wait(2.0)
+        assert hedge_cancelled()
+        raise RuntimeError("job cancelled")
+
+    ex = make_executor(
+        [("primary", slow_job), ("fallback", _sleepy(0, ["f"]))], hedge_delay_ms=20
+    )
+    result, info = ex.run("q")
+    assert result == ["f"] and info["winner"] == "fallback"
+    assert cancelled.wait(1.0)
+    assert ex.stats()["abandoned"] == 1
+    time.sleep(0.05)
+    # 취소된 호출의 예외는 백엔드 실패로 집계하지 않음
+    assert ex.health["primary"].calls == 0
+    on_cancel(lambda: None)  # 헤징 밖에서는 아무 일도 하지 않음
+    assert not hedge_cancelled()
+
+
+def test_degraded_backend_hedges_immediately(make_executor):
+    ex = make_executor(
+        [("primary", _failing), ("fallback", _sleepy(0, ["f"]))],
+        hedge_delay_ms=1000,
+    )
+    for _ in range(6):
+        ex.run("q")
+    time.sleep(0.05)
+    assert ex.health["primary"].degraded
+    assert ex.hedge_delay("primary") == 0.0
+
+
+def test_health_quantile_drives_auto_delay():
+    health = BackendHealth(min_samples=3)
+    assert health.latency_quantile(0.95) is None
+    for ms in (10, 20, 30, 40):
+        health.record(ms, ok=True)
+    health.record(999, ok=False)
+    assert health.latency_quantile(0.5) == 25.0
+    assert health.error_rate == pytest.approx(0.2)
+    assert not health.degraded
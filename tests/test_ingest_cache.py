@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.dataset_ingest import compute_axes, ingest_csv, profile
+from utils import ingest_cache
+from utils.ingest_cache import dataset_columns, infer_dtypes, load_dataset
+from utils.profiling import head_hash, profile_file
+
+
+@pytest.fixture(autouse=True)
+def cache_in_tmp(tmp_path, monkeypatch):
+    monkeypatch.setenv(ingest_cache.CACHE_DIR_ENV, str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-01-01", periods=n, freq="h").astype(str),
+            "feat_a": rng.normal(size=n),
+            "count": rng.integers(0, 100, n),
+            "city": rng.choice(["seoul", "busan"], n),
+            "note": [f"row {i}" for i in range(n)],
+            "label": rng.choice(["a", "b", "c"], n),
+        }
+    )
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_infer_dtypes_downcasts_and_parses():
+    df = pd.DataFrame(
+        {
+            "t": ["2025-01-01", "2025-01-02", None, "2025-01-04"],
+            "f": [1.5, 2.5, np.nan, 0.0],
+            "i": [1, 2, 3, 4],
+            "c": ["x", "x", "y", "x"],
+            "free": ["a", "b", "c", "d"],
+        }
+    )
+    out = infer_dtypes(df)
+    assert pd.api.types.is_datetime64_any_dtype(out["t"]) and out["t"].isna().sum() == 1
+    assert out["f"].dtype == np.float32
+    assert out["i"].dtype == np.int8
+    assert isinstance(out["c"].dtype, pd.CategoricalDtype)
+    assert not isinstance(out["free"].dtype, pd.CategoricalDtype)
+    assert infer_dtypes(df, float32=False)["f"].dtype == np.float64
+
+
+def test_first_read_writes_parquet_and_later_reads_prune(
+    csv_path, cache_in_tmp, monkeypatch
+):
+    df = load_dataset(str(csv_path))
+    assert len(list(cache_in_tmp.glob("*.parquet"))) == 1
+    assert pd.api.types.is_datetime64_any_dtype(df["timestamp"])
+    assert isinstance(df["label"].dtype, pd.CategoricalDtype)
+
+    # 두 번째 읽기는 CSV를 다시 파싱하지 않는다
+    def no_parse(*args, **kwargs):
+        raise AssertionError("CSV parsed again")
+
+    monkeypatch.setattr(ingest_cache.pd, "read_csv", no_parse)
+    part = load_dataset(str(csv_path), columns=["feat_a"])
+    assert list(part.columns) == ["feat_a"]
+    np.testing.assert_array_equal(part["feat_a"], df["feat_a"])
+    assert dataset_columns(str(csv_path))[-1] == "label"
+
+
+def test_cache_key_follows_content_not_mtime(csv_path, cache_in_tmp):
+    load_dataset(str(csv_path))
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    load_dataset(str(csv_path))
+    assert len(list(cache_in_tmp.glob("*.parquet"))) == 1
+
+    csv_path.write_text(csv_path.read_text().replace("seoul", "daegu"))
+    assert "daegu" in load_dataset(str(csv_path), columns=["city"])["city"].values
+    assert len(list(cache_in_tmp.glob("*.parquet"))) == 2
+
+
+def test_axes_on_cached_frame_match_uncached(csv_path):
+    cached = compute_axes(ingest_csv(str(csv_path)))
+    direct = compute_axes(ingest_csv(str(csv_path), use_cache=False))
+    assert cached.keys() == direct.keys()
+    assert cached["psi_trigger_rate"] == pytest.approx(direct["psi_trigger_rate"])
+    assert cached["density_k"] == direct["density_k"]
+
+
+def test_profile_hash_of_cached_frame_matches_raw_csv(csv_path):
+    expected = profile(pd.read_csv(csv_path))["hash_head100"]
+    ingest_csv(str(csv_path))
+    cached = ingest_csv(str(csv_path))
+    assert profile(cached, path=str(csv_path))["hash_head100"] == expected
+    assert head_hash(str(csv_path)) == expected
+    assert profile_file(str(csv_path))["hash_head100"] == expected
@@ -0,0 +1,99 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+from scripts.nebula_cli import main
+from utils.loadgen import (
+    arrival_schedule,
+    check_slo,
+    load_query_log,
+    run_load,
+    slo_from_config,
+    synthesize_queries,
+)
+from utils.tracing import span
+
+
+def test_arrival_schedules_hit_target_rate():
+    assert arrival_schedule(4, 2.0, "constant") == [0.0, 0.5, 1.0, 1.5]
+    offsets = arrival_schedule(2000, 50.0, seed=0)
+    assert offsets[0] == 0.0 and np.all(np.diff(offsets) >= 0)
+    assert len(offsets) / offsets[-1] == pytest.approx(50.0, rel=0.1)
+    with pytest.raises(ValueError):
+        arrival_schedule(3, 0.0)
+
+
+def test_synthesized_queries_come_from_corpus():
+    corpus = ["BigQuery vector search performance tuning", {"text": "lstm training"}]
+    queries = synthesize_queries(corpus, 50, seed=1)
+    assert queries == synthesize_queries(corpus, 50, seed=1)
+    vocab = {"bigquery", "vector", "search", "performance", "tuning", "lstm"}
+    vocab.add("training")
+    assert all(2 <= len(q.split()) <= 5 and set(q.split()) <= vocab for q in queries)
+
+
+def test_query_log_formats(tmp_path):
+    (tmp_path / "q.jsonl").write_text('{"query": "a b"}\n\n{"query": "c"}\n')
+    (tmp_path / "q.json").write_text(json.dumps(["a b", {"query": "c"}]))
+    (tmp_path / "q.txt").write_text("a b\nc\n")
+    for name in ("q.jsonl", "q.json", "q.txt"):
+        assert load_query_log(str(tmp_path / name)) == ["a b", "c"]
+
+
+def test_open_loop_counts_errors_and_stages():
+    def target(query):
+        with span("retrieval"):
+            time.sleep(0.002)
+        if query == "bad":
+            raise RuntimeError("boom")
+
+    report = run_load(target, ["ok", "ok", "ok", "bad"], rps=200, n_requests=40, seed=0)
+    assert report["requests"] == 40 and report["errors"] == 10
+    assert report["error_rate"] == 0.25
+    assert report["latency"]["p50_ms"] >= 2.0
+    assert report["stages"]["retrieval"]["count"] == 40
+    assert report["error_samples"] == ["RuntimeError: boom"]
+
+
+def test_latency_includes_queueing_behind_slow_requests():
+    # 워커 1개, 요청당 20ms, 도착 간격 5ms → 뒤 요청일수록 대기가 길어진다
+    report = run_load(
+        lambda q: time.sleep(0.02),
+        ["q"],
+        rps=200,
+        n_requests=10,
+        process="constant",
+        concurrency=1,
+        capture_spans=False,
+    )
+    assert report["latency"]["max_ms"] >= 100
+
+
+def test_slo_check_uses_config_thresholds():
+    slo = slo_from_config({"max_response_time": 0.5})
+    assert slo == {"p95_ms": 500.0, "min_throughput_rpm": 100.0, "max_error_rate": 0.01}
+    report = {
+        "latency": {"p95_ms": 120.0},
+        "achieved_rpm": 90.0,
+        "error_rate": 0.0,
+    }
+    result = check_slo(report, slo)
+    assert not result["passed"]
+    assert result["checks"]["p95_latency"]["passed"]
+    assert not result["checks"]["throughput"]["passed"]
+
+
+def test_loadtest_subcommand_against_in_process_service(tmp_path, capsys):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    data_dir = str(tmp_path / "index")
+    assert main(["search", "bigquery", "--data-dir", data_dir, "--rebuild"]) == 0
+    capsys.readouterr()
+    out = tmp_path / "report.json"
+    args = ["loadtest", "--data-dir", data_dir, "--rps", "40", "--requests", "40"]
+    assert main(args + ["--seed", "0", "--out", str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert report["errors"] == 0 and report["slo"]["passed"]
+    assert {"retrieval", "generation", "rag"} <= set(report["stages"])
@@ -0,0 +1,37 @@
+import numpy as np
+
+from utils.metadata_filter import MetadataBitmapIndex, choose_strategy, parse_filter
+
+METADATA = [
+    {"tags": "python,pipeline", "category": "ml", "score": 15},
+    {"tags": "bigquery,performance", "category": "bigquery", "score": 23},
+    {"tags": "python,nlp", "category": "nlp", "score": 31},
+    {"tags": "python", "category": "ml", "score": 25},
+]
+
+
+def test_parse_filter_expression():
+    spec = parse_filter("tags contains python AND score >= 20")
+    assert spec == {"tags": ["python"], "min_score": 20.0}
+
+
+def test_bitmap_matches_tags_and_score():
+    index = MetadataBitmapIndex(METADATA)
+    spec = {"tags": ["python"], "min_score": 20}
+    assert index.matching_indices(spec).tolist() == [2, 3]
+    assert index.estimate_selectivity(spec) == 0.75 * 0.75
+
+
+def test_category_filter_is_any_of():
+    index = MetadataBitmapIndex(METADATA)
+    rows = index.matching_indices({"category": ["ml", "nlp"]})
+    assert rows.tolist() == [0, 2, 3]
+
+
+def test_roundtrip_and_strategy():
+    index = MetadataBitmapIndex(METADATA)
+    restored = MetadataBitmapIndex.from_dict(index.to_dict())
+    spec = {"tags": "python", "max_score": 20}
+    assert np.array_equal(restored.mask(spec), index.mask(spec))
+    assert choose_strategy(0.1) == "prefilter"
+    assert choose_strategy(0.9) == "postfilter"
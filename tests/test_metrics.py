@@ -0,0 +1,107 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from scripts.kpi_daily_job import ENOKPICollector
+from utils.metrics import (
+    MetricsRegistry,
+    histogram_quantile,
+    parse_text,
+    quantile_from_samples,
+    sum_samples,
+)
+
+
+def test_render_and_parse_roundtrip():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs").inc(3, status="ok")
+    registry.gauge("queue_depth").set(7)
+    hist = registry.histogram("latency_seconds", buckets=[0.1, 1.0])
+    for value in (0.05, 0.5, 5.0):
+        hist.observe(value, endpoint="/search")
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{endpoint="/search",le="+Inf"} 3' in text
+
+    samples = parse_text(text)
+    assert sum_samples(samples, "jobs_total", status="ok") == 3
+    assert sum_samples(samples, "queue_depth") == 7
+    assert sum_samples(samples, "latency_seconds_count", endpoint="/search") == 3
+
+
+def test_histogram_quantile_interpolates_within_bucket():
+    buckets = [(0.1, 50), (0.2, 100), (float("inf"), 100)]
+    assert histogram_quantile(0.5, buckets) == pytest.approx(0.1)
+    assert histogram_quantile(0.75, buckets) == pytest.approx(0.15)
+    assert histogram_quantile(0.5, []) is None
+
+
+def test_histogram_quantile_tracks_observations():
+    hist = MetricsRegistry().histogram("h")
+    for ms in range(1, 101):
+        hist.observe(ms / 1000)
+    p95 = hist.quantile(0.95)
+    assert 0.08 <= p95 <= 0.13
+    assert hist.count() == 100
+
+
+def test_registry_rejects_kind_conflicts():
+    registry = MetricsRegistry()
+    registry.counter("x")
+    with pytest.raises(ValueError):
+        registry.gauge("x")
+
+
+def test_kpi_response_time_p95_from_metrics(tmp_path):
+    registry = MetricsRegistry()
+    latency = registry.histogram("nebula_http_request_duration_seconds")
+    requests = registry.counter("nebula_http_requests_total")
+    for _ in range(95):
+        latency.observe(0.2, endpoint="/search")
+        requests.inc(endpoint="/search", status="200")
+    for _ in range(5):
+        latency.observe(3.0, endpoint="/rag")
+        requests.inc(endpoint="/rag", status="503")
+    for _ in range(500):  # 스크레이프 요청은 KPI에서 제외
+        latency.observe(0.001, endpoint="/metrics")
+    prom = registry.write_textfile(str(tmp_path / "service.prom"))
+
+    samples = parse_text(open(prom).read())
+    assert quantile_from_samples(samples, "nebula_http_request_duration_seconds", 0.5)
+
+    collector = ENOKPICollector(str(tmp_path / "kpi.db"), metrics_source=prom)
+    today = datetime.now().strftime("%Y-%m-%d")
+    kpi = collector.calculate_daily_kpi(today)["performance"]
+    assert 0.128 <= kpi["response_time_p95"] <= 0.256
+    assert kpi["error_rate"] == pytest.approx(5.0)
+
+
+def test_kpi_uses_only_the_days_metric_delta(tmp_path):
+    registry = MetricsRegistry()
+    latency = registry.histogram("nebula_http_request_duration_seconds")
+    requests = registry.counter("nebula_http_requests_total")
+    for _ in range(100):
+        latency.observe(5.0, endpoint="/rag")
+        requests.inc(endpoint="/rag", status="503")
+    prom = registry.write_textfile(str(tmp_path / "service.prom"))
+
+    collector = ENOKPICollector(str(tmp_path / "kpi.db"), metrics_source=prom)
+    today = datetime.now()
+    yesterday = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+    today = today.strftime("%Y-%m-%d")
+    # 해당 일자 스냅샷이 없으면 백필에는 오늘의 누적 메트릭을 쓰지 않는다
+    assert collector.calculate_daily_kpi(yesterday)["performance"]["error_rate"] == 0
+
+    assert collector.calculate_daily_kpi(today)["performance"]["error_rate"] == 100
+    with sqlite3.connect(collector.db_path) as conn:
+        conn.execute("UPDATE metrics_snapshots SET date = ?", (yesterday,))
+    for _ in range(100):
+        latency.observe(0.2, endpoint="/search")
+        requests.inc(endpoint="/search", status="200")
+    registry.write_textfile(prom)
+
+    kpi = collector.calculate_daily_kpi(today)["performance"]
+    assert kpi["response_time_p95"] <= 0.256
+    assert kpi["error_rate"] == pytest.approx(0.0)
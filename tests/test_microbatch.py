@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from utils.microbatch import MicroBatcher
+
+
+def test_concurrent_submits_are_coalesced():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [x * 2 for x in items]
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(8)))
+        await batcher.close()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == [i * 2 for i in range(8)]
+    assert len(calls) == 1
+    assert stats["batch_size_hist"] == {"8": 1}
+
+
+def test_batch_errors_propagate_to_callers():
+    def batch_fn(items):
+        raise ValueError("boom")
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_wait_ms=1)
+        with pytest.raises(ValueError):
+            await batcher.submit(1)
+        await batcher.close()
+        return batcher.stats()
+
+    assert asyncio.run(run())["errors"] == 1
@@ -0,0 +1,56 @@
+from utils.minhash import NearDuplicateDetector, optimal_bands
+
+BASE = (
+    "what are the best practices for optimizing bigquery performance on a "
+    "large dataset with millions of rows using partitioning and clustering"
+)
+
+
+def test_near_duplicate_clustered_with_representative():
+    det = NearDuplicateDetector(threshold=0.7)
+    assert det.add("a", BASE) is None
+    assert det.add("b", BASE + " thanks") == "a"
+    assert det.clusters["a"] == ["b"]
+    assert len(det) == 1
+
+
+def test_distinct_text_starts_new_cluster():
+    det = NearDuplicateDetector(threshold=0.7)
+    det.add("a", BASE)
+    other = "how do i train an lstm network for stock price time series forecasting"
+    assert det.add("c", other) is None
+    assert len(det) == 2
+
+
+def test_state_persists_across_batches():
+    det = NearDuplicateDetector(threshold=0.7)
+    det.add_batch([("a", BASE)])
+    assert det.add_batch([("b", BASE), ("c", BASE)]) == ["a", "a"]
+
+
+def test_optimal_bands_fits_permutations():
+    bands, rows = optimal_bands(0.85, 128)
+    assert bands * rows <= 128
+
+
+def test_pipeline_keeps_earlier_batches(tmp_path):
+    import pandas as pd
+
+    from scripts.data_pipeline_v2 import DataPipelineV2
+
+    pipeline = DataPipelineV2(str(tmp_path))
+    df = pipeline.load_extended_sample_data()
+    assert pipeline.process_extended_data(df.iloc[:5].copy())
+    # 두 번째 배치: 1~5번 문서의 재게시본(새 id) + 6~10번 문서
+    reposts = df.iloc[:5].assign(id=df["id"].iloc[:5] + 100)
+    batch = pd.concat([reposts, df.iloc[5:]], ignore_index=True)
+    assert pipeline.process_extended_data(batch, append=True)
+    docs = {m["doc_id"] for m in pipeline.metadata}
+    assert docs == set(range(1, 11))
+    assert len(pipeline.vectors) == len(pipeline.chunks) == 10
+    first = next(m for m in pipeline.metadata if m["chunk_id"] == "1_0")
+    assert first["duplicate_chunk_ids"] == ["101_0"]
+
+    # 전체 재구축은 이전 배치 상태와 무관하게 모든 문서를 유지
+    assert pipeline.process_extended_data(df.copy())
+    assert {m["doc_id"] for m in pipeline.metadata} == set(range(1, 11))
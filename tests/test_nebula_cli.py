@@ -0,0 +1,76 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.nebula_cli import main
+
+PROJECT_ROOT = Path(__file__).parent.parent
+HEAVY = ("numpy", "pandas", "sklearn", "scipy", "google", "vertexai", "matplotlib")
+# 표준 라이브러리(argparse/json)만 쓰는 CLI 모듈 누적 임포트 시간 예산
+IMPORT_BUDGET_US = 200_000
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_cli_import_stays_within_budget():
+    proc = _run("import scripts.nebula_cli")
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        cumulative[name] = int(cum)
+    loaded_heavy = [n for n in cumulative if n.split(".")[0] in HEAVY]
+    assert loaded_heavy == []
+    assert cumulative["scripts.nebula_cli"] < IMPORT_BUDGET_US
+
+
+def test_help_does_not_load_heavy_dependencies():
+    code = (
+        "import sys\n"
+        "from scripts.nebula_cli import main\n"
+        "try:\n    main(['search', '--help'])\n"
+        "except SystemExit:\n    pass\n"
+        f"print([m for m in sys.modules if m.split('.')[0] in {HEAVY!r}])"
+    )
+    assert _run(code).stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_search_subcommand_builds_and_queries(tmp_path, capsys):
+    data_dir = str(tmp_path / "index")
+    assert main(["search", "bigquery", "--data-dir", data_dir, "--rebuild"]) == 0
+    capsys.readouterr()
+    assert main(["search", "bigquery", "--data-dir", data_dir, "--top-k", "2"]) == 0
+    results = json.loads(capsys.readouterr().out)
+    assert len(results) == 2 and results[0]["rank"] == 1
+
+
+def test_axes_subcommand_writes_metrics(tmp_path, capsys):
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-01-01", periods=n, freq="h"),
+            "feat_a": rng.normal(size=n),
+            "feat_b": rng.normal(size=n),
+            "target": rng.integers(0, 2, size=n),
+        }
+    )
+    csv = tmp_path / "sample.csv"
+    df.to_csv(csv, index=False)
+    out = tmp_path / "axes.json"
+    assert main(["axes", "--input", str(csv), "--out", str(out)]) == 0
+    metrics = json.loads(out.read_text())
+    assert "psi_trigger_rate" in metrics and "sk_k_score" in metrics
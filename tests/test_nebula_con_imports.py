@@ -0,0 +1,29 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+NEBULA_CON = Path(__file__).parent.parent / "nebula-con"
+
+
+@pytest.mark.parametrize(
+    "module, requires",
+    [
+        ("rag_pipeline_perfect", "google.cloud.bigquery"),
+        ("rag_pipeline_vector_search", "google.cloud.bigquery"),
+        ("rag_pipeline_fixed_vertex_ai", "google.cloud.bigquery"),
+        ("rag_pipeline_vertex_ai_sdk", "vertexai"),
+    ],
+)
+def test_rag_pipelines_import_root_utils(module, requires):
+    pytest.importorskip("google.cloud.bigquery")
+    pytest.importorskip(requires)
+    # 스크립트로 실행할 때처럼 nebula-con이 sys.path 맨 앞 (nebula-con/utils가 보임)
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        cwd=NEBULA_CON,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,118 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.dataset_ingest import main as ingest_main
+from pipelines.dataset_ingest import profile
+from utils.profiling import (
+    HyperLogLog,
+    KLLSketch,
+    ProfileState,
+    iter_batches,
+    profile_file,
+)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    return pd.DataFrame(
+        {
+            "x": rng.normal(5, 2, n),
+            "k": rng.integers(0, 500, n),
+            "cat": rng.choice(["a", "b", "c"], n),
+            "sparse": np.where(rng.random(n) < 0.2, np.nan, rng.random(n)),
+        }
+    )
+
+
+def test_kll_quantiles_within_rank_error():
+    values = np.random.default_rng(1).random(200_000)
+    sketches = [KLLSketch(200, seed=0).update(v) for v in np.array_split(values, 7)]
+    merged = sketches[0]
+    for s in sketches[1:]:
+        merged.merge(s)
+    assert merged.n == len(values)
+    # 균등분포라 값 오차 = 순위 오차
+    est = merged.quantiles([0.1, 0.5, 0.9])
+    assert np.abs(est - [0.1, 0.5, 0.9]).max() < 0.02
+    assert sum(len(level) for level in merged.levels) < 2_000
+
+
+def test_hll_distinct_count_and_merge():
+    a = HyperLogLog().update(np.arange(50_000))
+    b = HyperLogLog().update(np.arange(25_000, 100_000))
+    assert abs(a.count() - 50_000) / 50_000 < 0.03
+    assert abs(a.merge(b).count() - 100_000) / 100_000 < 0.03
+    assert HyperLogLog().update(np.array(["x", "y", "x"], dtype=object)).count() == 2
+
+
+def test_state_merge_matches_single_pass(frame):
+    cols = {"x": (frame["x"].to_numpy(), True)}
+    whole = ProfileState().update(cols, len(frame))
+    parts = ProfileState()
+    for chunk in np.array_split(frame["x"].to_numpy(), 5):
+        parts.merge(ProfileState().update({"x": (chunk, True)}, len(chunk)))
+    assert parts.count["x"] == whole.count["x"]
+    assert parts.mean["x"] == pytest.approx(whole.mean["x"])
+    assert parts.m2["x"] == pytest.approx(whole.m2["x"])
+
+
+@pytest.mark.parametrize("suffix,workers", [(".csv", 0), (".csv", 2), (".parquet", 0)])
+def test_profile_file_matches_in_memory_profile(tmp_path, frame, suffix, workers):
+    path = tmp_path / f"data{suffix}"
+    if suffix == ".csv":
+        frame.to_csv(path, index=False)
+        expected = profile(pd.read_csv(path))
+    else:
+        frame.to_parquet(path)
+        expected = profile(pd.read_parquet(path))
+
+    got = profile_file(str(path), batch_rows=3_000, workers=workers)
+    for key in ("rows", "cols", "null_pct", "hash_head100"):
+        assert got[key] == expected[key]
+    numeric = {"x", "k", "sparse"}
+    assert set(got["numeric_desc"]) == set(expected["numeric_desc"]) == numeric
+    for col, desc in expected["numeric_desc"].items():
+        for stat in ("count", "mean", "std", "min", "max"):
+            assert got["numeric_desc"][col][stat] == pytest.approx(desc[stat], abs=1e-3)
+        spread = desc["max"] - desc["min"]
+        for stat in ("25%", "50%", "75%"):
+            assert abs(got["numeric_desc"][col][stat] - desc[stat]) < 0.02 * spread
+    assert got["distinct_approx"]["cat"] == 3
+
+
+def test_csv_type_change_falls_back_to_pandas(tmp_path):
+    # 앞부분은 정수, 뒤에서 문자열이 섞이는 열
+    rows = [f"{i},{i}" for i in range(20_000)] + ["x,1"]
+    path = tmp_path / "mixed.csv"
+    path.write_text("a,b\n" + "\n".join(rows) + "\n")
+    state = ProfileState()
+    for columns, n in iter_batches(str(path), batch_rows=5_000, block_size=1 << 14):
+        state.update(columns, n)
+    got = state.to_profile()
+    assert got["rows"] == 20_001
+    assert got["numeric_desc"]["b"]["count"] == 20_001
+    assert got["numeric_desc"]["b"]["max"] == 19_999
+    assert "a" not in got["numeric_desc"] and got["null_pct"]["a"] == 0
+
+
+def test_ingest_main_streaming_profile_only(tmp_path, frame):
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+    out = tmp_path / "profile.json"
+    prof = ingest_main(
+        [
+            "--input",
+            str(path),
+            "--out_profile",
+            str(out),
+            "--streaming",
+            "--profile_only",
+        ]
+    )
+    assert json.loads(out.read_text())["rows"] == prof["rows"] == len(frame)
+    assert not (tmp_path / "axes.json").exists()
@@ -1,5 +1,18 @@
 import random
-from utils.psi import population_stability_index
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.psi import (
+    batch_psi,
+    half_split_pairs,
+    population_stability_index,
+    psi_frame,
+    psi_from_counts,
+    quantile_edges,
+    rolling_pairs,
+)
 
 
 def test_psi_positive_when_shifted():
@@ -29,4 +42,64 @@ def test_psi_with_nan_and_none():
     current = [1.2, 2.1, None, 3.2, float("nan"), 3.9] * 30
     psi = population_stability_index(baseline, current)
     # 정리 후 길이 충분 → psi 계산 (>=0)
-    assert psi >= 0 
\ No newline at end of file
+    assert psi >= 0
+
+
+def test_psi_matches_equal_width_histogram_reference():
+    rng = np.random.default_rng(0)
+    baseline, current = rng.normal(size=600), rng.normal(0.3, 1.2, size=700)
+    edges = np.linspace(
+        min(baseline.min(), current.min()) - 1e-10,
+        max(baseline.max(), current.max()) + 1e-10,
+        11,
+    )
+    expected = np.histogram(baseline, edges)[0]
+    actual = np.histogram(current, edges)[0]
+    assert population_stability_index(baseline, current) == pytest.approx(
+        float(psi_from_counts(expected, actual))
+    )
+
+
+def test_batch_psi_matches_per_window_computation():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(3000, 4))
+    X[1500:, 2] += 1.0
+    X[::5, 1] = np.nan
+    pairs = rolling_pairs(3000, 500) + half_split_pairs(3000)
+    psi = batch_psi(X, pairs)
+    assert psi.shape == (len(pairs), 4)
+
+    edges = quantile_edges(X)
+    for p, (base, cur) in enumerate(pairs):
+        for j in range(4):
+            b = X[base[0] : base[1], j]
+            c = X[cur[0] : cur[1], j]
+            expected = np.bincount(
+                np.searchsorted(edges[j], b[~np.isnan(b)], "right"), minlength=10
+            )
+            actual = np.bincount(
+                np.searchsorted(edges[j], c[~np.isnan(c)], "right"), minlength=10
+            )
+            assert psi[p, j] == pytest.approx(float(psi_from_counts(expected, actual)))
+    # 이동한 열만 경계 창과 반분할에서 큰 PSI
+    assert psi[-1, 2] > 0.5 and psi[-1, [0, 1, 3]].max() < 0.1
+
+
+def test_batch_psi_small_windows_and_frame():
+    X = np.random.default_rng(2).normal(size=(200, 2))
+    assert np.all(batch_psi(X, rolling_pairs(200, 40)) == 0.0)
+
+    df = pd.DataFrame({"a": X[:, 0], "b": X[:, 1] + np.r_[np.zeros(100), np.ones(100)]})
+    df["label"] = "x"
+    frame = psi_frame(df, half_split_pairs(200))
+    assert list(frame.columns) == ["a", "b"] and list(frame.index) == ["0:100->100:200"]
+    assert frame.loc["0:100->100:200", "b"] > frame.loc["0:100->100:200", "a"]
+
+
+def test_rolling_pairs_baselines():
+    assert rolling_pairs(10, 4, step=2) == [
+        ((0, 4), (2, 6)),
+        ((2, 6), (4, 8)),
+        ((4, 8), (6, 10)),
+    ]
+    assert rolling_pairs(9, 3, baseline="first") == [((0, 3), (3, 6)), ((0, 3), (6, 9))]
@@ -0,0 +1,169 @@
+import numpy as np
+import pytest
+
+from utils import quantization
+from utils.quantization import CompressedVectorIndex, exact_top_k, recall_memory_report
+
+
+def _data(n=400, d=32, seed=0):
+    rng = np.random.RandomState(seed)
+    x = rng.randn(n, d)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("codec", ["float16", "int8", "pq"])
+def test_rerank_recovers_exact_top1(codec):
+    x = _data()
+    index = CompressedVectorIndex(
+        x, codec, rerank_factor=8, **({"n_subspaces": 8} if codec == "pq" else {})
+    )
+    for q in x[:10]:
+        found, scores = index.search(q, top_k=1)
+        assert found[0] == exact_top_k(x, q, 1)[0]
+        assert scores[0] == pytest.approx(1.0)
+
+
+def test_compression_shrinks_memory():
+    x = _data()
+    assert CompressedVectorIndex(x, "int8").memory_bytes < x.nbytes / 7
+    assert CompressedVectorIndex(x, "float16").memory_bytes == x.nbytes // 4
+
+
+def test_recall_memory_report_has_baseline_row():
+    x = _data(n=200)
+    rows = recall_memory_report(x, x[:5], codecs=["int8"], top_k=5)
+    assert rows[0]["compression_ratio"] == 1.0
+    assert {r["rerank"] for r in rows[1:]} == {False, True}
+    assert all(0.0 <= r["recall_at_5"] <= 1.0 for r in rows)
+
+
+def test_pipeline_search_batch_uses_compressed_index(tmp_path, monkeypatch):
+    from scripts.data_pipeline_v2 import DataPipelineV2
+
+    pipeline = DataPipelineV2(str(tmp_path))
+    pipeline.config["vector_storage"] = "int8"
+    assert pipeline.process_extended_data(pipeline.load_extended_sample_data())
+    assert pipeline.compressed_index is not None
+    index = pipeline.compressed_index
+    calls = []
+    original = index.search_batch
+
+    def spy(queries, top_k=5):
+        calls.append((len(queries), top_k))
+        return original(queries, top_k)
+
+    monkeypatch.setattr(index, "search_batch", spy)
+    queries = ["machine learning", "data pipeline", "vector search"]
+    batch = pipeline.search_batch(queries, top_k=3)
+    assert calls == [(3, 3)]
+    for query, hits in zip(queries, batch):
+        single = pipeline.search(query, top_k=3)
+        assert [h["chunk_id"] for h in hits] == [h["chunk_id"] for h in single]
+        for a, b in zip(hits, single):
+            assert a["similarity"] == pytest.approx(b["similarity"])
+
+
+@pytest.mark.parametrize("codec", ["float16", "int8", "pq"])
+def test_search_batch_scores_blocks_of_queries_at_once(codec, monkeypatch):
+    x = _data()
+    index = CompressedVectorIndex(x, codec, rerank_factor=0)
+    for i, q in enumerate(x[:4]):
+        np.testing.assert_allclose(
+            index.codec.score_batch(index.codes, x[:4])[i],
+            index.codec.score(index.codes, q),
+            rtol=1e-5,
+            atol=1e-5,
+        )
+
+    calls = []
+    original = index.codec.score_batch
+    monkeypatch.setattr(
+        index.codec,
+        "score_batch",
+        lambda codes, q: calls.append(len(q)) or original(codes, q),
+    )
+    monkeypatch.setattr(quantization, "BATCH_SCORE_CELLS", 4 * len(x))
+    for factor in (0, 4):
+        index.rerank_factor = factor
+        calls.clear()
+        batch = index.search_batch(x[:10], top_k=5)
+        assert calls == [4, 4, 2]
+        for q, (found, scores) in zip(x[:10], batch):
+            single = index.search(q, top_k=5)
+            np.testing.assert_array_equal(found, single[0])
+            np.testing.assert_allclose(scores, single[1], rtol=1e-5)
+            assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_pipeline_vectorize_batch_matches_single_queries(tmp_path, monkeypatch):
+    from scripts.data_pipeline_v2 import DataPipelineV2
+
+    pipeline = DataPipelineV2(str(tmp_path))
+    assert pipeline.process_extended_data(pipeline.load_extended_sample_data())
+    texts = ["machine learning data", "vector search", "", "machine learning data"]
+    calls = []
+    original = pipeline.advanced_vectorization_batch
+    monkeypatch.setattr(
+        pipeline,
+        "advanced_vectorization_batch",
+        lambda batch: calls.append(list(batch)) or original(batch),
+    )
+    matrix = pipeline.vectorize_batch(texts)
+    assert calls == [texts[:3]]
+    for text, row in zip(texts, matrix):
+        np.testing.assert_allclose(row, pipeline.advanced_vectorization(text))
+    np.testing.assert_array_equal(pipeline.vectorize_batch(texts), matrix)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("codec", ["float16", "int8", "pq"])
+def test_index_round_trips_without_refit(codec, tmp_path, monkeypatch):
+    x = _data()
+    index = CompressedVectorIndex(x, codec)
+    np.savez(tmp_path / "index.npz", **index.to_dict())
+
+    def fail(*args, **kwargs):
+        raise AssertionError("codec was re-fitted")
+
+    monkeypatch.setattr(type(index.codec), "fit", fail)
+    with np.load(tmp_path / "index.npz") as arrays:
+        loaded = CompressedVectorIndex.from_dict(x, arrays)
+    np.testing.assert_array_equal(loaded.codes, index.codes)
+    for q in x[:5]:
+        np.testing.assert_array_equal(loaded.search(q, 5)[0], index.search(q, 5)[0])
+    with pytest.raises(ValueError):
+        CompressedVectorIndex.from_dict(x[:10], index.to_dict())
+
+
+def test_pipeline_loads_saved_codes_and_refits_when_stale(tmp_path, monkeypatch):
+    from scripts.data_pipeline_v2 import DataPipelineV2
+    from utils.quantization import ProductQuantizer
+
+    built = DataPipelineV2(str(tmp_path))
+    built.config["vector_storage"] = "pq"
+    assert built.process_extended_data(built.load_extended_sample_data())
+    assert (tmp_path / "extended_compressed_index.npz").exists()
+
+    fits = []
+    original_fit = ProductQuantizer.fit
+    monkeypatch.setattr(
+        ProductQuantizer,
+        "fit",
+        lambda self, *a, **k: fits.append(1) or original_fit(self, *a, **k),
+    )
+    loaded = DataPipelineV2(str(tmp_path))
+    assert loaded.load_extended_results()
+    assert fits == []
+    np.testing.assert_array_equal(
+        loaded.compressed_index.codes, built.compressed_index.codes
+    )
+    assert [h["chunk_id"] for h in loaded.search("machine learning", top_k=3)] == [
+        h["chunk_id"] for h in built.search("machine learning", top_k=3)
+    ]
+
+    # 벡터 파일이 바뀌면 재학습하고 새 코드를 저장
+    np.save(tmp_path / "extended_vectors.npy", np.asarray(loaded.vectors) * 2)
+    assert DataPipelineV2(str(tmp_path)).load_extended_results()
+    assert fits == [1]
+    assert DataPipelineV2(str(tmp_path)).load_extended_results()
+    assert fits == [1]
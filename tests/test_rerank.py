@@ -0,0 +1,46 @@
+import numpy as np
+
+from utils.rerank import LateInteractionScorer, evaluate_rerank, rerank
+
+
+def _vectors():
+    rng = np.random.RandomState(0)
+    words = ["bigquery", "performance", "lstm", "forecasting"]
+    return {w: v / np.linalg.norm(v) for w, v in zip(words, rng.randn(4, 16))}
+
+
+def test_late_interaction_prefers_matching_tokens():
+    scorer = LateInteractionScorer(_vectors())
+    scores = scorer.score(
+        "bigquery performance", ["lstm forecasting", "bigquery performance tips"]
+    )
+    assert scores[1] > scores[0]
+
+
+def test_rerank_reorders_and_reports_stats():
+    candidates = [
+        {"id": 0, "text": "lstm forecasting"},
+        {"id": 1, "text": "bigquery performance tips"},
+    ]
+    results, stats = rerank(
+        "bigquery performance", candidates, LateInteractionScorer(_vectors()), top_k=2
+    )
+    assert [r["id"] for r in results] == [1, 0]
+    assert stats["reranked"] == 2 and not stats["budget_exhausted"]
+
+
+def test_zero_budget_keeps_first_stage_order():
+    candidates = [{"id": i, "text": "x"} for i in range(3)]
+    results, stats = rerank("q", candidates, LateInteractionScorer({}), budget_ms=0)
+    assert [r["id"] for r in results] == [0, 1, 2]
+    assert stats["budget_exhausted"]
+
+
+def test_evaluate_rerank_reports_quality_delta():
+    def search(query, top_k=5, rerank=False):
+        ids = ["b", "a"] if rerank else ["a", "b"]
+        return [{"chunk_id": i} for i in ids]
+
+    report = evaluate_rerank(search, {"q": ["b"]}, top_k=1)
+    assert report["delta_mrr"] == 0.5
+    assert report["delta_recall_at_1"] == 1.0
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from scripts.data_pipeline_v2 import DataPipelineV2  # noqa: E402
+from scripts.retrieval_service import create_app  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("index")
+    pipeline = DataPipelineV2(str(data_dir))
+    assert pipeline.process_extended_data(pipeline.load_extended_sample_data())
+    with TestClient(create_app(str(data_dir))) as c:
+        yield c
+
+
+def test_health_and_ready(client):
+    assert client.get("/health").json() == {"status": "ok"}
+    ready = client.get("/ready").json()
+    assert ready["status"] == "ready" and ready["chunks"] == 10
+
+
+def test_search_uses_warm_index(client):
+    body = client.post("/search", json={"query": "bigquery performance"}).json()
+    assert body["results"][0]["chunk_id"] == "2_0"
+
+
+def test_batch_search_and_rag(client):
+    batch = client.post(
+        "/batch_search", json={"queries": ["bigquery", "lstm"], "top_k": 2}
+    ).json()
+    assert [len(r) for r in batch["results"]] == [2, 2]
+    rag = client.post("/rag", json={"query": "bigquery performance"}).json()
+    assert rag["status"] == "success"
+
+
+def test_stats_exports_microbatch_histograms(client):
+    client.post("/search", json={"query": "bigquery"})
+    stats = client.get("/stats").json()["microbatch"]
+    assert stats["items"] >= 1 and stats["batch_size_hist"]
+
+
+def test_rag_reports_prompt_tokens(client):
+    rag = client.post("/rag", json={"query": "bigquery performance"}).json()
+    assert 0 < rag["context_stats"]["context_tokens"] <= 1024
+    assert rag["prompt_tokens"] > rag["context_stats"]["context_tokens"]
+
+
+def test_rag_stream_sends_retrieval_before_tokens(client):
+    with client.stream("POST", "/rag/stream", json={"query": "bigquery"}) as resp:
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        body = "".join(resp.iter_text())
+    events = [
+        line[len("event: ") :]
+        for line in body.splitlines()
+        if line.startswith("event:")
+    ]
+    assert events[0] == "retrieval" and "token" in events and events[-1] == "done"
+
+
+def test_metrics_endpoint_exposes_request_histograms(client):
+    client.post("/search", json={"query": "bigquery"})
+    resp = client.get("/metrics")
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'nebula_http_requests_total{endpoint="/search",status="200"}' in resp.text
+    assert "nebula_http_request_duration_seconds_bucket" in resp.text
+    assert "nebula_search_latency_seconds_count" in resp.text
@@ -0,0 +1,126 @@
+import json
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from utils.sharding import ShardedIndex, build_shards, shard_for
+
+
+def _corpus(n=60, d=16):
+    rng = np.random.RandomState(0)
+    vectors = rng.randn(n, d).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    metadata = [{"doc_id": i // 2, "chunk_id": f"{i // 2}_{i % 2}"} for i in range(n)]
+    chunks = [f"chunk {i}" for i in range(n)]
+    return chunks, metadata, vectors
+
+
+def test_doc_chunks_share_a_shard():
+    assert shard_for(7, 4) == shard_for("7", 4)
+
+
+def test_scatter_gather_matches_exact_search(tmp_path):
+    chunks, metadata, vectors = _corpus()
+    manifest = build_shards(tmp_path, chunks, metadata, vectors, n_shards=3)
+    assert sum(manifest["sizes"].values()) == len(chunks)
+
+    with ShardedIndex(tmp_path) as index:
+        hits = index.search_batch(vectors[:4], top_k=5)
+    for q, q_hits in enumerate(hits):
+        expected = np.argsort(-(vectors @ vectors[q]))[:5]
+        assert [h["chunk_id"] for h in q_hits] == [
+            metadata[i]["chunk_id"] for i in expected
+        ]
+
+
+def test_single_shard_rebuild_and_reload(tmp_path):
+    chunks, metadata, vectors = _corpus()
+    build_shards(tmp_path, chunks, metadata, vectors, n_shards=2)
+    target = shard_for(metadata[0]["doc_id"], 2)
+    with ShardedIndex(tmp_path) as index:
+        chunks[0] = "rewritten"
+        build_shards(tmp_path, chunks, metadata, vectors, n_shards=2, only=[target])
+        index.reload_shard(target)
+        assert index.search(vectors[0], top_k=1)[0]["text"] == "rewritten"
+
+
+def test_load_error_is_reported_and_replies_are_drained(tmp_path):
+    chunks, metadata, vectors = _corpus()
+    build_shards(tmp_path, chunks, metadata, vectors, n_shards=3)
+    (tmp_path / "shard_001" / "vectors.npy").unlink()
+    with ShardedIndex(tmp_path) as index:
+        with pytest.raises(RuntimeError, match="shard 1"):
+            index.search(vectors[0], top_k=3)
+        build_shards(tmp_path, chunks, metadata, vectors, n_shards=3, only=[1])
+        index.reload_shard(1)
+        # 이전 질의의 응답이 남아 있지 않다
+        for q in (5, 9):
+            assert (
+                index.search(vectors[q], top_k=1)[0]["chunk_id"]
+                == (metadata[q]["chunk_id"])
+            )
+
+
+def test_concurrent_searches_get_their_own_replies(tmp_path):
+    chunks, metadata, vectors = _corpus()
+    build_shards(tmp_path, chunks, metadata, vectors, n_shards=3)
+    with ShardedIndex(tmp_path) as index:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            tops = list(
+                pool.map(lambda q: index.search(vectors[q], top_k=1), range(40))
+            )
+    assert [t[0]["chunk_id"] for t in tops] == [
+        metadata[q]["chunk_id"] for q in range(40)
+    ]
+
+
+def test_hung_worker_times_out_and_is_restarted(tmp_path):
+    chunks, metadata, vectors = _corpus()
+    build_shards(tmp_path, chunks, metadata, vectors, n_shards=3)
+    with ShardedIndex(tmp_path, timeout=1.0) as index:
+        hung = index._workers[1]
+        os.kill(hung.pid, signal.SIGSTOP)
+        with pytest.raises(RuntimeError, match="shard 1: no reply"):
+            index.search(vectors[0], top_k=3)
+        assert index._workers[1] is not hung
+        assert (
+            index.search(vectors[5], top_k=1)[0]["chunk_id"]
+            == (metadata[5]["chunk_id"])
+        )
+
+
+def test_partial_rebuild_takes_only_its_rows_and_recounts(tmp_path):
+    chunks, metadata, vectors = _corpus()
+    build_shards(tmp_path, chunks, metadata, vectors, n_shards=3)
+    target = shard_for(metadata[0]["doc_id"], 3)
+    rows = [
+        i
+        for i, m in enumerate(metadata)
+        if shard_for(m["doc_id"], 3) == target and m["doc_id"] != 0
+    ]
+    manifest = build_shards(
+        tmp_path,
+        [chunks[i] for i in rows],
+        [metadata[i] for i in rows],
+        vectors[rows],
+        n_shards=3,
+        only=[target],
+    )
+    assert manifest["sizes"][str(target)] == len(rows)
+    assert sum(manifest["sizes"].values()) == len(chunks) - 2
+    with pytest.raises(ValueError):
+        build_shards(tmp_path, chunks, metadata, vectors, n_shards=2, only=[0])
+
+
+def test_full_rebuild_with_fewer_shards_drops_stale_sizes(tmp_path):
+    chunks, metadata, vectors = _corpus()
+    build_shards(tmp_path, chunks, metadata, vectors, n_shards=4)
+    manifest = build_shards(tmp_path, chunks, metadata, vectors, n_shards=2)
+    assert set(manifest["sizes"]) == {"0", "1"}
+    assert sum(manifest["sizes"].values()) == len(chunks)
+    assert not (tmp_path / "shard_003").exists()
+    saved = json.loads((tmp_path / "manifest.json").read_text())
+    assert saved["sizes"] == manifest["sizes"]
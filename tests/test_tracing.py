@@ -0,0 +1,74 @@
+import pytest
+
+from scripts.trace_summary import main as trace_summary_main
+from utils.hedging import HedgedExecutor
+from utils.tracing import configure, load_spans, span, summarize
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    def enable(fmt="jsonl"):
+        path = tmp_path / f"trace.{fmt}"
+        configure(str(path), fmt)
+        return path
+
+    yield enable
+    configure(None)
+
+
+def test_disabled_tracer_is_noop(tmp_path):
+    configure(None)
+    with span("stage") as s:
+        s.set(rows=1)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "otlp"])
+def test_nested_spans_roundtrip(trace_file, fmt):
+    path = trace_file(fmt)
+    with span("rag", query="q"):
+        with span("vector_search") as s:
+            s.set(rows_scanned=10, bytes_billed=2048)
+        with pytest.raises(ValueError):
+            with span("generation"):
+                raise ValueError("boom")
+
+    spans = {s["name"]: s for s in load_spans(str(path))}
+    root = spans["rag"]
+    assert spans["vector_search"]["parent_id"] == root["span_id"]
+    assert spans["vector_search"]["trace_id"] == root["trace_id"]
+    assert spans["vector_search"]["attributes"]["bytes_billed"] in (2048, "2048")
+    assert spans["generation"]["status"] == "error"
+    assert root["duration_ms"] >= spans["vector_search"]["duration_ms"]
+
+
+def test_spans_follow_hedged_backends_into_threads(trace_file):
+    path = trace_file()
+
+    def backend(query):
+        with span("vector_search"):
+            return [query]
+
+    executor = HedgedExecutor([("vector", backend)])
+    with span("retrieval"):
+        executor.run("q")
+    executor.close()
+
+    spans = {s["name"]: s for s in load_spans(str(path))}
+    assert spans["vector_search"]["parent_id"] == spans["retrieval"]["span_id"]
+
+
+def test_summary_cli_reports_stage_distributions(trace_file, capsys):
+    path = trace_file()
+    for _ in range(5):
+        with span("rag"):
+            with span("embedding"):
+                pass
+
+    by_path = summarize(load_spans(str(path)), by_path=True)
+    assert by_path["rag/embedding"]["count"] == 5
+
+    summary = trace_summary_main([str(path)])
+    assert set(summary) == {"rag", "embedding"}
+    assert summary["rag"]["p95_ms"] >= summary["rag"]["p50_ms"]
+    assert "embedding" in capsys.readouterr().out
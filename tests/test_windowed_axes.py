@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipelines.dataset_ingest import compute_axes
+from pipelines.dataset_ingest import main as ingest_main
+from utils import ingest_cache
+from utils.windowed_axes import axes_timeseries, drift_points, window_bounds
+
+METRICS = [
+    "st_var_ratio",
+    "seasonal_corr",
+    "psi_trigger_rate",
+    "sk_k_score",
+    "outlier_ratio",
+    "dip_stat",
+]
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 3_000
+    y = np.r_[rng.normal(size=n // 2), rng.normal(2, 3, size=n // 2)]
+    y[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame(
+        {
+            "t": pd.date_range("2025-01-01", periods=n, freq="min"),
+            "a": rng.normal(size=n),
+            "y": y,
+        }
+    )
+
+
+def test_windows_match_compute_axes_on_each_slice(frame):
+    series = axes_timeseries(frame, 500, 250, dip=True)
+    assert len(series) == 11 and (series["rows"] == 500).all()
+    for i in (0, 5, 10):
+        start = i * 250
+        window = frame.iloc[start : start + 500].reset_index(drop=True)
+        expected = compute_axes(window.copy())
+        for key in METRICS:
+            assert series.loc[i, key] == pytest.approx(expected[key], rel=1e-7), key
+        assert series.loc[i, "start"] == frame["t"].iloc[start]
+
+
+def test_short_windows_follow_compute_axes_thresholds(frame):
+    series = axes_timeseries(frame.iloc[:100], 25)
+    assert series["st_var_ratio"].isna().all()
+    assert series["psi_trigger_rate"].isna().all()
+    series = axes_timeseries(frame.iloc[:200], 100)
+    assert (series["psi_trigger_rate"] == 0.0).all()
+
+
+def test_time_windows_sliding_and_unordered_input(frame):
+    shuffled = frame.sample(frac=1.0, random_state=0)
+    shuffled["t"] = shuffled["t"].astype(str)
+    series = axes_timeseries(shuffled, "2h", "30min")
+    assert len(series) == 97
+    assert (series["rows"] == 120).all()
+    assert series["start"].iloc[1] - series["start"].iloc[0] == pd.Timedelta("30min")
+    ordered = axes_timeseries(frame, 120, 30)
+    np.testing.assert_allclose(series["sk_k_score"], ordered["sk_k_score"])
+
+
+def test_window_bounds_validation():
+    starts, ends = window_bounds(None, 10, 4, 3)
+    assert starts.tolist() == [0, 3, 6] and ends.tolist() == [4, 7, 10]
+    with pytest.raises(ValueError):
+        window_bounds(None, 10, "1h", None)
+
+
+def test_last_complete_time_window_is_kept_on_long_series():
+    # 1년치 분 단위: float64 arange는 마지막 날 창을 잃었다 (364개)
+    times = pd.date_range("2025-01-01", periods=365 * 1440, freq="min")
+    starts, ends = window_bounds(times, len(times), "1D", None)
+    assert len(starts) == 365
+    assert starts[-1] == 364 * 1440 and ends[-1] == len(times)
+    starts, ends = window_bounds(times, len(times), "1D", "6h")
+    assert len(starts) == 364 * 4 + 1 and ends[-1] == len(times)
+
+
+def test_drift_point_is_located():
+    rng = np.random.default_rng(1)
+    n = 20 * 1440
+    y = rng.normal(size=n)
+    y[12 * 1440 :] += 1.0
+    df = pd.DataFrame({"t": pd.date_range("2025-01-01", periods=n, freq="min"), "y": y})
+    series = axes_timeseries(df, "1D")
+    assert drift_points(series) == [pd.Timestamp("2025-01-13")]
+
+
+def test_ingest_main_writes_timeseries(tmp_path, frame, monkeypatch):
+    monkeypatch.setenv(ingest_cache.CACHE_DIR_ENV, str(tmp_path / "cache"))
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+    out = tmp_path / "ts.json"
+    ingest_main(
+        [
+            "--input",
+            str(path),
+            "--out_profile",
+            str(tmp_path / "profile.json"),
+            "--out_axes",
+            str(tmp_path / "axes.json"),
+            "--window",
+            "1h",
+            "--out_axes_ts",
+            str(out),
+        ]
+    )
+    records = json.loads(out.read_text())
+    assert len(records) == 50 and records[0]["rows"] == 60
@@ -0,0 +1,581 @@
+"""Axes result cache keyed by per-column fingerprints.
+
+``cached_axes(df, key)`` returns the ``compute_axes`` metrics of ``df`` and
+stores every metric together with fingerprints of its input columns (a
+hash of the column values). Each later run for the same ``key`` recomputes
+only the metrics whose inputs changed:
+
+- target metrics depend on the time and target columns (``outlier_ratio``
+  and the dip only on the target);
+- ``psi_feature_max``/``dip_feature_max`` are kept per feature, so one
+  changed feature costs one PSI and one dip;
+- the C-axis density depends on all clustering columns.
+
+When the time-ordered target only grew at the end (append-only data), the
+target metrics are updated from stored sufficient statistics instead of
+rescanning: count/mean/M2/M3/M4 (variance, skew, kurtosis), the running
+sum of the inner rolling variances, lag co-moments (autocorrelation) and
+the sorted target values (quartiles and outlier fences, dip). The new rows
+are merged in with the last 24 values as context. The half-split
+``psi_trigger_rate`` moves its split point with every append, so it is
+recomputed (one histogram pass over the target).
+
+``cached_axes_file(path)`` first compares the file identity (the content
+hash for CSV, size and mtime for Parquet) and Parquet row-group statistics
+(count, nulls, min, max per column); when none changed the stored metrics
+are returned without reading any data::
+
+    metrics, report = cached_axes_file("data/raw/sample.csv")
+
+The cache lives in ``data/cache/axes`` (``NEBULA_AXES_CACHE`` overrides).
+"""
+
+import hashlib
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.density import density_metrics
+from utils.dip import dip_columns, dip_test
+from utils.ingest_cache import _atomic_write_json, _read_json, cached_parquet
+from utils.psi import batch_psi, half_split_pairs, population_stability_index
+
+CACHE_DIR_ENV = "NEBULA_AXES_CACHE"
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "axes"
+# 지표 정의나 저장 형식이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_VERSION = 2
+# 추가 행 갱신에 필요한 직전 값 개수 (rolling 창 - 1, autocorr lag의 상한)
+TAIL = 24
+
+ORDER_METRICS = ["st_var_ratio", "seasonal_corr", "psi_trigger_rate", "sk_k_score"]
+VALUE_METRICS = ["outlier_ratio", "dip_stat", "dip_pvalue"]
+DENSITY_METRICS = ["intra_cluster_density", "silhouette_approx", "density_k"]
+
+
+def cache_dir(path: Optional[str] = None) -> Path:
+    """Cache directory (argument, ``NEBULA_AXES_CACHE`` or the default)."""
+    return Path(path or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+
+
+def column_fingerprint(series: pd.Series) -> str:
+    """Hash of a column's dtype and values, in row order."""
+    digest = hashlib.blake2b(str(series.dtype).encode(), digest_size=16)
+    digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().data)
+    return digest.hexdigest()
+
+
+def parquet_fingerprints(path: str) -> Dict[str, Optional[str]]:
+    """
+    Per-column hash of Parquet row-group statistics (no data is read).
+
+    Args:
+        path: Parquet file
+
+    Returns:
+        dict: ``{column: fingerprint}``; None for columns without min/max
+        statistics in some row group
+    """
+    import pyarrow.parquet as pq
+
+    meta = pq.ParquetFile(path).metadata
+    fingerprints: Dict[str, Optional[str]] = {}
+    for i in range(meta.num_columns):
+        name = meta.schema.column(i).name
+        digest: Optional[Any] = hashlib.blake2b(digest_size=16)
+        for g in range(meta.num_row_groups):
+            column = meta.row_group(g).column(i)
+            stats = column.statistics
+            if stats is None or not stats.has_min_max:
+                digest = None
+                break
+            digest.update(
+                repr(
+                    (
+                        column.physical_type,
+                        stats.num_values,
+                        stats.null_count,
+                        stats.min,
+                        stats.max,
+                    )
+                ).encode()
+            )
+        fingerprints[name] = digest.hexdigest() if digest is not None else None
+    return fingerprints
+
+
+def _values_hash(values: np.ndarray) -> str:
+    return hashlib.blake2b(
+        np.ascontiguousarray(values).data, digest_size=16
+    ).hexdigest()
+
+
+def _moments(x: np.ndarray) -> List[float]:
+    """``[count, mean, M2, M3, M4]`` of NaN-free ``x``."""
+    if len(x) == 0:
+        return [0, 0.0, 0.0, 0.0, 0.0]
+    mean = float(x.mean())
+    d = x - mean
+    d2 = d * d
+    return [
+        len(x),
+        mean,
+        float(d2.sum()),
+        float((d2 * d).sum()),
+        float((d2 * d2).sum()),
+    ]
+
+
+def _merge_moments(a: List[float], b: List[float]) -> List[float]:
+    """Pébay's pairwise combination of central moments up to order 4."""
+    na, nb = a[0], b[0]
+    if na == 0:
+        return list(b)
+    if nb == 0:
+        return list(a)
+    n = na + nb
+    delta = b[1] - a[1]
+    m2 = a[2] + b[2] + delta**2 * na * nb / n
+    m3 = (
+        a[3]
+        + b[3]
+        + delta**3 * na * nb * (na - nb) / n**2
+        + 3 * delta * (na * b[2] - nb * a[2]) / n
+    )
+    m4 = (
+        a[4]
+        + b[4]
+        + delta**4 * na * nb * (na * na - na * nb + nb * nb) / n**3
+        + 6 * delta**2 * (na * na * b[2] + nb * nb * a[2]) / n**2
+        + 4 * delta * (na * b[3] - nb * a[3]) / n
+    )
+    return [n, a[1] + delta * nb / n, m2, m3, m4]
+
+
+def _comoments(a: np.ndarray, b: np.ndarray) -> List[float]:
+    """``[count, mean_a, mean_b, C_aa, C_bb, C_ab]`` of paired values."""
+    if len(a) == 0:
+        return [0, 0.0, 0.0, 0.0, 0.0, 0.0]
+    ma, mb = float(a.mean()), float(b.mean())
+    da, db = a - ma, b - mb
+    return [
+        len(a),
+        ma,
+        mb,
+        float((da * da).sum()),
+        float((db * db).sum()),
+        float((da * db).sum()),
+    ]
+
+
+def _merge_comoments(a: List[float], b: List[float]) -> List[float]:
+    na, nb = a[0], b[0]
+    if na == 0:
+        return list(b)
+    if nb == 0:
+        return list(a)
+    n = na + nb
+    da, db = b[1] - a[1], b[2] - a[2]
+    w = na * nb / n
+    return [
+        n,
+        a[1] + da * nb / n,
+        a[2] + db * nb / n,
+        a[3] + b[3] + da * da * w,
+        a[4] + b[4] + db * db * w,
+        a[5] + b[5] + da * db * w,
+    ]
+
+
+def _window_and_lag(n: int) -> Tuple[int, int]:
+    """Inner rolling window and autocorrelation lag of ``compute_axes``."""
+    return min(24, max(5, n // 10)), min(24, max(2, n // 12))
+
+
+def _extend_target(
+    state: Optional[Dict[str, Any]], tail: np.ndarray, new: np.ndarray, n: int
+) -> Dict[str, Any]:
+    """Add time-ordered target values ``new`` to the sufficient statistics."""
+    win, lag = _window_and_lag(n)
+    if state is None:
+        state = {
+            "moments": _moments(np.empty(0)),
+            "max_abs": 0.0,
+            "roll": [0.0, 0],
+            "pairs": _comoments(np.empty(0), np.empty(0)),
+        }
+    valid = new[~np.isnan(new)]
+    # 직전 값(tail)을 앞에 붙여 새 위치에 걸치는 창/lag 쌍만 계산
+    context = np.concatenate([tail, new])
+    roll = pd.Series(context).rolling(window=win, min_periods=5).var()
+    roll = roll.to_numpy()[len(tail) :]
+    roll = roll[~np.isnan(roll)]
+    idx = np.arange(max(len(tail), lag), len(context))
+    a, b = context[idx], context[idx - lag]
+    paired = ~np.isnan(a) & ~np.isnan(b)
+    return {
+        "moments": _merge_moments(state["moments"], _moments(valid)),
+        "max_abs": max(state["max_abs"], float(np.abs(valid).max(initial=0.0))),
+        "roll": [state["roll"][0] + float(roll.sum()), state["roll"][1] + len(roll)],
+        "pairs": _merge_comoments(state["pairs"], _comoments(a[paired], b[paired])),
+        "win": win,
+        "lag": lag,
+    }
+
+
+def _target_metrics(state: Dict[str, Any], n: int) -> Dict[str, float]:
+    """``st_var_ratio``, ``seasonal_corr`` and ``sk_k_score`` from the state."""
+    count, _, m2, m3, m4 = state["moments"]
+    if count >= 3:
+        # pandas와 같이 상수 계열의 반올림 오차는 0으로 (skew/kurt = 0)
+        eps = np.finfo(np.float64).eps
+        m2 = 0.0 if abs(m2) < (eps * state["max_abs"]) ** 2 * count else m2
+        m3 = 0.0 if abs(m3) < (eps * state["max_abs"]) ** 3 * count else m3
+        m4 = 0.0 if abs(m4) < (eps * state["max_abs"]) ** 4 * count else m4
+        skew = (
+            0.0 if m2 == 0 else count * (count - 1) ** 0.5 / (count - 2) * m3 / m2**1.5
+        )
+    else:
+        skew = math.nan
+    if count >= 4 and m2 != 0:
+        kurt = (count + 1) * count * (count - 1) * m4 / (
+            (count - 2) * (count - 3) * m2**2
+        ) - 3 * (count - 1) ** 2 / ((count - 2) * (count - 3))
+    else:
+        kurt = 0.0 if count >= 4 else math.nan
+    metrics = {
+        "st_var_ratio": math.nan,
+        "seasonal_corr": math.nan,
+        "sk_k_score": float(abs(skew) + abs(kurt - 3)),
+    }
+    if n >= 30:
+        global_var = state["moments"][2] / (count - 1) if count > 1 else math.nan
+        roll_sum, roll_count = state["roll"]
+        roll_var = roll_sum / roll_count if roll_count else math.nan
+        metrics["st_var_ratio"] = roll_var / (global_var + 1e-9)
+        pairs, _, _, caa, cbb, cab = state["pairs"]
+        if pairs >= 2 and caa > 0 and cbb > 0:
+            metrics["seasonal_corr"] = cab / math.sqrt(caa * cbb)
+    return metrics
+
+
+def _merge_sorted(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Merge NaN-free ``new`` into the sorted array ``old``."""
+    new = np.sort(new)
+    return np.insert(old, np.searchsorted(old, new), new)
+
+
+def _value_metrics(ordered: np.ndarray) -> Dict[str, Optional[float]]:
+    """``outlier_ratio`` and the dip from the sorted, NaN-free target."""
+    n = len(ordered)
+    if n:
+        q1, q3 = np.quantile(ordered, [0.25, 0.75])
+        iqr = (q3 - q1) + 1e-9
+        low = np.searchsorted(ordered, q1 - 1.5 * iqr, side="left")
+        high = n - np.searchsorted(ordered, q3 + 1.5 * iqr, side="right")
+        outlier_ratio = float((low + high) / n)
+    else:
+        outlier_ratio = math.nan
+    dip_stat = dip_pvalue = None
+    if n >= 40:
+        dip = dip_test(ordered)
+        dip_stat, dip_pvalue = dip["dip"], dip["p_value"]
+    return {
+        "outlier_ratio": outlier_ratio,
+        "dip_stat": dip_stat,
+        "dip_pvalue": dip_pvalue,
+    }
+
+
+def _prepare(df: pd.DataFrame) -> Dict[str, Any]:
+    """Time/target columns, time-ordered target and features (as compute_axes)."""
+    time_col, target_col = df.columns[0], df.columns[-1]
+    frame = df.copy(deep=False)
+    times = frame[time_col]
+    if pd.api.types.is_object_dtype(times) or pd.api.types.is_string_dtype(times):
+        try:
+            frame[time_col] = pd.to_datetime(frame[time_col])
+        except Exception:
+            pass
+    target = frame[target_col]
+    if (
+        pd.api.types.is_object_dtype(target)
+        or pd.api.types.is_string_dtype(target)
+        or isinstance(target.dtype, pd.CategoricalDtype)
+    ):
+        frame[target_col] = pd.Categorical(target).codes
+    ordered = frame.sort_values(time_col, kind="stable")
+    numeric = frame.select_dtypes(include=[np.number])
+    features = [c for c in numeric.columns if c != target_col]
+    dense = [
+        c
+        for c in features
+        if not (str(c).lower().startswith("time") or str(c).lower().endswith("stamp"))
+    ]
+    return {
+        "time_col": time_col,
+        "target_col": target_col,
+        "s": ordered[target_col].to_numpy(dtype=np.float64, na_value=np.nan),
+        "ordered": ordered,
+        "features": features,
+        "dense": dense,
+        "frame": frame,
+    }
+
+
+def _state_paths(directory: Path, key: str) -> Tuple[Path, Path]:
+    name = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return directory / f"{name}.json", directory / f"{name}.npz"
+
+
+def _load_state(directory: Path, key: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    meta_path, arrays_path = _state_paths(directory, key)
+    meta = _read_json(meta_path)
+    if meta.get("version") != CACHE_VERSION or meta.get("key") != key:
+        return {}, {}
+    try:
+        with np.load(arrays_path) as data:
+            arrays = {name: data[name] for name in data.files}
+    except (FileNotFoundError, ValueError):
+        meta.pop("target", None)
+        arrays = {}
+    return meta, arrays
+
+
+def _assemble(entries: Dict[str, Any], prep: Dict[str, Any], n: int) -> Dict[str, Any]:
+    """``compute_axes`` dict from the per-metric entries."""
+    value = {name: entry["value"] for name, entry in entries.items()}
+    if n < 30:
+        psi_feature_max = math.nan
+    elif n < 120:
+        psi_feature_max = 0.0
+    else:
+        psis = [value[f"feature_psi:{c}"] for c in prep["features"]]
+        psi_feature_max = float(max(psis)) if psis else 0.0
+    dips = [value[f"feature_dip:{c}"] for c in prep["features"]]
+    dips = [d for d in dips if d is not None]
+    return {
+        "st_var_ratio": value["st_var_ratio"],
+        "seasonal_corr": value["seasonal_corr"],
+        "psi_trigger_rate": value["psi_trigger_rate"],
+        "psi_feature_max": psi_feature_max,
+        "sk_k_score": value["sk_k_score"],
+        "outlier_ratio": value["outlier_ratio"],
+        "dip_stat": value["dip_stat"],
+        "dip_pvalue": value["dip_pvalue"],
+        "dip_feature_max": float(max(dips)) if dips else None,
+        "intra_cluster_density": value["intra_cluster_density"],
+        "silhouette_approx": value["silhouette_approx"],
+        "density_k": value["density_k"],
+    }
+
+
+def cached_axes(
+    df: pd.DataFrame,
+    key: str,
+    cache: Optional[str] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """
+    ``compute_axes(df)`` reusing every cached metric whose inputs are unchanged.
+
+    Args:
+        df: Frame in ``compute_axes`` layout (first column time, last target)
+        key: Dataset identity (e.g. its path); one cache entry per key
+        cache: Cache directory (default: ``cache_dir()``)
+        stats: File fingerprint (source identity and Parquet statistics)
+            to store for ``cached_axes_file``
+
+    Returns:
+        tuple: ``(metrics, report)``; ``report`` lists the metric entries
+        that were ``reused``, ``recomputed`` or updated ``incremental``
+    """
+    directory = cache_dir(cache)
+    directory.mkdir(parents=True, exist_ok=True)
+    meta, arrays = _load_state(directory, key)
+    old = meta.get("entries", {})
+    prep = _prepare(df)
+    time_col, target_col, s = prep["time_col"], prep["target_col"], prep["s"]
+    n = len(s)
+    fps = {str(c): column_fingerprint(df[c]) for c in df.columns}
+    report: Dict[str, List[str]] = {"reused": [], "recomputed": [], "incremental": []}
+    entries: Dict[str, Any] = {}
+
+    def inputs(*columns) -> Dict[str, str]:
+        return {str(c): fps[str(c)] for c in columns}
+
+    def fresh(name: str, needed: Dict[str, str]) -> bool:
+        entry = old.get(name)
+        return entry is not None and entry["inputs"] == needed
+
+    def reuse(name: str) -> None:
+        entries[name] = old[name]
+        report["reused"].append(name)
+
+    def store(name: str, needed: Dict[str, str], value: Any, how: str) -> None:
+        entries[name] = {"inputs": needed, "value": value}
+        report[how].append(name)
+
+    # A/B축 타깃 지표: 시간 순서(time, target) / 값 분포(target)
+    order_inputs, value_inputs = inputs(time_col, target_col), inputs(target_col)
+    target_state = meta.get("target")
+    sorted_target, tail = arrays.get("sorted"), arrays.get("tail")
+    order_fresh = all(fresh(m, order_inputs) for m in ORDER_METRICS)
+    value_fresh = all(fresh(m, value_inputs) for m in VALUE_METRICS)
+    if target_state is None or sorted_target is None:
+        order_fresh = value_fresh = False
+    if order_fresh and value_fresh:
+        for name in ORDER_METRICS + VALUE_METRICS:
+            reuse(name)
+    else:
+        previous, how = target_state or {}, "recomputed"
+        n_old = previous.get("n", 0)
+        if (
+            previous
+            and n > n_old
+            and _window_and_lag(n) == (previous["win"], previous["lag"])
+            and _values_hash(s[:n_old]) == previous["prefix"]
+        ):
+            # 추가 전용: 저장된 충분통계에 새 행만 더함
+            how = "incremental"
+            new = s[n_old:]
+            target_state = _extend_target(previous, tail, new, n)
+            sorted_target = _merge_sorted(sorted_target, new[~np.isnan(new)])
+        else:
+            target_state = _extend_target(None, np.empty(0), s, n)
+            if not value_fresh:
+                sorted_target = np.sort(s[~np.isnan(s)])
+        target_state.update(n=n, prefix=_values_hash(s))
+        tail = s[-TAIL:]
+
+        computed = _target_metrics(target_state, n)
+        if n >= 120:
+            mid = n // 2
+            computed["psi_trigger_rate"] = population_stability_index(
+                pd.Series(s[:mid]), pd.Series(s[mid:]), bins=10, min_samples=50
+            )
+        else:
+            computed["psi_trigger_rate"] = math.nan if n < 30 else 0.0
+        for name in ORDER_METRICS:
+            # 반분할 PSI는 분할점이 움직이므로 항상 다시 계산
+            kind = "recomputed" if name == "psi_trigger_rate" else how
+            store(name, order_inputs, computed[name], kind)
+        if value_fresh:
+            for name in VALUE_METRICS:
+                reuse(name)
+        else:
+            computed = _value_metrics(sorted_target)
+            for name in VALUE_METRICS:
+                store(name, value_inputs, computed[name], how)
+
+    # 피처별 PSI(시간 순서)와 dip(값 분포): 바뀐 열만 한 번에
+    stale_psi, stale_dip = [], []
+    for c in prep["features"]:
+        for name, needed, stale in (
+            (f"feature_psi:{c}", inputs(time_col, c), stale_psi),
+            (f"feature_dip:{c}", inputs(c), stale_dip),
+        ):
+            if fresh(name, needed):
+                reuse(name)
+            else:
+                stale.append(c)
+    if stale_psi:
+        if n >= 120:
+            block = prep["ordered"][stale_psi].to_numpy(
+                dtype=np.float64, na_value=np.nan
+            )
+            psis = batch_psi(block, half_split_pairs(n), bins=10, min_samples=50)[0]
+        else:
+            psis = [None] * len(stale_psi)
+        for c, value in zip(stale_psi, psis):
+            value = float(value) if value is not None else None
+            store(f"feature_psi:{c}", inputs(time_col, c), value, "recomputed")
+    if stale_dip:
+        block = prep["frame"][stale_dip].to_numpy(dtype=np.float64, na_value=np.nan)
+        dips = dip_columns(block)
+        for j, c in enumerate(stale_dip):
+            value = dips["dip"][j] if dips["n"][j] >= 40 else np.nan
+            value = None if np.isnan(value) else float(value)
+            store(f"feature_dip:{c}", inputs(c), value, "recomputed")
+
+    # C축: 군집 열 전체 (원래 행 순서)
+    density_inputs = inputs(*prep["dense"])
+    if all(fresh(m, density_inputs) for m in DENSITY_METRICS):
+        for name in DENSITY_METRICS:
+            reuse(name)
+    else:
+        try:
+            X = prep["frame"][prep["dense"]].values
+            metrics = density_metrics(X, random_state=42)
+        except Exception:
+            metrics = None
+        for name in DENSITY_METRICS:
+            value = metrics[name] if metrics is not None else None
+            store(name, density_inputs, value, "recomputed")
+
+    result = _assemble(entries, prep, n)
+    meta_path, arrays_path = _state_paths(directory, key)
+    tmp = arrays_path.with_name(f"{arrays_path.stem}.{os.getpid()}.tmp.npz")
+    np.savez(tmp, sorted=sorted_target, tail=tail)
+    os.replace(tmp, arrays_path)
+    _atomic_write_json(
+        meta_path,
+        {
+            "version": CACHE_VERSION,
+            "key": key,
+            "columns": [str(c) for c in df.columns],
+            "stats": stats,
+            "target": target_state,
+            "entries": entries,
+            "metrics": result,
+        },
+    )
+    return result, report
+
+
+def cached_axes_file(
+    path: str, cache: Optional[str] = None
+) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """
+    ``cached_axes`` for a ``.csv``/``.parquet`` file, skipping the read when
+    the file is known to be unchanged.
+
+    A CSV is unchanged when its ingest-cache copy (keyed by the content
+    hash) is the same. A Parquet file is unchanged when its size, mtime and
+    every column's row-group statistics are the same. Statistics alone
+    cannot see edits that keep each row group's count, nulls, min and max
+    (e.g. reordering interior values), so a Parquet file rewritten in place
+    with the same size and mtime would be served stale metrics.
+
+    Args:
+        path: Dataset file (CSV goes through the ingest cache)
+        cache: Axes cache directory (default: ``cache_dir()``)
+
+    Returns:
+        tuple: ``(metrics, report)`` as for ``cached_axes``
+    """
+    if str(path).endswith(".parquet"):
+        parquet = Path(path)
+        stat = parquet.stat()
+        source = f"{stat.st_size}:{stat.st_mtime_ns}"
+    else:
+        parquet = cached_parquet(path)
+        source = parquet.stem  # 내용 해시로 정해지는 적재 캐시 키
+    columns = parquet_fingerprints(str(parquet))
+    fingerprint = {"source": source, "columns": columns}
+    key = str(Path(path).resolve())
+    meta, _ = _load_state(cache_dir(cache), key)
+    if (
+        meta.get("stats") == fingerprint
+        and all(v is not None for v in columns.values())
+        and "metrics" in meta
+    ):
+        return meta["metrics"], {
+            "reused": list(meta["entries"]),
+            "recomputed": [],
+            "incremental": [],
+        }
+    return cached_axes(pd.read_parquet(parquet), key, cache, stats=fingerprint)
@@ -0,0 +1,234 @@
+"""Per-endpoint circuit breakers and a health registry for remote calls.
+
+A breaker tracks the outcome and latency of the last ``window`` calls to
+one endpoint (e.g. BigQuery ML embedding, Vertex AI generation). When the
+failure rate over at least ``min_calls`` calls reaches ``failure_rate`` it
+opens: calls are rejected at once (or routed to a local fallback) instead
+of waiting for a timeout. After ``open_seconds`` it lets a trial call
+through (half-open); success closes it, failure re-opens it.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected by an open breaker."""
+
+    def __init__(self, name: str):
+        super().__init__(f"circuit '{name}' is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker for a single endpoint.
+
+    Args:
+        name: Endpoint name used in errors and metrics
+        window: Number of most recent calls considered
+        min_calls: Calls needed before the breaker may open
+        failure_rate: Failure fraction at which the breaker opens
+        slow_call_ms: Calls slower than this count as failures (None = off)
+        open_seconds: Time spent open before a half-open trial
+        half_open_max_calls: Concurrent trial calls allowed while half-open
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_ms: Optional[float] = None,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_ms = slow_call_ms
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._outcomes: deque = deque(maxlen=window)
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at: Optional[float] = None
+        self._trials = 0
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.fallbacks = 0
+        self.transitions = 0
+
+    def _transition(self, state: str) -> None:
+        if state != self._state:
+            self._state = state
+            self.transitions += 1
+        if state == OPEN:
+            self._opened_at = self.clock()
+        elif state == CLOSED:
+            self._outcomes.clear()
+        self._trials = 0
+
+    def _refresh(self) -> None:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now (reserves a half-open trial slot)."""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self) -> None:
+        """Return a reserved half-open trial slot without recording a result."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def record(self, latency_ms: float, ok: bool) -> None:
+        """Record one completed call."""
+        if ok and self.slow_call_ms is not None and latency_ms > self.slow_call_ms:
+            ok = False
+        with self._lock:
+            self.calls += 1
+            self.failures += int(not ok)
+            self._latencies.append(latency_ms)
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED if ok else OPEN)
+                return
+            self._outcomes.append(ok)
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failed = len(self._outcomes) - sum(self._outcomes)
+                if failed / len(self._outcomes) >= self.failure_rate:
+                    self._transition(OPEN)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` through the breaker; raises CircuitOpenError if rejected."""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record((time.perf_counter() - start) * 1000, ok=False)
+            raise
+        self.record((time.perf_counter() - start) * 1000, ok=True)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            outcomes = list(self._outcomes)
+            latencies = list(self._latencies)
+            return {
+                "state": self._state,
+                "state_code": STATE_CODES[self._state],
+                "window_calls": len(outcomes),
+                "window_failure_rate": round(1.0 - sum(outcomes) / len(outcomes), 4)
+                if outcomes
+                else 0.0,
+                "p95_ms": round(float(np.quantile(latencies, 0.95)), 3)
+                if latencies
+                else None,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "fallbacks": self.fallbacks,
+                "transitions": self.transitions,
+            }
+
+
+class HealthRegistry:
+    """
+    Named breakers sharing default settings.
+
+    Usage::
+
+        registry.call("bigquery.embedding", embed, text, fallback=local_embed)
+    """
+
+    def __init__(self, **defaults: Any):
+        self.defaults = defaults
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, **overrides: Any) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(
+                    name, **{**self.defaults, **overrides}
+                )
+            return self._breakers[name]
+
+    def call(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        *args,
+        fallback: Optional[Callable[..., Any]] = None,
+        **kwargs,
+    ) -> Any:
+        """Call through breaker ``name``; on rejection or error use ``fallback``."""
+        breaker = self.get(name)
+        try:
+            return breaker.call(fn, *args, **kwargs)
+        except Exception:
+            if fallback is None:
+                raise
+            breaker.fallbacks += 1
+            return fallback(*args, **kwargs)
+
+    def wrap(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        fallback: Optional[Callable[..., Any]] = None,
+    ) -> Callable[..., Any]:
+        """``fn`` bound to breaker ``name`` (same signature)."""
+
+        def guarded(*args, **kwargs):
+            return self.call(name, fn, *args, fallback=fallback, **kwargs)
+
+        guarded.__name__ = getattr(fn, "__name__", name)
+        return guarded
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: b.snapshot() for name, b in sorted(breakers.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+# 프로세스 공용 레지스트리 (서비스/파이프라인이 공유, 메트릭으로 노출)
+default_registry = HealthRegistry()
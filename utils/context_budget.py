@@ -0,0 +1,178 @@
+"""Token-budgeted context assembly for RAG prompts.
+
+Search results are added in score order until a fixed token budget is
+filled. Each chunk is trimmed to its query-relevant sentences, and chunks
+that mostly repeat an already selected chunk are skipped, so prompt size
+(and with it LLM latency and cost) stays bounded whatever top-k returns.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.minhash import shingles
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+PROMPT_TEMPLATE = """
+다음 정보를 바탕으로 질문에 답변해주세요:
+
+질문: {query}
+
+참고 정보:
+{context}
+
+위 정보를 바탕으로 정확하고 유용한 답변을 제공해주세요.
+"""
+
+
+class TokenCounter:
+    """tiktoken when installed, else a word/punctuation approximation."""
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        try:
+            import tiktoken
+
+            self._enc = tiktoken.get_encoding(encoding)
+            self.name = f"tiktoken:{encoding}"
+        except Exception:
+            self._enc = None
+            self.name = "regex"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._enc is not None:
+            return len(self._enc.encode(text))
+        return len(_TOKEN_RE.findall(text))
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split on sentence-final punctuation (handles ' . ' spacing too)."""
+    text = re.sub(r"\s+([.!?])(\s|$)", r"\1\2", str(text))
+    return [s.strip() for s in _SENTENCE_RE.split(text) if s.strip()]
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ContextAssembler:
+    """
+    Fill a token budget with trimmed, deduplicated search results.
+
+    Args:
+        budget_tokens: Maximum tokens of context (excluding the template)
+        max_sentences: Query-relevant sentences kept per chunk
+        dedupe_threshold: Shingle Jaccard above which a chunk is skipped
+        text_key: Result field holding the chunk text
+        score_key: Result field used for ordering
+        title_key: Result field prepended as the chunk title
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int = 1024,
+        max_sentences: int = 4,
+        dedupe_threshold: float = 0.6,
+        text_key: str = "text",
+        score_key: str = "similarity",
+        title_key: str = "title",
+        counter: Optional[TokenCounter] = None,
+    ):
+        self.budget_tokens = budget_tokens
+        self.max_sentences = max_sentences
+        self.dedupe_threshold = dedupe_threshold
+        self.text_key = text_key
+        self.score_key = score_key
+        self.title_key = title_key
+        self.counter = counter or TokenCounter()
+
+    def trim(self, query: str, text: str) -> Tuple[List[str], int]:
+        """Keep the sentences that overlap the query most, in original order."""
+        sentences = split_sentences(text)
+        q_tokens = set(_TOKEN_RE.findall(query.lower())) - set(".,!?")
+        overlap = [len(q_tokens & set(_TOKEN_RE.findall(s.lower()))) for s in sentences]
+        ranked = sorted(range(len(sentences)), key=lambda i: (-overlap[i], i))
+        keep = [i for i in ranked[: self.max_sentences] if overlap[i] > 0]
+        if not keep and sentences:
+            keep = [0]
+        return [sentences[i] for i in sorted(keep)], len(sentences)
+
+    def assemble(
+        self, query: str, results: Sequence[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the context block for a query.
+
+        Returns:
+            tuple: (context text, stats with token counts per request)
+        """
+        ordered = sorted(
+            results, key=lambda r: r.get(self.score_key) or 0.0, reverse=True
+        )
+        blocks: List[str] = []
+        seen: List[set] = []
+        used = deduped = trimmed = sentences_kept = sentences_total = 0
+        remaining = self.budget_tokens
+
+        for result in ordered:
+            if remaining <= 0:
+                break
+            text = result.get(self.text_key) or ""
+            grams = shingles(text)
+            if any(_jaccard(grams, g) >= self.dedupe_threshold for g in seen):
+                deduped += 1
+                continue
+
+            kept, total = self.trim(query, text)
+            sentences_total += total
+            header = f"제목: {result.get(self.title_key, 'N/A')}\n내용: "
+            # 예산을 넘으면 뒤쪽 문장부터 제거
+            while kept:
+                block = header + " ".join(kept)
+                cost = self.counter.count(block)
+                if cost <= remaining:
+                    break
+                kept = kept[:-1]
+            if not kept:
+                continue
+
+            trimmed += int(len(kept) < total)
+            sentences_kept += len(kept)
+            blocks.append(block)
+            seen.append(grams)
+            remaining -= cost
+            used += 1
+
+        context = "\n\n".join(blocks)
+        stats = {
+            "token_counter": self.counter.name,
+            "budget_tokens": self.budget_tokens,
+            "context_tokens": self.counter.count(context),
+            "candidates": len(results),
+            "chunks_used": used,
+            "chunks_deduped": deduped,
+            "chunks_trimmed": trimmed,
+            "sentences_kept": sentences_kept,
+            "sentences_total": sentences_total,
+        }
+        return context, stats
+
+    def build_prompt(
+        self,
+        query: str,
+        results: Sequence[Dict[str, Any]],
+        template: str = PROMPT_TEMPLATE,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Context plus the prompt template; stats include ``prompt_tokens``.
+
+        ``template`` is formatted with ``query`` and ``context``.
+        """
+        context, stats = self.assemble(query, results)
+        prompt = template.format(query=query, context=context)
+        stats["prompt_tokens"] = self.counter.count(prompt)
+        return prompt, stats
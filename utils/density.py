@@ -0,0 +1,229 @@
+"""Bounded-cost C-axis density metrics (cluster compactness/separation).
+
+``density_metrics`` reproduces the ``intra_cluster_density`` /
+``silhouette_approx`` / ``density_k`` definitions of
+``dataset_ingest.compute_density_metrics``. It keeps the cost bounded on
+large datasets:
+
+- rows are sampled (uniformly, or stratified by a label) down to
+  ``max_rows``; a 95% confidence half-width is reported for the sampled
+  intra-cluster density;
+- clustering uses ``MiniBatchKMeans`` warm-started across k (the k+1
+  centers are the k centers plus one D²-seeded center);
+- inter-center distances come from ``scipy.spatial.distance.pdist``;
+- an exact silhouette can optionally be computed on a sub-sample.
+
+``reservoir_sample`` draws the same kind of sample from a stream of
+chunks, for data that never fits in memory.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+from scipy.spatial.distance import pdist
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_samples
+
+# 95% 정규 근사 신뢰구간
+Z_95 = 1.959964
+
+
+def reservoir_sample(
+    chunks: Iterable[np.ndarray], k: int, random_state: Optional[int] = None
+) -> np.ndarray:
+    """
+    Uniform sample of ``k`` rows from a stream of 2-D chunks (Algorithm R,
+    vectorized per chunk).
+    """
+    rng = np.random.default_rng(random_state)
+    reservoir: Optional[np.ndarray] = None
+    seen = 0
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        if reservoir is None:
+            reservoir = np.empty((k,) + chunk.shape[1:], dtype=chunk.dtype)
+        fill = min(max(k - seen, 0), len(chunk))
+        reservoir[seen : seen + fill] = chunk[:fill]
+        # 나머지 행 i(전체 순번 t)는 확률 k/(t+1)로 임의 슬롯을 대체
+        t = seen + np.arange(fill, len(chunk))
+        slots = (rng.random(len(t)) * (t + 1)).astype(np.int64)
+        replace = slots < k
+        # 같은 슬롯이 여러 번 뽑히면 마지막 행이 남는다 (순차 처리와 동일)
+        reservoir[slots[replace]] = chunk[fill:][replace]
+        seen += len(chunk)
+    if reservoir is None:
+        return np.empty((0, 0))
+    return reservoir[: min(k, seen)]
+
+
+def sample_indices(
+    n: int,
+    max_rows: int,
+    strata: Optional[Sequence[Any]] = None,
+    random_state: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Sorted row indices: all rows if ``n <= max_rows``, else a uniform or
+    proportionally stratified sample of ``max_rows`` rows.
+    """
+    if n <= max_rows:
+        return np.arange(n)
+    rng = np.random.default_rng(random_state)
+    if strata is None:
+        return np.sort(rng.choice(n, size=max_rows, replace=False))
+
+    _, codes = np.unique(np.asarray(strata), return_inverse=True)
+    order = np.argsort(codes, kind="stable")
+    sizes = np.bincount(codes)
+    # 비례 배분 (최대 잉여법), 층마다 최소 1행
+    quota = sizes * max_rows / n
+    alloc = np.minimum(np.maximum(np.floor(quota).astype(np.int64), 1), sizes)
+    short = max_rows - alloc.sum()
+    if short > 0:
+        room = np.argsort(-(quota - np.floor(quota)))
+        for s in room[:short]:
+            if alloc[s] < sizes[s]:
+                alloc[s] += 1
+    picked = []
+    starts = np.r_[0, np.cumsum(sizes)[:-1]]
+    for s, (start, size) in enumerate(zip(starts, sizes)):
+        members = order[start : start + size]
+        picked.append(rng.choice(members, size=alloc[s], replace=False))
+    return np.sort(np.concatenate(picked))
+
+
+def _seed_next_center(
+    Xs: np.ndarray, dist_to_center: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """k-means++ style: draw one new center with probability ∝ D²."""
+    d2 = dist_to_center**2
+    total = d2.sum()
+    if total <= 0:
+        return Xs[rng.integers(len(Xs))]
+    return Xs[rng.choice(len(Xs), p=d2 / total)]
+
+
+def _mean_ci(values: np.ndarray, population: int) -> float:
+    """95% half-width of a sample mean with finite population correction."""
+    m = len(values)
+    if m < 2 or m >= population:
+        return 0.0
+    fpc = np.sqrt(1.0 - m / population)
+    return float(Z_95 * values.std(ddof=1) / np.sqrt(m) * fpc)
+
+
+def density_metrics(
+    X: np.ndarray,
+    k_range: Sequence[int] = range(2, 6),
+    min_samples: int = 40,
+    max_rows: int = 50_000,
+    strata: Optional[Sequence[Any]] = None,
+    batch_size: int = 4096,
+    silhouette_sample: Optional[int] = None,
+    random_state: int = 42,
+) -> Optional[Dict[str, Any]]:
+    """
+    Cluster compactness/separation metrics with bounded runtime.
+
+    Args:
+        X: 2-D feature matrix; rows with NaN are ignored
+        k_range: Cluster counts tried (best ``silhouette_approx`` wins)
+        min_samples: Minimum complete rows required
+        max_rows: Rows sampled before clustering (bounds the cost)
+        strata: Optional per-row labels for stratified sampling
+        batch_size: MiniBatchKMeans batch size
+        silhouette_sample: If set, exact silhouette on this many sampled rows
+        random_state: Seed for sampling and clustering
+
+    Returns:
+        dict: intra_cluster_density, silhouette_approx, density_k, the
+        sampling summary and confidence half-widths; None if not computable
+    """
+    if X is None or len(X.shape) != 2:
+        return None
+    n, d = X.shape
+    if n < min_samples or d < 2:
+        return None
+
+    idx = sample_indices(n, max_rows, strata, random_state)
+    Xc = np.asarray(X[idx], dtype=np.float64)
+    complete = ~np.isnan(Xc).any(axis=1)
+    Xc = Xc[complete]
+    if len(Xc) < min_samples:
+        return None
+    # 모집단 완전 행 수 추정 (표본 비율로 환산)
+    population = int(round(n * complete.mean()))
+
+    std = Xc.std(axis=0)
+    Xs = (Xc - Xc.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+    global_center = Xs.mean(axis=0)
+    global_ref = 2 * np.mean(np.linalg.norm(Xs - global_center, axis=1))
+
+    rng = np.random.default_rng(random_state)
+    best: Optional[Dict[str, Any]] = None
+    centers: Optional[np.ndarray] = None
+    dist_to_center: Optional[np.ndarray] = None
+    for k in sorted(k_range):
+        if k >= len(Xs):
+            break
+        if centers is None or len(centers) != k - 1:
+            init = "k-means++"
+        else:
+            # k-1개 중심 + D² 시딩 1개로 warm start
+            seed = _seed_next_center(Xs, dist_to_center, rng)
+            init = np.vstack([centers, seed])
+        try:
+            km = MiniBatchKMeans(
+                n_clusters=k,
+                init=init,
+                n_init=1 if not isinstance(init, str) else 3,
+                batch_size=min(batch_size, len(Xs)),
+                random_state=random_state,
+            ).fit(Xs)
+        except Exception:
+            continue
+        centers = km.cluster_centers_
+        labels = km.labels_
+
+        dist_to_center = np.linalg.norm(Xs - centers[labels], axis=1)
+        intra = 2 * np.mean(dist_to_center)
+        inter = float(np.mean(pdist(centers)))
+
+        if inter > 1e-9 and inter > intra:
+            sil_approx = (inter - intra) / (inter + 1e-9)
+        else:
+            sil_approx = 0.0
+
+        if best is None or sil_approx > best["silhouette_approx"]:
+            best = {
+                "k": k,
+                "intra": intra,
+                "dist_to_center": dist_to_center,
+                "labels": labels,
+                "silhouette_approx": sil_approx,
+            }
+
+    if best is None:
+        return None
+
+    scale = 1.0 / (global_ref + 1e-9)
+    result = {
+        "intra_cluster_density": float(best["intra"] * scale),
+        "intra_cluster_density_ci95": _mean_ci(
+            2 * best["dist_to_center"] * scale, population
+        ),
+        "silhouette_approx": float(best["silhouette_approx"]),
+        "density_k": int(best["k"]),
+        "rows_total": int(n),
+        "rows_used": int(len(Xs)),
+        "sampled": bool(len(idx) < n),
+    }
+
+    if silhouette_sample:
+        sub = sample_indices(len(Xs), silhouette_sample, None, random_state)
+        if len(np.unique(best["labels"][sub])) > 1:
+            values = silhouette_samples(Xs[sub], best["labels"][sub])
+            result["silhouette"] = float(values.mean())
+            result["silhouette_ci95"] = _mean_ci(values, population)
+    return result
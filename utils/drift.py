@@ -0,0 +1,387 @@
+"""Streaming drift monitoring with mergeable fixed-edge histogram sketches.
+
+Data arrives as batches. Each numeric feature gets one ``HistogramSketch``
+per time bucket: bin counts over fixed edges (open-ended outer bins) plus
+count/NaN/min/max. A sketch's size depends only on the number of bins, so
+memory per feature and bucket is constant however many rows are seen.
+Sketches merge by adding counts and serialize to plain JSON.
+
+PSI and KS between any two buckets are computed from the sketches alone.
+``DriftMonitor.check`` compares a bucket against a baseline bucket and
+raises alerts when PSI crosses the ``psi.minor/moderate/major`` thresholds
+of ``config/axis_thresholds.json``::
+
+    monitor = DriftMonitor(bins=20)
+    monitor.update(batch_df, bucket="2025-01-01")
+    ...
+    alerts = monitor.check("2025-01-08", baseline="2025-01-01")
+"""
+
+import json
+import math
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.metrics import REGISTRY
+from utils.psi import psi_from_counts, quantile_edges
+
+THRESHOLDS_PATH = Path(__file__).parent.parent / "config" / "axis_thresholds.json"
+DEFAULT_PSI_THRESHOLDS = {"minor": 0.1, "moderate": 0.25, "major": 0.5}
+LEVELS = ("minor", "moderate", "major")
+
+DRIFT_PSI = REGISTRY.gauge(
+    "nebula_drift_psi", "PSI of the latest drift check by feature"
+)
+DRIFT_ALERTS = REGISTRY.counter(
+    "nebula_drift_alerts_total", "Drift alerts by feature and level"
+)
+
+
+def load_psi_thresholds(path: Optional[str] = None) -> Dict[str, float]:
+    """``psi`` thresholds from ``config/axis_thresholds.json`` (or defaults)."""
+    path = Path(path) if path else THRESHOLDS_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {**DEFAULT_PSI_THRESHOLDS, **json.load(f).get("psi", {})}
+    except FileNotFoundError:
+        return dict(DEFAULT_PSI_THRESHOLDS)
+
+
+def psi_level(psi: float, thresholds: Dict[str, float]) -> Optional[str]:
+    """Highest threshold level ``psi`` reaches (None below ``minor``)."""
+    level = None
+    for name in LEVELS:
+        if psi >= thresholds[name]:
+            level = name
+    return level
+
+
+class HistogramSketch:
+    """
+    Fixed-edge histogram of one feature within one bucket.
+
+    Args:
+        edges: Interior bin edges (``bins - 1`` values); the outer bins are
+            open-ended so no value falls outside the sketch
+    """
+
+    __slots__ = ("edges", "counts", "nan_count", "min", "max")
+
+    def __init__(self, edges: Sequence[float]):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.nan_count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, values) -> "HistogramSketch":
+        values = np.asarray(values, dtype=np.float64).ravel()
+        valid = values[~np.isnan(values)]
+        self.nan_count += len(values) - len(valid)
+        if len(valid):
+            codes = np.searchsorted(self.edges, valid, side="right")
+            self.counts += np.bincount(codes, minlength=len(self.counts))
+            self.min = min(self.min, float(valid.min()))
+            self.max = max(self.max, float(valid.max()))
+        return self
+
+    def merge(self, other: "HistogramSketch") -> "HistogramSketch":
+        """Add ``other`` into this sketch (edges must match)."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("cannot merge sketches with different edges")
+        self.counts += other.counts
+        self.nan_count += other.nan_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def cdf(self) -> np.ndarray:
+        """Empirical CDF at each interior edge."""
+        total = self.count
+        if total == 0:
+            return np.zeros(len(self.edges))
+        return np.cumsum(self.counts[:-1]) / total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "edges": self.edges.tolist(),
+            "counts": self.counts.tolist(),
+            "nan_count": self.nan_count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HistogramSketch":
+        sketch = cls(data["edges"])
+        sketch.counts = np.asarray(data["counts"], dtype=np.int64)
+        sketch.nan_count = int(data["nan_count"])
+        if data["min"] is not None:
+            sketch.min, sketch.max = float(data["min"]), float(data["max"])
+        return sketch
+
+
+def sketch_psi(
+    expected: HistogramSketch, actual: HistogramSketch, min_samples: int = 0
+) -> float:
+    """PSI between two sketches with the same edges."""
+    return float(psi_from_counts(expected.counts, actual.counts, min_samples))
+
+
+def sketch_ks(expected: HistogramSketch, actual: HistogramSketch) -> float:
+    """
+    Two-sample KS statistic evaluated at the shared bin edges.
+
+    This is a lower bound of the exact KS statistic; it is exact when the
+    largest CDF gap falls on an edge.
+    """
+    if expected.count == 0 or actual.count == 0:
+        return 0.0
+    return float(np.max(np.abs(expected.cdf() - actual.cdf()), initial=0.0))
+
+
+class DriftMonitor:
+    """
+    Per-feature, per-bucket histogram sketches with PSI/KS drift alerts.
+
+    Bucket keys must sort in time order (e.g. ISO dates): buckets are kept
+    in key order whatever order batches arrive in, so a late batch for an
+    older bucket neither changes ``check``'s default baseline nor which
+    bucket ``max_buckets`` drops.
+
+    Args:
+        bins: Bins per feature when edges are fitted from the data
+        edges: Optional fixed interior edges per feature
+        thresholds: PSI thresholds (default: ``config/axis_thresholds.json``)
+        min_samples: Buckets with fewer values are not checked; also the
+            number of values (with at least two distinct ones) needed
+            before a feature's edges are fitted
+        max_buckets: Oldest buckets beyond this are dropped (None = keep all)
+        on_alert: Callback invoked with each alert dict
+    """
+
+    def __init__(
+        self,
+        bins: int = 20,
+        edges: Optional[Dict[str, Sequence[float]]] = None,
+        thresholds: Optional[Dict[str, float]] = None,
+        min_samples: int = 50,
+        max_buckets: Optional[int] = None,
+        on_alert: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.bins = bins
+        self.edges: Dict[str, np.ndarray] = {
+            k: np.asarray(v, dtype=np.float64) for k, v in (edges or {}).items()
+        }
+        self.thresholds = thresholds or load_psi_thresholds()
+        self.min_samples = min_samples
+        self.max_buckets = max_buckets
+        self.on_alert = on_alert
+        self.buckets: "OrderedDict[str, Dict[str, HistogramSketch]]" = OrderedDict()
+        # 구간을 아직 정하지 못한 피처의 값: {피처: {버킷: 고유값/개수/NaN 수}}
+        self.pending: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _columns(batch) -> Dict[str, np.ndarray]:
+        if hasattr(batch, "select_dtypes"):
+            numeric = batch.select_dtypes(include="number")
+            return {
+                str(c): numeric[c].to_numpy(dtype=np.float64, na_value=np.nan)
+                for c in numeric.columns
+            }
+        return {str(k): np.asarray(v, dtype=np.float64) for k, v in batch.items()}
+
+    def update(self, batch, bucket: str) -> None:
+        """
+        Add a batch (DataFrame or ``{feature: values}``) to ``bucket``.
+
+        A new feature's values are held (as distinct values and counts)
+        until ``min_samples`` values with at least two distinct ones have
+        arrived; quantile edges are then fitted on everything held, the held
+        values are binned into their buckets, and the edges stay fixed. A
+        constant first batch therefore cannot freeze degenerate edges.
+        """
+        columns = self._columns(batch)
+        with self._lock:
+            if bucket not in self.buckets:
+                self._insert_bucket(bucket)
+            sketches = self.buckets[bucket]
+            for name, values in columns.items():
+                if name not in self.edges:
+                    self._hold(name, bucket, values)
+                    continue
+                sketch = sketches.get(name)
+                if sketch is None:
+                    sketch = sketches[name] = HistogramSketch(self.edges[name])
+                sketch.update(values)
+            while self.max_buckets and len(self.buckets) > self.max_buckets:
+                oldest, _ = self.buckets.popitem(last=False)
+                for held in self.pending.values():
+                    held.pop(oldest, None)
+
+    def _insert_bucket(self, bucket: str) -> None:
+        """Add an empty bucket at its key position (buckets stay sorted)."""
+        later = [key for key in self.buckets if key > bucket]
+        self.buckets[bucket] = {}
+        for key in later:
+            self.buckets.move_to_end(key)
+
+    def _hold(self, name: str, bucket: str, values: np.ndarray) -> None:
+        """Keep values of a feature without edges; fit edges once enough."""
+        valid = values[~np.isnan(values)]
+        held = self.pending.setdefault(name, {})
+        entry = held.setdefault(
+            bucket, {"values": np.zeros(0), "counts": np.zeros(0), "nan": 0}
+        )
+        entry["nan"] += len(values) - len(valid)
+        merged = np.r_[entry["values"], valid]
+        weights = np.r_[entry["counts"], np.ones(len(valid))]
+        entry["values"], inverse = np.unique(merged, return_inverse=True)
+        entry["counts"] = np.bincount(inverse, weights=weights)
+
+        distinct = np.unique(np.concatenate([e["values"] for e in held.values()]))
+        total = sum(e["counts"].sum() for e in held.values())
+        if len(distinct) < 2 or total < max(self.min_samples, 1):
+            return
+        pooled = {
+            b: np.repeat(e["values"], e["counts"].astype(np.int64))
+            for b, e in held.items()
+        }
+        self.edges[name] = quantile_edges(
+            np.concatenate(list(pooled.values()))[:, None], self.bins
+        )[0]
+        for b, e in held.items():
+            sketch = HistogramSketch(self.edges[name]).update(pooled[b])
+            sketch.nan_count += e["nan"]
+            self.buckets[b][name] = sketch
+        del self.pending[name]
+
+    def sketch(self, bucket: str, feature: str) -> HistogramSketch:
+        return self.buckets[bucket][feature]
+
+    def merged(self, buckets: Sequence[str], feature: str) -> HistogramSketch:
+        """One sketch for ``feature`` over several buckets (e.g. a week)."""
+        merged = HistogramSketch(self.edges[feature])
+        for bucket in buckets:
+            if feature in self.buckets.get(bucket, {}):
+                merged.merge(self.buckets[bucket][feature])
+        return merged
+
+    def compare(self, feature: str, baseline: str, current: str) -> Dict[str, Any]:
+        """PSI/KS of ``feature`` between two buckets, from sketches only."""
+        expected = self.sketch(baseline, feature)
+        actual = self.sketch(current, feature)
+        psi = sketch_psi(expected, actual, self.min_samples)
+        return {
+            "feature": feature,
+            "baseline": baseline,
+            "bucket": current,
+            "psi": round(psi, 6),
+            "ks": round(sketch_ks(expected, actual), 6),
+            "baseline_count": expected.count,
+            "count": actual.count,
+            "level": psi_level(psi, self.thresholds),
+        }
+
+    def check(
+        self, bucket: str, baseline: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare every feature of ``bucket`` with ``baseline`` and alert.
+
+        Args:
+            bucket: Bucket to check
+            baseline: Reference bucket (default: the bucket before ``bucket``)
+
+        Returns:
+            list: Alerts (comparisons whose PSI reached at least ``minor``)
+        """
+        if baseline is None:
+            names = list(self.buckets)
+            position = names.index(bucket)
+            if position == 0:
+                return []
+            baseline = names[position - 1]
+
+        alerts = []
+        for feature in sorted(self.buckets[bucket]):
+            if feature not in self.buckets[baseline]:
+                continue
+            result = self.compare(feature, baseline, bucket)
+            DRIFT_PSI.set(result["psi"], feature=feature)
+            if result["level"] is None:
+                continue
+            DRIFT_ALERTS.inc(feature=feature, level=result["level"])
+            alerts.append(result)
+            if self.on_alert is not None:
+                self.on_alert(result)
+        return alerts
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "bins": self.bins,
+                "thresholds": self.thresholds,
+                "min_samples": self.min_samples,
+                "max_buckets": self.max_buckets,
+                "edges": {k: v.tolist() for k, v in self.edges.items()},
+                "pending": {
+                    name: {
+                        bucket: {
+                            "values": e["values"].tolist(),
+                            "counts": e["counts"].tolist(),
+                            "nan": e["nan"],
+                        }
+                        for bucket, e in held.items()
+                    }
+                    for name, held in self.pending.items()
+                },
+                "buckets": {
+                    bucket: {f: s.to_dict() for f, s in sketches.items()}
+                    for bucket, sketches in self.buckets.items()
+                },
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **kwargs: Any) -> "DriftMonitor":
+        monitor = cls(
+            bins=data["bins"],
+            edges=data["edges"],
+            thresholds=data["thresholds"],
+            min_samples=data["min_samples"],
+            max_buckets=data["max_buckets"],
+            **kwargs,
+        )
+        for bucket, sketches in sorted(data["buckets"].items()):
+            monitor.buckets[bucket] = {
+                f: HistogramSketch.from_dict(s) for f, s in sketches.items()
+            }
+        for name, held in data.get("pending", {}).items():
+            monitor.pending[name] = {
+                bucket: {
+                    "values": np.asarray(e["values"], dtype=np.float64),
+                    "counts": np.asarray(e["counts"], dtype=np.float64),
+                    "nan": int(e["nan"]),
+                }
+                for bucket, e in held.items()
+            }
+        return monitor
+
+    def save(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        return path
+
+    @classmethod
+    def load(cls, path: str, **kwargs: Any) -> "DriftMonitor":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), **kwargs)
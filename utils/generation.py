@@ -0,0 +1,175 @@
+"""Answer generators with token streaming, plus SSE framing for RAG.
+
+Generators expose ``stream(prompt)`` (an iterator of text pieces) and
+``generate(prompt)``. ``stream_rag_events`` emits the retrieval results at
+once, then each generated piece as it arrives, and records time-to-first-
+token separately from total time.
+"""
+
+import json
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class StubGenerator:
+    """
+    Local extractive generator (no backend needed).
+
+    Streams the ``내용:`` lines of the prompt's context block word by word;
+    ``token_delay_ms`` simulates backend decode time.
+    """
+
+    name = "stub"
+
+    def __init__(self, token_delay_ms: float = 0.0, max_words: int = 120):
+        self.token_delay_ms = token_delay_ms
+        self.max_words = max_words
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        contents = re.findall(r"^내용:\s*(.+)$", prompt, flags=re.MULTILINE)
+        words = " ".join(contents).split()[: self.max_words]
+        if not words:
+            words = ["관련", "정보를", "찾을", "수", "없습니다."]
+        for i, word in enumerate(words):
+            if self.token_delay_ms:
+                time.sleep(self.token_delay_ms / 1000)
+            yield word if i == 0 else " " + word
+
+    def generate(self, prompt: str) -> str:
+        return "".join(self.stream(prompt))
+
+
+class VertexGenerator:
+    """Vertex AI GenerativeModel with ``stream=True`` (optional dependency)."""
+
+    name = "vertex"
+
+    def __init__(
+        self,
+        model_name: str = "gemini-1.5-flash",
+        project: Optional[str] = None,
+        location: str = "us-central1",
+    ):
+        import vertexai
+        from vertexai.generative_models import GenerativeModel
+
+        vertexai.init(project=project, location=location)
+        self.model = GenerativeModel(model_name)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self.model.generate_content(prompt, stream=True):
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+    def generate(self, prompt: str) -> str:
+        return self.model.generate_content(prompt).text
+
+
+class GuardedGenerator:
+    """
+    Route a remote generator through a circuit breaker.
+
+    While the breaker is open (or when the primary fails before its first
+    token) the local ``fallback`` generator answers instead. Latency recorded
+    on the breaker is time to first token.
+    """
+
+    def __init__(self, primary, fallback, breaker):
+        self.primary = primary
+        self.fallback = fallback
+        self.breaker = breaker
+        self.name = getattr(primary, "name", type(primary).__name__)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        if not self.breaker.allow():
+            self.breaker.fallbacks += 1
+            yield from self.fallback.stream(prompt)
+            return
+        start = time.perf_counter()
+        settled = False
+        try:
+            for piece in self.primary.stream(prompt):
+                if not settled:
+                    self.breaker.record((time.perf_counter() - start) * 1000, ok=True)
+                    settled = True
+                yield piece
+            if not settled:  # 토큰 없이 끝난 경우도 실패로 간주
+                self.breaker.record((time.perf_counter() - start) * 1000, ok=False)
+                settled = True
+        except Exception:
+            if settled:
+                raise
+            self.breaker.record((time.perf_counter() - start) * 1000, ok=False)
+            settled = True
+            self.breaker.fallbacks += 1
+            yield from self.fallback.stream(prompt)
+        finally:
+            if not settled:
+                # 첫 토큰 전에 닫힘/취소: 결과 없이 half-open 시험 슬롯만 반환
+                self.breaker.release()
+
+    def generate(self, prompt: str) -> str:
+        return "".join(self.stream(prompt))
+
+
+def load_generator(name: str = "stub", **kwargs):
+    if name == "stub":
+        return StubGenerator(**kwargs)
+    if name == "vertex":
+        return VertexGenerator(**kwargs)
+    raise ValueError(f"Unknown generator: {name}")
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Frame one server-sent event."""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def stream_rag_events(
+    query: str,
+    search_results: List[Dict[str, Any]],
+    prompt: str,
+    generator,
+    request_start: Optional[float] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """
+    SSE stream: ``retrieval`` → ``token``* → ``done`` (or ``error``).
+
+    The ``done`` event carries ``retrieval_ms``, ``ttft_ms`` (request start to
+    first token), ``generation_ttft_ms`` (generation start to first token)
+    and ``total_ms``.
+    """
+    request_start = request_start or time.perf_counter()
+    retrieval_ms = (time.perf_counter() - request_start) * 1000
+    yield sse_event("retrieval", {"query": query, "search_results": search_results})
+
+    gen_start = time.perf_counter()
+    first_token_at = None
+    pieces = 0
+    try:
+        for piece in generator.stream(prompt):
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            pieces += 1
+            yield sse_event("token", {"text": piece})
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+
+    end = time.perf_counter()
+    timings = {
+        "generator": getattr(generator, "name", type(generator).__name__),
+        "tokens": pieces,
+        "retrieval_ms": round(retrieval_ms, 3),
+        "ttft_ms": round((first_token_at - request_start) * 1000, 3)
+        if first_token_at
+        else None,
+        "generation_ttft_ms": round((first_token_at - gen_start) * 1000, 3)
+        if first_token_at
+        else None,
+        "total_ms": round((end - request_start) * 1000, 3),
+    }
+    yield sse_event("done", {**(extra or {}), **timings})
@@ -0,0 +1,308 @@
+"""Hedged (speculative) execution across ordered retrieval backends.
+
+The primary backend is launched first. If it has not produced a valid
+result after a hedge delay, the next backend is launched as well, and so
+on; the first valid result wins and the remaining calls are cancelled.
+A backend that started remote work (a BigQuery job) registers how to stop
+it with ``on_cancel(job.cancel)``; the losers' hooks run as soon as a
+winner is known. The hedge delay comes from each backend's recent latency
+quantile, and is zero for a backend whose recent error rate marks it as
+degraded, so a known-bad primary no longer costs its full failure latency
+per request.
+"""
+
+import contextvars
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class CancelToken:
+    """Cancel hooks of one hedged backend call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], Any]] = []
+        self.cancelled = False
+
+    def on_cancel(self, callback: Callable[[], Any]) -> None:
+        """Run ``callback`` when the call is cancelled (now if it already was)."""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        _run_hook(callback)
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            _run_hook(callback)
+
+
+def _run_hook(callback: Callable[[], Any]) -> None:
+    try:
+        callback()
+    except Exception:
+        pass  # 취소는 최선 노력 (이미 끝난 작업 등)
+
+
+_current_token: contextvars.ContextVar = contextvars.ContextVar(
+    "hedge_cancel_token", default=None
+)
+
+
+def on_cancel(callback: Callable[[], Any]) -> None:
+    """
+    Register ``callback`` to stop the current backend call if it loses.
+
+    No-op outside a hedged call, so backends can call it unconditionally.
+    """
+    token = _current_token.get()
+    if token is not None:
+        token.on_cancel(callback)
+
+
+def hedge_cancelled() -> bool:
+    """True inside a hedged backend call that has been cancelled."""
+    token = _current_token.get()
+    return token is not None and token.cancelled
+
+
+class BackendHealth:
+    """
+    Sliding-window latency and error statistics for one backend.
+
+    Args:
+        window: Number of most recent calls kept
+        min_samples: Calls needed before the window is trusted
+        degraded_error_rate: Error rate at or above which the backend is degraded
+    """
+
+    def __init__(
+        self, window: int = 50, min_samples: int = 5, degraded_error_rate: float = 0.5
+    ):
+        self.min_samples = min_samples
+        self.degraded_error_rate = degraded_error_rate
+        self._latencies: deque = deque(maxlen=window)
+        self._outcomes: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.errors += int(not ok)
+            self._outcomes.append(ok)
+            if ok:
+                self._latencies.append(latency_ms)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return 1.0 - sum(self._outcomes) / len(self._outcomes)
+
+    @property
+    def degraded(self) -> bool:
+        with self._lock:
+            enough = len(self._outcomes) >= self.min_samples
+        return enough and self.error_rate >= self.degraded_error_rate
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Latency quantile of successful calls (None until min_samples)."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return float(np.quantile(np.asarray(self._latencies), q))
+
+    def to_dict(self) -> Dict[str, Any]:
+        p50 = self.latency_quantile(0.5)
+        p95 = self.latency_quantile(0.95)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "p50_ms": round(p50, 3) if p50 is not None else None,
+            "p95_ms": round(p95, 3) if p95 is not None else None,
+            "degraded": self.degraded,
+        }
+
+
+class HedgedExecutor:
+    """
+    Run ``(name, fn)`` backends in priority order with hedging.
+
+    Args:
+        backends: Ordered ``(name, fn)`` pairs; all are called with the same args
+        hedge_delay_ms: Fixed delay before hedging (None = from health)
+        default_delay_ms: Delay used while a backend has too few samples
+        quantile: Latency quantile used as the automatic hedge delay
+        min_delay_ms: Lower bound of the automatic delay
+        max_delay_ms: Upper bound of the automatic delay
+        is_valid: Predicate for a usable result (default: any result
+            returned without an exception, including an empty one)
+        max_workers: Thread pool size
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[Tuple[str, Callable[..., Any]]],
+        hedge_delay_ms: Optional[float] = None,
+        default_delay_ms: float = 200.0,
+        quantile: float = 0.95,
+        min_delay_ms: float = 5.0,
+        max_delay_ms: float = 2000.0,
+        is_valid: Optional[Callable[[Any], bool]] = None,
+        max_workers: Optional[int] = None,
+        window: int = 50,
+        degraded_error_rate: float = 0.5,
+    ):
+        if not backends:
+            raise ValueError("at least one backend is required")
+        self.backends = list(backends)
+        self.hedge_delay_ms = hedge_delay_ms
+        self.default_delay_ms = default_delay_ms
+        self.quantile = quantile
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.is_valid = is_valid or (lambda result: True)
+        self.health = {
+            name: BackendHealth(window=window, degraded_error_rate=degraded_error_rate)
+            for name, _ in self.backends
+        }
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or 4 * len(self.backends),
+            thread_name_prefix="hedge",
+        )
+        self.wins: Counter = Counter()
+        self.hedges = 0
+        self.abandoned = 0
+        self.failures = 0
+
+    def hedge_delay(self, name: str) -> float:
+        """Milliseconds to wait on backend ``name`` before hedging."""
+        health = self.health[name]
+        if health.degraded:
+            return 0.0
+        if self.hedge_delay_ms is not None:
+            return self.hedge_delay_ms
+        q = health.latency_quantile(self.quantile)
+        if q is None:
+            return self.default_delay_ms
+        return min(max(q, self.min_delay_ms), self.max_delay_ms)
+
+    def _launch(self, i: int, args, kwargs) -> Tuple[Future, CancelToken]:
+        name, fn = self.backends[i]
+        start = time.perf_counter()
+        # 호출자 컨텍스트(트레이싱 span 등)를 워커 스레드로 전달
+        ctx = contextvars.copy_context()
+        token = CancelToken()
+        ctx.run(_current_token.set, token)
+        future = self._pool.submit(ctx.run, fn, *args, **kwargs)
+
+        def _record(f: Future) -> None:
+            if f.cancelled() or token.cancelled:
+                return  # 진 호출은 백엔드 상태에 반영하지 않음
+            ok = f.exception() is None and self.is_valid(f.result())
+            self.health[name].record((time.perf_counter() - start) * 1000, ok)
+
+        future.add_done_callback(_record)
+        return future, token
+
+    def run(self, *args, default: Any = None, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Execute with hedging.
+
+        Returns:
+            tuple: (winning result or ``default``, info with winner/launched/
+            errors/latency_ms)
+        """
+        start = time.perf_counter()
+        pending: Dict[Future, str] = {}
+        tokens: Dict[Future, CancelToken] = {}
+        launched: List[str] = []
+        errors: Dict[str, str] = {}
+        next_i = 0
+        last_launch = start
+        winner: Optional[str] = None
+        result = default
+
+        while winner is None and (pending or next_i < len(self.backends)):
+            if not pending:
+                # 진행 중인 호출이 없으면 지연 없이 다음 백엔드 실행
+                future, token = self._launch(next_i, args, kwargs)
+                pending[future], tokens[future] = self.backends[next_i][0], token
+                launched.append(self.backends[next_i][0])
+                last_launch = time.perf_counter()
+                next_i += 1
+                continue
+
+            timeout = None
+            if next_i < len(self.backends):
+                delay = self.hedge_delay(self.backends[next_i - 1][0]) / 1000
+                timeout = max(0.0, last_launch + delay - time.perf_counter())
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                self.hedges += 1
+                future, token = self._launch(next_i, args, kwargs)
+                pending[future], tokens[future] = self.backends[next_i][0], token
+                launched.append(self.backends[next_i][0])
+                last_launch = time.perf_counter()
+                next_i += 1
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                if future.exception() is not None:
+                    errors[name] = repr(future.exception())
+                elif not self.is_valid(future.result()):
+                    errors[name] = "invalid result"
+                elif winner is None:
+                    winner, result = name, future.result()
+
+        for future in pending:
+            if not future.cancel():
+                # 이미 실행 중: 등록된 취소 훅(job.cancel 등) 호출
+                tokens[future].cancel()
+                self.abandoned += 1
+
+        if winner is None:
+            self.failures += 1
+        else:
+            self.wins[winner] += 1
+        info = {
+            "winner": winner,
+            "launched": launched,
+            "errors": errors,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        return result, info
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backends": {
+                name: {
+                    **self.health[name].to_dict(),
+                    "hedge_delay_ms": self.hedge_delay(name),
+                }
+                for name, _ in self.backends
+            },
+            "wins": dict(self.wins),
+            "hedges": self.hedges,
+            "abandoned": self.abandoned,
+            "failures": self.failures,
+        }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,248 @@
+"""Columnar ingest cache: every raw CSV is parsed once, then read as Parquet.
+
+``load_dataset(path, columns=...)`` is the single entry point for tabular
+inputs. On the first read of a CSV it infers compact dtypes and writes a
+Parquet copy:
+
+- float64 → float32, integers → the smallest integer type that fits;
+- low-cardinality text → ``category``;
+- text columns that fully parse as dates → ``datetime64``.
+
+The copy is keyed by a hash of the file content. A small index remembers
+each source's size and mtime, so an unchanged file is not re-hashed; a
+touched but identical file is re-hashed once and reuses its copy. Later
+reads load only the requested columns (Parquet column pruning)::
+
+    df = load_dataset("data/raw/sample.csv", columns=["timestamp", "feat_a"])
+
+The cache lives in ``data/cache/ingest`` (``NEBULA_INGEST_CACHE`` overrides).
+``.parquet`` inputs are read directly, with the same column pruning.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+CACHE_DIR_ENV = "NEBULA_INGEST_CACHE"
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "ingest"
+# dtype 추론 규칙이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_VERSION = 1
+
+_lock = threading.Lock()
+
+
+def cache_dir(path: Optional[str] = None) -> Path:
+    """Cache directory (argument, ``NEBULA_INGEST_CACHE`` or the default)."""
+    return Path(path or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """Content hash (blake2b, 128 bit) of a file, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def indexed_hash(path: str, cache: Optional[str] = None) -> str:
+    """
+    ``file_hash`` of ``path``, skipped while its size and mtime are unchanged.
+
+    The cache's ``index.json`` maps each resolved source path to the size,
+    mtime and hash seen last; on a miss the file is hashed and recorded.
+
+    Args:
+        path: Any file (CSV, Parquet, ...)
+        cache: Cache directory (default: ``cache_dir()``)
+
+    Returns:
+        str: The content hash
+    """
+    source = Path(path).resolve()
+    stat = source.stat()
+    directory = cache_dir(cache)
+    index_path = directory / "index.json"
+    with _lock:
+        entry = _read_json(index_path).get(str(source), {})
+    if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return entry["hash"]
+
+    digest = file_hash(str(source))
+    directory.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        index = _read_json(index_path)
+        index[str(source)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": digest,
+        }
+        _atomic_write_json(index_path, index)
+    return digest
+
+
+def _atomic_write_json(path: Path, data: Dict[str, Any]) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def infer_dtypes(
+    df: pd.DataFrame,
+    float32: bool = True,
+    category_ratio: float = 0.5,
+    parse_dates: bool = True,
+) -> pd.DataFrame:
+    """
+    Downcast numeric columns and convert text to category/datetime.
+
+    Args:
+        df: Frame as parsed by ``pd.read_csv``
+        float32: Downcast float64 columns to float32
+        category_ratio: Text columns with at most this share of distinct
+            values become ``category``
+        parse_dates: Convert text columns whose values all parse as dates
+
+    Returns:
+        pd.DataFrame: New frame with compact dtypes
+    """
+    out = {}
+    for name in df.columns:
+        col = df[name]
+        if pd.api.types.is_bool_dtype(col):
+            out[name] = col
+        elif pd.api.types.is_integer_dtype(col):
+            out[name] = pd.to_numeric(col, downcast="integer")
+        elif pd.api.types.is_float_dtype(col):
+            out[name] = col.astype("float32") if float32 else col
+        elif pd.api.types.is_object_dtype(col) or pd.api.types.is_string_dtype(col):
+            out[name] = _convert_text(col, category_ratio, parse_dates)
+        else:
+            out[name] = col
+    return pd.DataFrame(out, index=df.index)
+
+
+def _convert_text(col: pd.Series, category_ratio: float, parse_dates: bool):
+    present = col.dropna()
+    if len(present) == 0:
+        return col
+    if parse_dates:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            try:
+                # 앞부분 표본이 전부 날짜일 때만 전체 변환 시도
+                pd.to_datetime(present.iloc[:100])
+                parsed = pd.to_datetime(col, errors="coerce")
+            except (ValueError, TypeError, OverflowError):
+                parsed = None
+        if parsed is not None and parsed.notna().sum() == len(present):
+            return parsed
+    if present.nunique() <= category_ratio * len(present):
+        return col.astype("category")
+    return col
+
+
+def cached_parquet(
+    path: str,
+    cache: Optional[str] = None,
+    float32: bool = True,
+    read_csv_kwargs: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """
+    Parquet copy of ``path`` with inferred dtypes (created on first use).
+
+    Args:
+        path: Source CSV
+        cache: Cache directory (default: ``cache_dir()``)
+        float32: Passed to ``infer_dtypes``; part of the cache key
+        read_csv_kwargs: Extra ``pd.read_csv`` arguments; part of the cache key
+
+    Returns:
+        Path: The cached ``.parquet`` file
+    """
+    source = Path(path).resolve()
+    directory = cache_dir(cache)
+    directory.mkdir(parents=True, exist_ok=True)
+    options = json.dumps(
+        {"v": CACHE_VERSION, "float32": float32, "read_csv": read_csv_kwargs or {}},
+        sort_keys=True,
+        default=str,
+    )
+    digest = indexed_hash(str(source), cache)
+    key = hashlib.blake2b(f"{digest}:{options}".encode(), digest_size=16).hexdigest()
+    target = directory / f"{key}.parquet"
+
+    if not target.exists():
+        df = infer_dtypes(
+            pd.read_csv(source, **(read_csv_kwargs or {})), float32=float32
+        )
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, target)
+        _atomic_write_json(
+            directory / f"{key}.json",
+            {
+                "source": str(source),
+                "hash": digest,
+                "options": json.loads(options),
+                "rows": int(len(df)),
+                "columns": [str(c) for c in df.columns],
+                "dtypes": {str(c): str(t) for c, t in df.dtypes.items()},
+            },
+        )
+    return target
+
+
+def load_dataset(
+    path: str,
+    columns: Optional[Sequence[str]] = None,
+    use_cache: bool = True,
+    cache: Optional[str] = None,
+    float32: bool = True,
+    **read_csv_kwargs: Any,
+) -> pd.DataFrame:
+    """
+    Load a tabular dataset through the ingest cache.
+
+    Args:
+        path: ``.csv`` (cached as Parquet) or ``.parquet`` file
+        columns: Only these columns are read (None = all)
+        use_cache: False parses the CSV directly (same dtype inference)
+        cache: Cache directory (default: ``cache_dir()``)
+        float32: Downcast float64 columns to float32
+        **read_csv_kwargs: Extra ``pd.read_csv`` arguments for the first parse
+
+    Returns:
+        pd.DataFrame: The dataset with compact dtypes
+    """
+    columns = list(columns) if columns is not None else None
+    if str(path).endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    if not use_cache:
+        df = pd.read_csv(path, usecols=columns, **read_csv_kwargs)
+        return infer_dtypes(df, float32=float32)
+    target = cached_parquet(path, cache, float32, read_csv_kwargs)
+    return pd.read_parquet(target, columns=columns)
+
+
+def dataset_columns(path: str, cache: Optional[str] = None) -> List[str]:
+    """Column names of a dataset, from the Parquet schema (no data read)."""
+    import pyarrow.parquet as pq
+
+    target = path if str(path).endswith(".parquet") else cached_parquet(path, cache)
+    return list(pq.read_schema(target).names)
@@ -0,0 +1,319 @@
+"""Open-loop load generator and SLO verifier for search/RAG targets.
+
+Requests are issued on a fixed arrival schedule (Poisson or constant rate)
+regardless of how fast earlier requests complete, so a slow target builds
+a queue instead of silently lowering the offered load. Latency is measured
+from the *scheduled* arrival time, which keeps queueing delay in the
+percentiles (no coordinated omission).
+
+A target is any ``callable(query)`` that raises on failure; helpers wrap
+an in-process ``DataPipelineV2``, a FastAPI/httpx-style client (e.g. the
+service under ``TestClient``) or a remote base URL. When the target runs
+in-process, spans are captured for the duration of the run and summarized
+per stage (embedding, scoring, retrieval, generation, ...)::
+
+    queries = synthesize_queries(pipeline.chunks, 200)
+    report = run_load(pipeline_target(pipeline), queries, rps=5, duration_s=30)
+    check_slo(report, slo_from_config(pipeline.config))
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.tracing import capture, summarize
+
+_WORD_RE = re.compile(r"[A-Za-z가-힣][A-Za-z0-9가-힣+#.-]{2,}")
+
+# 설정에 값이 없을 때의 기본 SLO
+DEFAULT_MIN_THROUGHPUT_RPM = 100.0
+DEFAULT_MAX_ERROR_RATE = 0.01
+
+
+def arrival_schedule(
+    n: int, rps: float, process: str = "poisson", seed: Optional[int] = None
+) -> List[float]:
+    """
+    Arrival offsets (seconds from start) for ``n`` requests.
+
+    Args:
+        n: Number of requests
+        rps: Target mean arrival rate (requests/second)
+        process: ``poisson`` (exponential gaps) or ``constant``
+        seed: RNG seed for reproducible Poisson schedules
+
+    Returns:
+        list: Non-decreasing offsets in seconds
+    """
+    if rps <= 0:
+        raise ValueError("rps must be positive")
+    if process == "constant":
+        return [i / rps for i in range(n)]
+    if process != "poisson":
+        raise ValueError(f"unknown arrival process: {process}")
+    gaps = np.random.default_rng(seed).exponential(1.0 / rps, size=n)
+    # 첫 요청은 즉시 도착
+    return np.concatenate([[0.0], np.cumsum(gaps[:-1])]).tolist() if n else []
+
+
+def load_query_log(path: str) -> List[str]:
+    """
+    Read queries from a log file.
+
+    Accepts JSONL (``{"query": ...}`` per line), a JSON list of strings or
+    objects with a ``query`` key, or plain text with one query per line.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".json"):
+        items = json.loads(text)
+        return [i["query"] if isinstance(i, dict) else str(i) for i in items]
+    queries = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if path.endswith(".jsonl"):
+            queries.append(json.loads(line)["query"])
+        else:
+            queries.append(line)
+    return queries
+
+
+def synthesize_queries(
+    texts: Sequence[Any],
+    n: int,
+    min_words: int = 2,
+    max_words: int = 5,
+    seed: Optional[int] = None,
+) -> List[str]:
+    """
+    Synthesize ``n`` keyword queries from a chunk corpus.
+
+    Each query is a contiguous run of ``min_words``..``max_words`` words
+    taken from a random chunk, so query terms co-occur the way they do in
+    real documents.
+
+    Args:
+        texts: Chunk texts, or chunk dicts with a ``text`` key
+        n: Number of queries
+        min_words: Shortest query (words)
+        max_words: Longest query (words)
+        seed: RNG seed
+
+    Returns:
+        list: Query strings
+    """
+    rng = random.Random(seed)
+    docs = []
+    for t in texts:
+        words = _WORD_RE.findall(t.get("text", "") if isinstance(t, dict) else t)
+        if len(words) >= min_words:
+            docs.append([w.lower() for w in words])
+    if not docs:
+        raise ValueError("no chunk text to synthesize queries from")
+
+    queries = []
+    for _ in range(n):
+        words = rng.choice(docs)
+        k = rng.randint(min_words, min(max_words, len(words)))
+        start = rng.randint(0, len(words) - k)
+        queries.append(" ".join(words[start : start + k]))
+    return queries
+
+
+def pipeline_target(pipeline, top_k: int = 5, **search_kwargs) -> Callable[[str], Any]:
+    """In-process ``DataPipelineV2.search`` target."""
+
+    def target(query: str):
+        return pipeline.search(query, top_k=top_k, **search_kwargs)
+
+    return target
+
+
+def client_target(
+    client, endpoint: str = "/rag", top_k: int = 5
+) -> Callable[[str], Any]:
+    """Target posting ``{"query", "top_k"}`` through a FastAPI/httpx client."""
+
+    def target(query: str):
+        resp = client.post(endpoint, json={"query": query, "top_k": top_k})
+        if resp.status_code >= 400:
+            raise RuntimeError(f"HTTP {resp.status_code} from {endpoint}")
+        return resp.text if endpoint.endswith("/stream") else resp.json()
+
+    return target
+
+
+def http_target(
+    base_url: str, endpoint: str = "/rag", top_k: int = 5, timeout: float = 30.0
+) -> Callable[[str], Any]:
+    """Target posting to a running service (standard library only)."""
+    url = base_url.rstrip("/") + endpoint
+
+    def target(query: str):
+        body = json.dumps({"query": query, "top_k": top_k}).encode("utf-8")
+        req = urllib.request.Request(
+            url, data=body, headers={"Content-Type": "application/json"}
+        )
+        # 4xx/5xx는 HTTPError로 올라와 오류로 집계된다
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.read()
+
+    return target
+
+
+def _latency_summary(ms: np.ndarray) -> Dict[str, Optional[float]]:
+    if ms.size == 0:
+        return {k: None for k in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")}
+    return {
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def run_load(
+    target: Callable[[str], Any],
+    queries: Sequence[str],
+    rps: float,
+    duration_s: Optional[float] = None,
+    n_requests: Optional[int] = None,
+    process: str = "poisson",
+    concurrency: int = 32,
+    seed: Optional[int] = None,
+    capture_spans: bool = True,
+) -> Dict[str, Any]:
+    """
+    Drive ``target`` with open-loop arrivals and report latency/errors.
+
+    Args:
+        target: ``callable(query)``; an exception counts as an error
+        queries: Query pool, cycled in order
+        rps: Offered load (requests/second)
+        duration_s: Run length; ``n_requests`` defaults to ``rps * duration_s``
+        n_requests: Number of requests (overrides ``duration_s``)
+        process: Arrival process (``poisson`` or ``constant``)
+        concurrency: Worker threads; when all are busy requests queue and
+            the wait is included in their latency
+        seed: RNG seed for the arrival schedule
+        capture_spans: Collect in-process spans for per-stage statistics
+
+    Returns:
+        dict: requests, errors, error_rate, offered/achieved throughput,
+        end-to-end latency percentiles, per-stage span summary, error samples
+    """
+    if not queries:
+        raise ValueError("no queries")
+    if n_requests is None:
+        if duration_s is None:
+            raise ValueError("duration_s or n_requests is required")
+        n_requests = max(1, int(round(rps * duration_s)))
+
+    offsets = arrival_schedule(n_requests, rps, process, seed)
+    latencies = np.full(n_requests, np.nan)
+    errors: List[Optional[str]] = [None] * n_requests
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    def issue(i: int, scheduled: float) -> None:
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            target(queries[i % len(queries)])
+        except Exception as e:
+            errors[i] = f"{type(e).__name__}: {e}"
+        finally:
+            latencies[i] = (time.perf_counter() - scheduled) * 1000
+            with lock:
+                in_flight["now"] -= 1
+
+    def dispatch() -> float:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for i, offset in enumerate(offsets):
+                delay = start + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(issue, i, start + offset)
+        return time.perf_counter() - start
+
+    if capture_spans:
+        with capture() as exporter:
+            elapsed = dispatch()
+        spans = exporter.spans
+    else:
+        elapsed = dispatch()
+        spans = []
+
+    failed = [e for e in errors if e is not None]
+    ok = n_requests - len(failed)
+    report = {
+        "requests": n_requests,
+        "errors": len(failed),
+        "error_rate": round(len(failed) / n_requests, 4),
+        "arrival_process": process,
+        "offered_rps": rps,
+        "elapsed_s": round(elapsed, 3),
+        "achieved_rps": round(ok / elapsed, 3) if elapsed > 0 else 0.0,
+        "max_in_flight": in_flight["max"],
+        "latency": _latency_summary(latencies),
+        "stages": summarize(spans) if spans else {},
+        "error_samples": sorted(set(failed))[:5],
+    }
+    report["achieved_rpm"] = round(report["achieved_rps"] * 60, 1)
+    return report
+
+
+def slo_from_config(config: Dict[str, Any]) -> Dict[str, float]:
+    """
+    SLO thresholds from a pipeline config.
+
+    ``max_response_time`` (seconds) bounds p95 latency; ``min_throughput_rpm``
+    (default 100 req/min) and ``max_error_rate`` (default 1%) fill the rest.
+    """
+    return {
+        "p95_ms": float(config.get("max_response_time", 3.0)) * 1000,
+        "min_throughput_rpm": float(
+            config.get("min_throughput_rpm", DEFAULT_MIN_THROUGHPUT_RPM)
+        ),
+        "max_error_rate": float(config.get("max_error_rate", DEFAULT_MAX_ERROR_RATE)),
+    }
+
+
+def check_slo(report: Dict[str, Any], slo: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Compare a ``run_load`` report against SLO thresholds.
+
+    Returns:
+        dict: ``passed`` plus one ``{observed, threshold, passed}`` per check
+    """
+    p95 = report["latency"]["p95_ms"]
+    checks = {
+        "p95_latency": {
+            "observed": p95,
+            "threshold": slo["p95_ms"],
+            "passed": p95 is not None and p95 <= slo["p95_ms"],
+        },
+        "throughput": {
+            "observed": report["achieved_rpm"],
+            "threshold": slo["min_throughput_rpm"],
+            "passed": report["achieved_rpm"] >= slo["min_throughput_rpm"],
+        },
+        "error_rate": {
+            "observed": report["error_rate"],
+            "threshold": slo["max_error_rate"],
+            "passed": report["error_rate"] <= slo["max_error_rate"],
+        },
+    }
+    return {"passed": all(c["passed"] for c in checks.values()), "checks": checks}
@@ -0,0 +1,204 @@
+"""Precomputed metadata bitmaps for filtered vector search.
+
+Tags and categories are stored as packed NumPy bitmaps (one bit per chunk)
+and the ``score`` column as a sorted array, so a filter such as
+``tags contains X AND score >= N`` resolves to a few bitwise ANDs before any
+vector is scored.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+FilterSpec = Dict[str, Any]
+
+_CLAUSE_RE = re.compile(
+    r"^\s*(tags|category)\s+(?:contains|=|==)\s+['\"]?([^'\"]+?)['\"]?\s*$"
+    r"|^\s*score\s*(>=|<=|>|<)\s*(-?[\d.]+)\s*$",
+    re.IGNORECASE,
+)
+
+
+def parse_filter(expr: str) -> FilterSpec:
+    """
+    Parse a filter expression into a filter spec.
+
+    Supported clauses joined with AND: ``tags contains X``,
+    ``category = X``, ``score >= N`` (also ``>``, ``<=``, ``<``).
+    """
+    spec: FilterSpec = {}
+    for clause in re.split(r"\s+AND\s+", expr.strip(), flags=re.IGNORECASE):
+        m = _CLAUSE_RE.match(clause)
+        if not m:
+            raise ValueError(f"Unsupported filter clause: {clause!r}")
+        field, value, op, number = m.groups()
+        if field:
+            key = "tags" if field.lower() == "tags" else "category"
+            spec.setdefault(key, []).append(value.strip())
+        else:
+            n = float(number)
+            if op == ">=":
+                spec["min_score"] = n
+            elif op == ">":
+                spec["min_score"] = np.nextafter(n, np.inf)
+            elif op == "<=":
+                spec["max_score"] = n
+            else:
+                spec["max_score"] = np.nextafter(n, -np.inf)
+    return spec
+
+
+def _as_list(value: Union[str, Iterable[str], None]) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def _split_tags(tags: Any) -> List[str]:
+    if isinstance(tags, str):
+        return [t.strip() for t in tags.split(",") if t.strip()]
+    return [str(t) for t in (tags or [])]
+
+
+class MetadataBitmapIndex:
+    """Per-tag/per-category bitmaps plus a sorted score column."""
+
+    def __init__(self, metadata: List[Dict[str, Any]]):
+        self.n = len(metadata)
+        tag_rows: Dict[str, List[int]] = {}
+        category_rows: Dict[str, List[int]] = {}
+        for i, meta in enumerate(metadata):
+            for tag in _split_tags(meta.get("tags")):
+                tag_rows.setdefault(tag, []).append(i)
+            category = str(meta.get("category", "unknown"))
+            category_rows.setdefault(category, []).append(i)
+
+        self.tag_bitmaps = {t: self._pack(rows) for t, rows in tag_rows.items()}
+        self.category_bitmaps = {
+            c: self._pack(rows) for c, rows in category_rows.items()
+        }
+        self.tag_counts = {t: len(rows) for t, rows in tag_rows.items()}
+        self.category_counts = {c: len(rows) for c, rows in category_rows.items()}
+
+        scores = np.array(
+            [float(meta.get("score", 0) or 0) for meta in metadata], dtype=np.float64
+        )
+        self.score_order = np.argsort(scores, kind="stable")
+        self.sorted_scores = scores[self.score_order]
+
+    def _pack(self, rows: Iterable[int]) -> np.ndarray:
+        bits = np.zeros(self.n, dtype=bool)
+        bits[list(rows)] = True
+        return np.packbits(bits)
+
+    def _all(self) -> np.ndarray:
+        return np.packbits(np.ones(self.n, dtype=bool))
+
+    def _score_range(self, spec: FilterSpec) -> tuple:
+        lo = 0
+        hi = self.n
+        if spec.get("min_score") is not None:
+            lo = int(np.searchsorted(self.sorted_scores, spec["min_score"], "left"))
+        if spec.get("max_score") is not None:
+            hi = int(np.searchsorted(self.sorted_scores, spec["max_score"], "right"))
+        return lo, max(lo, hi)
+
+    def bitmap(self, spec: FilterSpec) -> np.ndarray:
+        """Packed bitmap of rows matching every clause of the spec."""
+        mask = self._all()
+        empty = np.zeros_like(mask)
+        # tags: 모든 태그 포함 (AND)
+        for tag in _as_list(spec.get("tags")):
+            mask &= self.tag_bitmaps.get(tag, empty)
+        # category: 나열된 카테고리 중 하나 (OR)
+        categories = _as_list(spec.get("category"))
+        if categories:
+            any_cat = empty.copy()
+            for category in categories:
+                any_cat |= self.category_bitmaps.get(category, empty)
+            mask &= any_cat
+        if spec.get("min_score") is not None or spec.get("max_score") is not None:
+            lo, hi = self._score_range(spec)
+            mask &= self._pack(self.score_order[lo:hi])
+        return mask
+
+    def mask(self, spec: FilterSpec) -> np.ndarray:
+        """Boolean row mask for the spec."""
+        return np.unpackbits(self.bitmap(spec), count=self.n).astype(bool)
+
+    def matching_indices(self, spec: FilterSpec) -> np.ndarray:
+        """Row indices matching the spec, ascending."""
+        return np.flatnonzero(self.mask(spec))
+
+    def estimate_selectivity(self, spec: FilterSpec) -> float:
+        """
+        Estimate the matching fraction from precomputed counts.
+
+        Clauses are assumed independent, so no bitmap is touched.
+        """
+        if self.n == 0:
+            return 0.0
+        sel = 1.0
+        for tag in _as_list(spec.get("tags")):
+            sel *= self.tag_counts.get(tag, 0) / self.n
+        categories = _as_list(spec.get("category"))
+        if categories:
+            hits = sum(self.category_counts.get(c, 0) for c in categories)
+            sel *= min(1.0, hits / self.n)
+        if spec.get("min_score") is not None or spec.get("max_score") is not None:
+            lo, hi = self._score_range(spec)
+            sel *= (hi - lo) / self.n
+        return float(sel)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Arrays for ``np.savez``."""
+        arrays: Dict[str, Any] = {
+            "n": np.array(self.n),
+            "score_order": self.score_order,
+            "sorted_scores": self.sorted_scores,
+        }
+        for tag, bm in self.tag_bitmaps.items():
+            arrays[f"tag::{tag}"] = bm
+        for category, bm in self.category_bitmaps.items():
+            arrays[f"category::{category}"] = bm
+        return arrays
+
+    @classmethod
+    def from_dict(cls, arrays: Dict[str, Any]) -> "MetadataBitmapIndex":
+        """Rebuild an index saved with ``to_dict``."""
+        index = cls([])
+        index.n = int(arrays["n"])
+        index.score_order = np.asarray(arrays["score_order"])
+        index.sorted_scores = np.asarray(arrays["sorted_scores"])
+        for key in arrays.keys():
+            kind, _, name = key.partition("::")
+            if kind == "tag":
+                index.tag_bitmaps[name] = np.asarray(arrays[key])
+            elif kind == "category":
+                index.category_bitmaps[name] = np.asarray(arrays[key])
+        index.tag_counts = {
+            t: int(np.unpackbits(bm, count=index.n).sum())
+            for t, bm in index.tag_bitmaps.items()
+        }
+        index.category_counts = {
+            c: int(np.unpackbits(bm, count=index.n).sum())
+            for c, bm in index.category_bitmaps.items()
+        }
+        return index
+
+
+def choose_strategy(selectivity: float, prefilter_max: float = 0.3) -> str:
+    """'prefilter' scores only matching rows; 'postfilter' scores all rows."""
+    return "prefilter" if selectivity <= prefilter_max else "postfilter"
+
+
+def normalize_filter(filters: Optional[Union[str, FilterSpec]]) -> FilterSpec:
+    """Accept a filter expression or spec dict."""
+    if not filters:
+        return {}
+    if isinstance(filters, str):
+        return parse_filter(filters)
+    return dict(filters)
@@ -0,0 +1,334 @@
+"""Prometheus-style counters, gauges and bucketed histograms.
+
+Metrics live in a process-wide ``REGISTRY`` and are rendered in the
+Prometheus text exposition format, either served at ``/metrics`` by the
+retrieval service or written to a ``.prom`` file by batch jobs (the
+node_exporter textfile-collector convention). ``parse_text`` and
+``histogram_quantile`` read that format back, so offline consumers such as
+the KPI job can compute p95 from the same data a scraper would see.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> List[float]:
+    return [start * factor**i for i in range(count)]
+
+
+# 0.5ms ~ 32s
+LATENCY_BUCKETS = exponential_buckets(0.0005, 2.0, 17)
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str = ""):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> Iterator[Tuple[str, LabelKey, float]]:
+        for key, value in sorted(self._values.items()):
+            yield self.name, key, value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("counters can only increase")
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram (``_bucket``/``_sum``/``_count`` series)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str = "",
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation)
+        self.buckets = sorted(float(b) for b in buckets)
+        if self.buckets[-1] != math.inf:
+            self.buckets.append(math.inf)
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    counts[i] += 1
+                    break
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall time (seconds) of the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(_label_key(labels), []))
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Bucket-interpolated quantile (None if no observations)."""
+        counts = self._counts.get(_label_key(labels))
+        if not counts:
+            return None
+        cumulative, total = [], 0
+        for c in counts:
+            total += c
+            cumulative.append(total)
+        return histogram_quantile(q, list(zip(self.buckets, cumulative)))
+
+    def samples(self) -> Iterator[Tuple[str, LabelKey, float]]:
+        for key in sorted(self._counts):
+            total = 0
+            for upper, c in zip(self.buckets, self._counts[key]):
+                total += c
+                le = ("le", _format_value(upper))
+                yield f"{self.name}_bucket", key + (le,), total
+            yield f"{self.name}_sum", key, self._sums[key]
+            yield f"{self.name}_count", key, total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+
+def histogram_quantile(
+    q: float, buckets: Sequence[Tuple[float, float]]
+) -> Optional[float]:
+    """
+    PromQL-style quantile from cumulative ``(upper_bound, count)`` buckets.
+
+    Linear interpolation inside the bucket that holds the rank; a rank that
+    falls in the ``+Inf`` bucket returns the largest finite bound.
+    """
+    buckets = sorted(buckets)
+    if not buckets or buckets[-1][1] == 0:
+        return None
+    rank = q * buckets[-1][1]
+    prev_upper, prev_count = 0.0, 0.0
+    for upper, count in buckets:
+        if count >= rank:
+            if upper == math.inf:
+                return prev_upper
+            if count == prev_count:
+                return upper
+            return prev_upper + (upper - prev_upper) * (rank - prev_count) / (
+                count - prev_count
+            )
+        prev_upper, prev_count = upper, count
+    return prev_upper
+
+
+class MetricsRegistry:
+    """Named metrics; ``counter``/``gauge``/``histogram`` return existing ones."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, documentation: str, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str = "") -> Counter:
+        return self._get(Counter, name, documentation)
+
+    def gauge(self, name: str, documentation: str = "") -> Gauge:
+        return self._get(Gauge, name, documentation)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str = "",
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, documentation, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            if metric.documentation:
+                lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> str:
+        """Atomically write ``render()`` to ``path`` (for batch jobs)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+        return path
+
+    def clear(self) -> None:
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 공용 메트릭 (검색/임베딩/캐시/BigQuery/적재)
+SEARCH_LATENCY = REGISTRY.histogram(
+    "nebula_search_latency_seconds", "Search latency by mode"
+)
+SEARCH_REQUESTS = REGISTRY.counter(
+    "nebula_search_requests_total", "Search calls by mode and status"
+)
+EMBEDDING_LATENCY = REGISTRY.histogram(
+    "nebula_embedding_latency_seconds", "Embedding call latency by backend"
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "nebula_cache_requests_total", "Cache lookups by cache and result (hit/miss)"
+)
+BIGQUERY_BYTES_BILLED = REGISTRY.counter(
+    "nebula_bigquery_bytes_billed_total", "BigQuery bytes billed by stage"
+)
+INGEST_ROWS = REGISTRY.counter("nebula_ingest_rows_total", "Rows ingested by job")
+INGEST_ROWS_PER_SECOND = REGISTRY.gauge(
+    "nebula_ingest_rows_per_second", "Throughput of the last ingest run by job"
+)
+HTTP_REQUESTS = REGISTRY.counter(
+    "nebula_http_requests_total", "HTTP requests by endpoint and status"
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "nebula_http_request_duration_seconds", "HTTP request latency by endpoint"
+)
+
+
+def parse_text(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """Parse Prometheus text format into ``(name, labels, value)`` samples."""
+    samples = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if "{" in line:
+            name, rest = line.split("{", 1)
+            body, value = rest.rsplit("}", 1)
+            labels = {}
+            for pair in body.split(",") if body else []:
+                k, v = pair.split("=", 1)
+                labels[k.strip()] = v.strip().strip('"')
+        else:
+            name, value = line.split(None, 1)
+            labels = {}
+        value = value.split()[0]
+        samples.append((name, labels, math.inf if value == "+Inf" else float(value)))
+    return samples
+
+
+def quantile_from_samples(
+    samples: Sequence[Tuple[str, Dict[str, str], float]],
+    metric: str,
+    q: float,
+    **match: str,
+) -> Optional[float]:
+    """Quantile of a histogram, summing all series whose labels match ``match``."""
+    totals: Dict[float, float] = {}
+    for name, labels, value in samples:
+        if name != f"{metric}_bucket":
+            continue
+        if any(labels.get(k) != v for k, v in match.items()):
+            continue
+        le = labels["le"]
+        upper = math.inf if le == "+Inf" else float(le)
+        totals[upper] = totals.get(upper, 0.0) + value
+    return histogram_quantile(q, list(totals.items()))
+
+
+def sum_samples(
+    samples: Sequence[Tuple[str, Dict[str, str], float]], metric: str, **match: str
+) -> float:
+    """Sum of a counter/gauge over series whose labels match ``match``."""
+    return sum(
+        value
+        for name, labels, value in samples
+        if name == metric and all(labels.get(k) == v for k, v in match.items())
+    )
@@ -0,0 +1,140 @@
+"""Asyncio micro-batching request coalescer.
+
+Concurrent callers ``await batcher.submit(item)``; a single drain task
+collects items for up to ``max_wait_ms`` or ``max_batch_size`` items, runs
+one ``batch_fn(items)`` call in a worker thread and resolves each caller's
+future with its slice of the result.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+def _bucket(size: int) -> str:
+    """Power-of-two histogram bucket label (1, 2, 4, 8, ...)."""
+    upper = 1
+    while upper < size:
+        upper *= 2
+    return str(upper)
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent requests into batched calls.
+
+    Args:
+        batch_fn: Blocking ``batch_fn(items) -> results`` (same length/order)
+        max_batch_size: Flush once this many items are queued
+        max_wait_ms: Flush at most this long after the first queued item
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batch_size_hist: Counter = Counter()
+        self.queue_depth_hist: Counter = Counter()
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.batch_ms_total = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> List[tuple]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            self.queue_depth_hist[_bucket(self.queue_depth + 1)] += 1
+            items = [item for item, _ in batch]
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(None, self.batch_fn, items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"batch_fn returned {len(results)} results for "
+                        f"{len(items)} items"
+                    )
+            except Exception as e:
+                self.errors += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.batch_ms_total += (time.perf_counter() - start) * 1000
+                self.batches += 1
+                self.items += len(items)
+                self.batch_size_hist[_bucket(len(items))] += 1
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus batch-size and queue-depth histograms."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self.queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+            "avg_batch_size": round(self.items / self.batches, 3)
+            if self.batches
+            else 0.0,
+            "avg_batch_ms": round(self.batch_ms_total / self.batches, 3)
+            if self.batches
+            else 0.0,
+            "batch_size_hist": dict(sorted(self.batch_size_hist.items(), key=_key)),
+            "queue_depth_hist": dict(sorted(self.queue_depth_hist.items(), key=_key)),
+        }
+
+
+def _key(kv: tuple) -> int:
+    return int(kv[0])
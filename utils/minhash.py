@@ -0,0 +1,146 @@
+"""MinHash + LSH banding for near-duplicate chunk detection.
+
+Signatures are computed from word shingles and indexed with LSH banding, so
+candidate lookup cost does not grow with the number of indexed chunks. The
+detector keeps its state between calls, which lets batched ingestion
+deduplicate against everything seen so far.
+"""
+
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Split text into a set of word ``size``-grams."""
+    words = str(text).lower().split()
+    if not words:
+        return set()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose LSH (bands, rows) so the S-curve midpoint is closest to threshold.
+
+    Args:
+        threshold: Target Jaccard similarity
+        num_perm: Number of MinHash permutations
+
+    Returns:
+        tuple: (bands, rows_per_band) with bands * rows <= num_perm
+    """
+    best = (1, num_perm)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands == 0:
+            break
+        err = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class MinHasher:
+    """Universal-hash MinHash signature generator."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 61, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 61, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the MinHash signature (uint64, length ``num_perm``)."""
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) for g in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+        with np.errstate(over="ignore"):
+            phv = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME
+        return (phv & _MAX_HASH).min(axis=0)
+
+
+def estimate_jaccard(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimate Jaccard similarity from two MinHash signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+class NearDuplicateDetector:
+    """
+    Streaming near-duplicate detector.
+
+    Only cluster representatives are indexed. ``add`` returns the key of the
+    representative a new item duplicates, or None when the item starts a new
+    cluster.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self.clusters: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, sig: np.ndarray) -> Iterable[bytes]:
+        for band in range(self.bands):
+            start = band * self.rows
+            yield sig[start : start + self.rows].tobytes()
+
+    def candidates(self, sig: np.ndarray) -> Set[str]:
+        """Return representative keys sharing at least one LSH band."""
+        found: Set[str] = set()
+        for band, key in enumerate(self._band_keys(sig)):
+            found.update(self._buckets[band].get(key, ()))
+        return found
+
+    def find(self, text: str) -> Optional[str]:
+        """Return the best-matching representative for text, if any."""
+        return self._match(self.hasher.signature(text))
+
+    def _match(self, sig: np.ndarray) -> Optional[str]:
+        best_key, best_sim = None, self.threshold
+        for key in self.candidates(sig):
+            sim = estimate_jaccard(sig, self._signatures[key])
+            if sim >= best_sim:
+                best_key, best_sim = key, sim
+        return best_key
+
+    def add(self, key: str, text: str) -> Optional[str]:
+        """Add an item; return its representative key if it is a duplicate."""
+        sig = self.hasher.signature(text)
+        rep = self._match(sig)
+        if rep is not None:
+            self.clusters[rep].append(key)
+            return rep
+        self._signatures[key] = sig
+        self.clusters[key] = []
+        for band, band_key in enumerate(self._band_keys(sig)):
+            self._buckets[band].setdefault(band_key, []).append(key)
+        return None
+
+    def add_batch(self, items: Iterable[Tuple[str, str]]) -> List[Optional[str]]:
+        """Add (key, text) pairs in order; see ``add``."""
+        return [self.add(key, text) for key, text in items]
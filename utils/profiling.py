@@ -0,0 +1,401 @@
+"""Out-of-core dataset profiling with mergeable per-column summaries.
+
+``profile_file`` streams a CSV (pyarrow reader) or Parquet file in record
+batches and never holds more than one batch per worker in memory. Each
+batch is reduced to a ``ProfileState``:
+
+- null counts for every column;
+- count/mean/M2/min/max of numeric columns (Welford/Chan merges);
+- a KLL quantile sketch per numeric column;
+- a HyperLogLog distinct-count sketch per column.
+
+States merge associatively, so batches can be summarized in a process
+pool and combined in any order. ``ProfileState.to_profile`` emits the
+``dataset_profile.json`` schema of ``dataset_ingest.profile`` (with
+sketch-based quartiles), plus ``distinct_approx``.
+"""
+
+import hashlib
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+Columns = Dict[str, Tuple[np.ndarray, bool]]
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (KLL compactors, ``k`` controls accuracy).
+
+    Rank error is roughly ``1.7 / k`` of the stream length with high
+    probability; memory is O(k) regardless of the number of values.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.n = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # 홀수 개면 하나를 남기고 나머지를 절반으로 압축
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep) :]
+                offset = int(self._rng.integers(2))
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], pairs[offset::2]]
+                )
+                self.levels[level] = keep
+            level += 1
+
+    def update(self, values: np.ndarray) -> "KLLSketch":
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        # 큰 배치는 용량 단위로 나눠 넣어 메모리를 O(k)로 유지
+        step = max(self.k * 4, 1)
+        for start in range(0, len(values), step):
+            self.levels[0] = np.concatenate(
+                [self.levels[0], values[start : start + step]]
+            )
+            self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs) -> np.ndarray:
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(items), 2.0**h) for h, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        values, cum = values[order], np.cumsum(weights[order])
+        # pandas 기본(선형 보간)에 가깝게: 순위 q*(N-1)을 가중 누적 순위로 조회
+        ranks = qs * (cum[-1] - 1)
+        centers = cum - weights[order] / 2 - 0.5
+        return np.interp(ranks, centers, values)
+
+
+class HyperLogLog:
+    """Distinct-count sketch with ``2**p`` one-byte registers."""
+
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray) -> "HyperLogLog":
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return self
+        p = np.uint64(self.p)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # 나머지 (64-p)비트의 선행 0 개수 + 1 (frexp로 정확한 비트 길이)
+        hi = (rest >> np.uint64(32)).astype(np.float64)
+        lo = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        bit_length = np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+        rho = (64 - int(p)) - bit_length + 1
+        np.maximum.at(self.registers, index, rho.astype(np.uint8))
+        return self
+
+    def update(self, values: np.ndarray) -> "HyperLogLog":
+        return self.update_hashes(pd.util.hash_array(np.asarray(values)))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # 선형 계수 (작은 범위 보정)
+        return int(round(estimate))
+
+
+class ProfileState:
+    """Mergeable per-column summary of any number of rows."""
+
+    def __init__(self, kll_k: int = 200, hll_p: int = 14):
+        self.kll_k = kll_k
+        self.hll_p = hll_p
+        self.rows = 0
+        self.columns: List[str] = []
+        self.nulls: Dict[str, int] = {}
+        self.non_numeric: set = set()
+        self.count: Dict[str, int] = {}
+        self.mean: Dict[str, float] = {}
+        self.m2: Dict[str, float] = {}
+        self.min: Dict[str, float] = {}
+        self.max: Dict[str, float] = {}
+        self.quantiles: Dict[str, KLLSketch] = {}
+        self.distinct: Dict[str, HyperLogLog] = {}
+
+    def _add_column(self, name: str) -> None:
+        if name not in self.nulls:
+            self.columns.append(name)
+            self.nulls[name] = 0
+            self.distinct[name] = HyperLogLog(self.hll_p)
+
+    def _merge_moments(self, name, count, mean, m2, lo, hi) -> None:
+        if count == 0:
+            if name not in self.count:
+                self.count[name], self.mean[name], self.m2[name] = 0, 0.0, 0.0
+                self.min[name], self.max[name] = math.inf, -math.inf
+            return
+        n_a = self.count.get(name, 0)
+        if n_a == 0:
+            self.count[name], self.mean[name], self.m2[name] = count, mean, m2
+            self.min[name], self.max[name] = lo, hi
+            return
+        # Chan et al. 병렬 분산 결합
+        n = n_a + count
+        delta = mean - self.mean[name]
+        self.mean[name] += delta * count / n
+        self.m2[name] += m2 + delta * delta * n_a * count / n
+        self.count[name] = n
+        self.min[name] = min(self.min[name], lo)
+        self.max[name] = max(self.max[name], hi)
+
+    def update(self, columns: Columns, rows: int) -> "ProfileState":
+        """Summarize one batch: ``{name: (values, is_numeric)}``."""
+        self.rows += rows
+        for name, (values, numeric) in columns.items():
+            self._add_column(name)
+            if numeric:
+                values = np.asarray(values, dtype=np.float64)
+                valid = values[~np.isnan(values)]
+                self.nulls[name] += len(values) - len(valid)
+                if len(valid):
+                    mean = float(valid.mean())
+                    m2 = float(((valid - mean) ** 2).sum())
+                    lo, hi = float(valid.min()), float(valid.max())
+                else:
+                    mean = m2 = 0.0
+                    lo, hi = math.inf, -math.inf
+                self._merge_moments(name, len(valid), mean, m2, lo, hi)
+                if name not in self.quantiles:
+                    self.quantiles[name] = KLLSketch(self.kll_k, seed=0)
+                self.quantiles[name].update(valid)
+                self.distinct[name].update(valid)
+            else:
+                self.non_numeric.add(name)
+                null = pd.isna(values)
+                self.nulls[name] += int(null.sum())
+                present = values[~null]
+                if len(present):
+                    self.distinct[name].update(present.astype(str))
+        return self
+
+    def merge(self, other: "ProfileState") -> "ProfileState":
+        self.rows += other.rows
+        self.non_numeric |= other.non_numeric
+        for name in other.columns:
+            self._add_column(name)
+            self.nulls[name] += other.nulls[name]
+            self.distinct[name].merge(other.distinct[name])
+            if name in other.count:
+                self._merge_moments(
+                    name,
+                    other.count[name],
+                    other.mean[name],
+                    other.m2[name],
+                    other.min[name],
+                    other.max[name],
+                )
+            if name in other.quantiles:
+                if name in self.quantiles:
+                    self.quantiles[name].merge(other.quantiles[name])
+                else:
+                    self.quantiles[name] = other.quantiles[name]
+        return self
+
+    def numeric_columns(self) -> List[str]:
+        return [
+            c for c in self.columns if c in self.count and c not in self.non_numeric
+        ]
+
+    def to_profile(self, hash_head100: Optional[str] = None) -> Dict[str, Any]:
+        """``dataset_profile.json`` fields (rounded like ``df.describe``)."""
+        desc = {}
+        for name in self.numeric_columns():
+            count = self.count[name]
+            q25, q50, q75 = self.quantiles[name].quantiles([0.25, 0.5, 0.75])
+            stats = {
+                "count": float(count),
+                "mean": self.mean[name] if count else math.nan,
+                "std": math.sqrt(self.m2[name] / (count - 1))
+                if count > 1
+                else math.nan,
+                "min": self.min[name] if count else math.nan,
+                "25%": float(q25),
+                "50%": float(q50),
+                "75%": float(q75),
+                "max": self.max[name] if count else math.nan,
+            }
+            desc[name] = {k: round(v, 4) for k, v in stats.items()}
+        return {
+            "rows": int(self.rows),
+            "cols": len(self.columns),
+            "null_pct": {
+                c: round(self.nulls[c] / self.rows, 4) if self.rows else 0.0
+                for c in self.columns
+            },
+            "numeric_desc": desc,
+            "hash_head100": hash_head100,
+            "distinct_approx": {c: self.distinct[c].count() for c in self.columns},
+        }
+
+
+def _summarize(columns: Columns, rows: int, kll_k: int, hll_p: int) -> ProfileState:
+    return ProfileState(kll_k, hll_p).update(columns, rows)
+
+
+def _arrow_columns(batch) -> Columns:
+    import pyarrow.types as pat
+
+    columns = {}
+    for name, array in zip(batch.schema.names, batch.columns):
+        numeric = pat.is_integer(array.type) or pat.is_floating(array.type)
+        if numeric:
+            values = array.cast("float64").to_numpy(zero_copy_only=False)
+        else:
+            values = np.asarray(array.to_pandas(), dtype=object)
+        columns[name] = (values, numeric)
+    return columns
+
+
+def _pandas_columns(chunk: pd.DataFrame) -> Columns:
+    columns = {}
+    for name in chunk.columns:
+        series = chunk[name]
+        numeric = pd.api.types.is_numeric_dtype(
+            series
+        ) and not pd.api.types.is_bool_dtype(series)
+        values = (
+            series.to_numpy(dtype=np.float64, na_value=np.nan)
+            if numeric
+            else series.to_numpy(dtype=object)
+        )
+        columns[str(name)] = (values, numeric)
+    return columns
+
+
+def iter_batches(
+    path: str, batch_rows: int = 100_000, block_size: int = 16 << 20
+) -> Iterator[Tuple[Columns, int]]:
+    """
+    Stream ``(columns, rows)`` batches from a CSV or Parquet file.
+
+    CSV goes through pyarrow's streaming reader, with integer columns read
+    as float64 so a later block with NaNs or decimals cannot fail the
+    conversion. If a later block still disagrees with the inferred types,
+    the file is re-read with pandas' chunked C parser.
+    """
+    import pyarrow as pa
+
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+            yield _arrow_columns(batch), batch.num_rows
+        return
+
+    import pyarrow.csv as pacsv
+
+    read_options = pacsv.ReadOptions(block_size=block_size)
+    with pacsv.open_csv(path, read_options=read_options) as reader:
+        schema = reader.schema
+    column_types = {f.name: pa.float64() for f in schema if pa.types.is_integer(f.type)}
+    convert_options = pacsv.ConvertOptions(column_types=column_types)
+    emitted = 0
+    try:
+        with pacsv.open_csv(
+            path, read_options=read_options, convert_options=convert_options
+        ) as reader:
+            for batch in reader:
+                yield _arrow_columns(batch), batch.num_rows
+                emitted += batch.num_rows
+    except pa.ArrowInvalid:
+        # 타입 추론과 다른 블록: 이미 내보낸 행 이후부터 pandas로 이어서 읽는다
+        for chunk in pd.read_csv(
+            path, chunksize=batch_rows, skiprows=range(1, emitted + 1)
+        ):
+            yield _pandas_columns(chunk), len(chunk)
+
+
+def head_hash(path: str, rows: int = 100) -> str:
+    """``hash_head100`` of ``dataset_ingest.profile`` without a full read."""
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        batch = next(pq.ParquetFile(path).iter_batches(batch_size=rows), None)
+        head = batch.to_pandas() if batch is not None else pd.DataFrame()
+    else:
+        head = pd.read_csv(path, nrows=rows)
+    return hashlib.md5(str(head.head(rows).to_dict()).encode()).hexdigest()
+
+
+def profile_file(
+    path: str,
+    batch_rows: int = 100_000,
+    workers: int = 0,
+    kll_k: int = 200,
+    hll_p: int = 14,
+) -> Dict[str, Any]:
+    """
+    Profile a CSV/Parquet file in bounded memory.
+
+    Args:
+        path: ``.csv`` or ``.parquet`` file
+        batch_rows: Rows per streamed batch (Parquet) / pandas fallback chunk
+        workers: Process-pool size for batch summaries (0 = in-process)
+        kll_k: Quantile sketch size (rank error ≈ 1.7/k)
+        hll_p: HyperLogLog precision (relative error ≈ 1.04/sqrt(2**p))
+
+    Returns:
+        dict: ``dataset_profile.json`` fields plus ``distinct_approx``
+    """
+    state = ProfileState(kll_k, hll_p)
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            for columns, rows in iter_batches(path, batch_rows):
+                pending.append(pool.submit(_summarize, columns, rows, kll_k, hll_p))
+                # 진행 중 배치 수를 제한해 메모리를 일정하게 유지
+                if len(pending) >= 2 * workers:
+                    state.merge(pending.pop(0).result())
+            for future in pending:
+                state.merge(future.result())
+    else:
+        for columns, rows in iter_batches(path, batch_rows):
+            state.update(columns, rows)
+    return state.to_profile(head_hash(path))
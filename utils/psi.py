@@ -1,5 +1,53 @@
+"""Population Stability Index (PSI) for one pair or many columns × windows.
+
+``population_stability_index`` compares two 1-D samples. ``batch_psi``
+computes PSI for every column of a 2-D array across many
+``(baseline, current)`` row-window pairs at once: bin edges are shared
+quantiles of a reference range, each column is binned once with
+``np.searchsorted``, per-segment bin counts come from one ``np.bincount``
+per column, and every window's histogram is a difference of prefix sums. The cost is
+one scan of the data no matter how many windows are compared.
+"""
+
+import warnings
+from typing import Iterable, List, Optional, Sequence, Tuple
+
 import numpy as np
 
+# 빈 구간에서 log(0)을 피하기 위한 가산 상수 (기존 구현과 동일)
+EPSILON = 1e-10
+
+Window = Tuple[int, int]
+WindowPair = Tuple[Window, Window]
+
+
+def _smoothed(counts: np.ndarray, total: np.ndarray) -> np.ndarray:
+    return (counts + EPSILON) / (total + EPSILON * counts.shape[-1])[..., None]
+
+
+def psi_from_counts(expected, actual, min_samples: int = 0) -> np.ndarray:
+    """
+    PSI from bin counts, vectorized over leading axes.
+
+    Args:
+        expected: Baseline counts, shape ``(..., bins)``
+        actual: Current counts, same shape
+        min_samples: Pairs where either side has fewer samples get 0.0
+
+    Returns:
+        np.ndarray: PSI with shape ``expected.shape[:-1]``
+    """
+    expected = np.asarray(expected, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    n_expected = expected.sum(axis=-1)
+    n_actual = actual.sum(axis=-1)
+    expected_p = _smoothed(expected, n_expected)
+    actual_p = _smoothed(actual, n_actual)
+    psi = np.sum((actual_p - expected_p) * np.log(actual_p / expected_p), axis=-1)
+    if min_samples:
+        psi = np.where((n_expected < min_samples) | (n_actual < min_samples), 0.0, psi)
+    return psi
+
 
 def population_stability_index(expected, actual, bins=10, min_samples=50):
     """Calculate Population Stability Index (PSI) between two distributions."""
@@ -30,21 +78,176 @@ def population_stability_index(expected, actual, bins=10, min_samples=50):
     epsilon = 1e-10
     bin_edges = np.linspace(global_min - epsilon, global_max + epsilon, bins + 1)
 
-    # Calculate histograms
-    expected_hist, _ = np.histogram(expected, bins=bin_edges)
-    actual_hist, _ = np.histogram(actual, bins=bin_edges)
+    # Bin both samples in one pass against the interior edges
+    inner_edges = bin_edges[1:-1]
+    codes = np.searchsorted(inner_edges, np.concatenate([expected, actual]), "right")
+    counts = np.stack(
+        [
+            np.bincount(codes[: len(expected)], minlength=bins),
+            np.bincount(codes[len(expected) :], minlength=bins),
+        ]
+    )
+    return float(psi_from_counts(counts[0], counts[1]))
+
+
+def quantile_edges(
+    data, bins: int = 10, reference: Optional[Window] = None
+) -> np.ndarray:
+    """
+    Per-column interior quantile edges, shape ``(n_columns, bins - 1)``.
+
+    Args:
+        data: 2-D array ``(n_rows, n_columns)``
+        bins: Number of bins
+        reference: Row range ``(start, end)`` the edges are fitted on
+            (default: all rows)
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if reference is not None:
+        data = data[reference[0] : reference[1]]
+    if len(data) == 0:
+        return np.zeros((data.shape[1], bins - 1))
+    q = np.linspace(0.0, 1.0, bins + 1)[1:-1]
+    with warnings.catch_warnings():
+        # 전부 NaN인 열 → NaN 경계 → 0으로 대체 (값이 없으므로 무관)
+        warnings.simplefilter("ignore", RuntimeWarning)
+        edges = np.nanquantile(data, q, axis=0).T
+    return np.nan_to_num(edges, nan=0.0)
+
+
+def window_counts(
+    data, windows: Sequence[Window], edges: np.ndarray, bins: int
+) -> np.ndarray:
+    """
+    Bin counts of every column within every row window.
+
+    Each column is binned once; counts per segment between consecutive
+    window boundaries come from a single ``bincount``, and window counts
+    are differences of their prefix sums. NaNs are not counted.
+
+    Returns:
+        np.ndarray: Counts, shape ``(n_windows, n_columns, bins)``
+    """
+    data = np.asarray(data, dtype=np.float64)
+    n_rows, n_cols = data.shape
+    bounds = np.unique(
+        np.clip(np.array([0, n_rows] + [b for w in windows for b in w]), 0, n_rows)
+    )
+    # 행 → 구간(segment) 번호
+    segment = np.searchsorted(bounds, np.arange(n_rows), side="right") - 1
+    n_segments = len(bounds)
+
+    counts = np.zeros((n_segments, n_cols, bins), dtype=np.int64)
+    for j in range(n_cols):
+        column = data[:, j]
+        valid = ~np.isnan(column)
+        codes = np.searchsorted(edges[j], column[valid], side="right")
+        flat = segment[valid] * bins + codes
+        counts[:, j, :] = np.bincount(flat, minlength=n_segments * bins).reshape(
+            n_segments, bins
+        )
+
+    prefix = np.concatenate(
+        [np.zeros((1, n_cols, bins), dtype=np.int64), np.cumsum(counts, axis=0)]
+    )
+    starts = np.searchsorted(bounds, [min(max(w[0], 0), n_rows) for w in windows])
+    ends = np.searchsorted(bounds, [min(max(w[1], 0), n_rows) for w in windows])
+    return prefix[ends] - prefix[starts]
+
+
+def batch_psi(
+    data,
+    pairs: Sequence[WindowPair],
+    bins: int = 10,
+    min_samples: int = 50,
+    reference: Optional[Window] = None,
+) -> np.ndarray:
+    """
+    PSI for every column across many baseline/current window pairs.
+
+    Args:
+        data: 2-D array ``(n_rows, n_columns)``, rows in time order
+        pairs: ``((base_start, base_end), (cur_start, cur_end))`` row ranges
+        bins: Number of quantile bins (edges shared by all windows)
+        min_samples: Windows with fewer non-NaN values give 0.0
+        reference: Row range the bin edges are fitted on (default: all rows)
+
+    Returns:
+        np.ndarray: PSI, shape ``(n_pairs, n_columns)``
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if data.ndim == 1:
+        data = data[:, None]
+    if not pairs:
+        return np.zeros((0, data.shape[1]))
+    edges = quantile_edges(data, bins, reference)
+    windows = [w for pair in pairs for w in pair]
+    counts = window_counts(data, windows, edges, bins)
+    return psi_from_counts(counts[0::2], counts[1::2], min_samples=min_samples)
+
+
+def psi_frame(
+    df,
+    pairs: Sequence[WindowPair],
+    columns: Optional[Iterable[str]] = None,
+    bins: int = 10,
+    min_samples: int = 50,
+    reference: Optional[Window] = None,
+):
+    """
+    ``batch_psi`` over the numeric columns of a DataFrame.
+
+    Returns:
+        pd.DataFrame: One row per window pair (index ``"b0:b1->c0:c1"``),
+        one column per feature
+    """
+    import pandas as pd
+
+    columns = (
+        list(columns)
+        if columns is not None
+        else list(df.select_dtypes(include="number").columns)
+    )
+    psi = batch_psi(
+        df[columns].to_numpy(dtype=np.float64, na_value=np.nan),
+        pairs,
+        bins=bins,
+        min_samples=min_samples,
+        reference=reference,
+    )
+    index = [f"{b[0]}:{b[1]}->{c[0]}:{c[1]}" for b, c in pairs]
+    return pd.DataFrame(psi, index=index, columns=columns)
+
+
+def half_split_pairs(n: int) -> List[WindowPair]:
+    """First half vs second half (the classic single-split PSI)."""
+    mid = n // 2
+    return [((0, mid), (mid, n))]
+
 
-    # Add small constant to avoid division by zero
-    expected_hist = expected_hist.astype(float) + 1e-10
-    actual_hist = actual_hist.astype(float) + 1e-10
+def rolling_pairs(
+    n: int, window: int, step: Optional[int] = None, baseline: str = "previous"
+) -> List[WindowPair]:
+    """
+    Tumbling/sliding window pairs over ``n`` rows.
 
-    # Normalize to probabilities
-    expected_p = expected_hist / np.sum(expected_hist)
-    actual_p = actual_hist / np.sum(actual_hist)
+    Args:
+        n: Number of rows
+        window: Rows per window
+        step: Offset between consecutive windows (default ``window``, tumbling)
+        baseline: ``previous`` compares each window with the one before it,
+            ``first`` compares every window with the first window
 
-    # Calculate PSI
-    psi = 0.0
-    for i in range(len(expected_p)):
-        if expected_p[i] > 0 and actual_p[i] > 0:
-            psi += (actual_p[i] - expected_p[i]) * np.log(actual_p[i] / expected_p[i])
-    return float(psi)
+    Returns:
+        list: ``((base_start, base_end), (cur_start, cur_end))`` pairs
+    """
+    if window <= 0:
+        raise ValueError("window must be positive")
+    step = step or window
+    starts = list(range(0, n - window + 1, step))
+    windows = [(s, s + window) for s in starts]
+    if baseline == "previous":
+        return list(zip(windows[:-1], windows[1:]))
+    if baseline == "first":
+        return [(windows[0], w) for w in windows[1:]]
+    raise ValueError(f"unknown baseline: {baseline}")
@@ -0,0 +1,359 @@
+"""Compressed vector storage for the chunk index.
+
+Codecs:
+    float16: half-precision copy (4x smaller than float64)
+    int8: per-dimension scalar quantization to uint8 (8x smaller)
+    pq: product quantization with 256 centroids per subspace, scored with
+        asymmetric distance computation (ADC) lookup tables
+
+``CompressedVectorIndex`` scores candidates on the compressed codes and then
+reranks a small shortlist against the full-precision vectors, so only the
+final top-k pay full-precision cost. ``to_dict``/``from_dict`` persist the
+codes and the fitted codec state (int8 scale/offset, PQ codebooks) so a
+restart does not re-fit the codec.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CODECS = ("float16", "int8", "pq")
+
+# search_batch가 한 번에 만드는 (쿼리 x 벡터) 근사 점수 행렬의 최대 원소 수
+BATCH_SCORE_CELLS = 1 << 24
+
+
+def _kmeans(x: np.ndarray, k: int, iters: int = 20, seed: int = 0) -> np.ndarray:
+    """Plain Lloyd k-means returning centroids (k, d)."""
+    rng = np.random.RandomState(seed)
+    k = min(k, len(x))
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    x_sq = (x**2).sum(axis=1)[:, None]
+    for _ in range(iters):
+        dist = x_sq - 2 * x @ centroids.T + (centroids**2).sum(axis=1)[None, :]
+        labels = dist.argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, x)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class Float16Codec:
+    name = "float16"
+
+    def fit(self, vectors: np.ndarray) -> "Float16Codec":
+        return self
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def load_state(self, arrays: Dict[str, np.ndarray]) -> "Float16Codec":
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float16)
+
+    def score(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) @ query.astype(np.float32)
+
+    def score_batch(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        return queries.astype(np.float32) @ codes.astype(np.float32).T
+
+    def extra_bytes(self) -> int:
+        return 0
+
+
+class ScalarInt8Codec:
+    """Per-dimension min/max scalar quantization to 256 levels."""
+
+    name = "int8"
+
+    def fit(self, vectors: np.ndarray) -> "ScalarInt8Codec":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.offset = vectors.min(axis=0)
+        span = vectors.max(axis=0) - self.offset
+        self.scale = np.where(span > 0, span / 255.0, 1.0).astype(np.float32)
+        return self
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"offset": self.offset, "scale": self.scale}
+
+    def load_state(self, arrays: Dict[str, np.ndarray]) -> "ScalarInt8Codec":
+        self.offset = np.asarray(arrays["offset"], dtype=np.float32)
+        self.scale = np.asarray(arrays["scale"], dtype=np.float32)
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        q = (np.asarray(vectors, dtype=np.float32) - self.offset) / self.scale
+        return np.clip(np.rint(q), 0, 255).astype(np.uint8)
+
+    def score(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        # q·(c*scale + offset) = (q*scale)·c + q·offset
+        query = query.astype(np.float32)
+        return codes.astype(np.float32) @ (query * self.scale) + float(
+            query @ self.offset
+        )
+
+    def score_batch(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        queries = queries.astype(np.float32)
+        scaled = codes.astype(np.float32) @ (queries * self.scale).T
+        return (scaled + queries @ self.offset).T
+
+    def extra_bytes(self) -> int:
+        return int(self.offset.nbytes + self.scale.nbytes)
+
+
+class ProductQuantizer:
+    """Product quantizer with ADC inner-product scoring."""
+
+    name = "pq"
+
+    def __init__(self, n_subspaces: Optional[int] = None, iters: int = 20):
+        self.n_subspaces = n_subspaces
+        self.iters = iters
+
+    def fit(self, vectors: np.ndarray, seed: int = 0) -> "ProductQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        d = vectors.shape[1]
+        m = self.n_subspaces or (d // 8 if d % 8 == 0 else 1)
+        if d % m:
+            raise ValueError(f"dimension {d} is not divisible by {m} subspaces")
+        self.n_subspaces, self.sub_dim = m, d // m
+        self.codebooks = np.stack(
+            [self._padded_kmeans(self._sub(vectors, j), seed + j) for j in range(m)]
+        )
+        return self
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"codebooks": self.codebooks}
+
+    def load_state(self, arrays: Dict[str, np.ndarray]) -> "ProductQuantizer":
+        self.codebooks = np.asarray(arrays["codebooks"], dtype=np.float32)
+        self.n_subspaces, _, self.sub_dim = self.codebooks.shape
+        return self
+
+    def _padded_kmeans(self, x: np.ndarray, seed: int) -> np.ndarray:
+        centroids = _kmeans(x, 256, self.iters, seed)
+        if len(centroids) < 256:
+            pad = np.repeat(centroids[-1:], 256 - len(centroids), axis=0)
+            centroids = np.vstack([centroids, pad])
+        return centroids
+
+    def _sub(self, vectors: np.ndarray, j: int) -> np.ndarray:
+        return vectors[:, j * self.sub_dim : (j + 1) * self.sub_dim]
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        codes = np.empty((len(vectors), self.n_subspaces), dtype=np.uint8)
+        for j in range(self.n_subspaces):
+            x, c = self._sub(vectors, j), self.codebooks[j]
+            dist = -2 * x @ c.T + (c**2).sum(axis=1)[None, :]
+            codes[:, j] = dist.argmin(axis=1)
+        return codes
+
+    def score(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        q = query.astype(np.float32).reshape(self.n_subspaces, self.sub_dim)
+        # (m, 256) 쿼리별 룩업 테이블
+        table = np.einsum("md,mkd->mk", q, self.codebooks)
+        return table[np.arange(self.n_subspaces), codes].sum(axis=1)
+
+    def score_batch(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        q = queries.astype(np.float32).reshape(len(queries), self.n_subspaces, -1)
+        # (m, 256, nq) 룩업 테이블: 코드 하나가 쿼리 배치 전체의 연속 행을 고른다
+        tables = np.ascontiguousarray(np.einsum("qmd,mkd->mkq", q, self.codebooks))
+        scores = np.zeros((len(codes), len(queries)), dtype=np.float32)
+        for j in range(self.n_subspaces):
+            np.add(scores, np.take(tables[j], codes[:, j], axis=0), out=scores)
+        return scores.T
+
+    def extra_bytes(self) -> int:
+        return int(self.codebooks.nbytes)
+
+
+def make_codec(name: str, **kwargs):
+    if name == "float16":
+        return Float16Codec()
+    if name == "int8":
+        return ScalarInt8Codec()
+    if name == "pq":
+        return ProductQuantizer(**kwargs)
+    raise ValueError(f"Unknown codec: {name} (expected one of {CODECS})")
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the exact top-k inner products, best first."""
+    scores = vectors @ query
+    top_k = min(top_k, len(scores))
+    idx = np.argpartition(-scores, top_k - 1)[:top_k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+class CompressedVectorIndex:
+    """
+    Compressed codes for candidate scoring plus full-precision rerank.
+
+    Args:
+        vectors: Full-precision vectors (may be a read-only memmap)
+        codec: One of ``CODECS``
+        rerank_factor: Shortlist size as a multiple of top_k; 0 disables the
+            full-precision rerank
+        codes: Previously encoded codes (skips fitting with ``codec_state``)
+        codec_state: Fitted codec arrays from ``codec.state()``
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        codec: str = "int8",
+        rerank_factor: int = 4,
+        codes: Optional[np.ndarray] = None,
+        codec_state: Optional[Dict[str, np.ndarray]] = None,
+        **codec_kwargs,
+    ):
+        self.full_vectors = vectors
+        self.codec = make_codec(codec, **codec_kwargs)
+        if codes is not None and codec_state is not None:
+            self.codec.load_state(codec_state)
+            self.codes = np.asarray(codes)
+        else:
+            self.codec.fit(vectors)
+            self.codes = self.codec.encode(vectors)
+        self.rerank_factor = rerank_factor
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Arrays for ``np.savez`` (codes and codec state, not the vectors)."""
+        arrays: Dict[str, Any] = {
+            "codec": np.array(self.codec.name),
+            "shape": np.array(np.shape(self.full_vectors)),
+            "codes": self.codes,
+        }
+        for key, value in self.codec.state().items():
+            arrays[f"codec::{key}"] = value
+        return arrays
+
+    @classmethod
+    def from_dict(
+        cls, vectors: np.ndarray, arrays: Dict[str, Any], rerank_factor: int = 4
+    ) -> "CompressedVectorIndex":
+        """
+        Rebuild an index saved with ``to_dict`` over the same ``vectors``.
+
+        Raises:
+            ValueError: If the saved index was built for a different shape
+        """
+        shape = tuple(int(s) for s in np.asarray(arrays["shape"]))
+        if shape != tuple(np.shape(vectors)):
+            raise ValueError(f"index shape {shape} != vectors {np.shape(vectors)}")
+        state = {
+            key.partition("::")[2]: np.asarray(arrays[key])
+            for key in arrays.keys()
+            if key.startswith("codec::")
+        }
+        return cls(
+            vectors,
+            str(arrays["codec"]),
+            rerank_factor=rerank_factor,
+            codes=np.asarray(arrays["codes"]),
+            codec_state=state,
+        )
+
+    @property
+    def memory_bytes(self) -> int:
+        """Resident bytes of the compressed representation."""
+        return int(self.codes.nbytes + self.codec.extra_bytes())
+
+    def search(
+        self, query: np.ndarray, top_k: int = 5
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (indices, scores) of the top-k, best first."""
+        return self.search_batch(np.asarray(query)[None, :], top_k)[0]
+
+    def search_batch(
+        self, queries: np.ndarray, top_k: int = 5
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        ``search`` for each row of ``queries``.
+
+        Approximate scores for a block of queries come from one matrix
+        product (int8/float16) or one batch of ADC lookup tables (pq); the
+        shortlists of the block are reranked together. Blocks are sized so
+        the score matrix stays within ``BATCH_SCORE_CELLS`` entries.
+        """
+        queries = np.atleast_2d(queries)
+        n = len(self.codes)
+        shortlist = min(n, top_k * self.rerank_factor if self.rerank_factor else top_k)
+        if shortlist <= 0:
+            empty = (np.array([], dtype=int), np.array([]))
+            return [empty for _ in queries]
+        block = max(1, BATCH_SCORE_CELLS // max(n, 1))
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        for start in range(0, len(queries), block):
+            q = queries[start : start + block]
+            approx = self.codec.score_batch(self.codes, q)
+            cand = np.argpartition(-approx, shortlist - 1, axis=1)[:, :shortlist]
+            if self.rerank_factor:
+                full = np.asarray(self.full_vectors[cand.ravel()], dtype=np.float64)
+                full = full.reshape(len(q), shortlist, -1)
+                scores = np.einsum("qsd,qd->qs", full, q)
+            else:
+                scores = np.take_along_axis(approx, cand, axis=1)
+            order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+            idx = np.take_along_axis(cand, order, axis=1)
+            best = np.take_along_axis(scores, order, axis=1)
+            results.extend(zip(idx, best))
+        return results
+
+
+def recall_memory_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    codecs: Sequence[str] = CODECS,
+    top_k: int = 10,
+    rerank_factor: int = 4,
+) -> List[Dict[str, Any]]:
+    """
+    Recall@k and memory of each codec relative to the uncompressed index.
+
+    Every codec is measured without rerank (codes only) and with the
+    full-precision rerank of ``top_k * rerank_factor`` candidates.
+    """
+    vectors = np.asarray(vectors)
+    truth = [set(exact_top_k(vectors, q, top_k)) for q in queries]
+    full_bytes = int(vectors.nbytes)
+    rows: List[Dict[str, Any]] = [
+        {
+            "codec": str(vectors.dtype),
+            "rerank": False,
+            "memory_bytes": full_bytes,
+            "bytes_per_vector": full_bytes / max(len(vectors), 1),
+            "compression_ratio": 1.0,
+            f"recall_at_{top_k}": 1.0,
+            "avg_query_ms": None,
+        }
+    ]
+    for codec in codecs:
+        index = CompressedVectorIndex(vectors, codec, rerank_factor=rerank_factor)
+        for factor in (0, rerank_factor):
+            index.rerank_factor = factor
+            hits, start = 0, time.perf_counter()
+            for q, expected in zip(queries, truth):
+                found, _ = index.search(q, top_k)
+                hits += len(expected & set(found.tolist()))
+            elapsed = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+            rows.append(
+                {
+                    "codec": codec,
+                    "rerank": bool(factor),
+                    "memory_bytes": index.memory_bytes,
+                    "bytes_per_vector": index.memory_bytes / max(len(vectors), 1),
+                    "compression_ratio": round(full_bytes / index.memory_bytes, 2),
+                    f"recall_at_{top_k}": round(
+                        hits / max(sum(len(t) for t in truth), 1), 4
+                    ),
+                    "avg_query_ms": round(elapsed, 3),
+                }
+            )
+    return rows
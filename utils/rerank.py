@@ -0,0 +1,204 @@
+"""Second-stage reranking with a bounded latency budget.
+
+A cheap first-stage scorer retrieves a wide candidate pool; a heavier local
+scorer then reorders as many candidates as the budget allows. Candidates the
+budget did not reach keep their first-stage order after the reranked ones.
+"""
+
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens."""
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+class LateInteractionScorer:
+    """
+    ColBERT-style MaxSim scorer over stored token vectors.
+
+    Each query token is matched to its most similar document token; tokens
+    without a stored vector fall back to exact-match overlap.
+    """
+
+    name = "late_interaction"
+
+    def __init__(self, token_vectors: Dict[str, Any]):
+        self.token_vectors = {
+            word: np.asarray(vec, dtype=np.float32)
+            for word, vec in token_vectors.items()
+        }
+
+    def _matrix(self, tokens: Sequence[str]) -> Optional[np.ndarray]:
+        vecs = [self.token_vectors[t] for t in tokens if t in self.token_vectors]
+        return np.vstack(vecs) if vecs else None
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        q_tokens = list(dict.fromkeys(tokenize(query)))
+        if not q_tokens:
+            return np.zeros(len(texts))
+        q_mat = self._matrix(q_tokens)
+        q_has_vec = np.array([t in self.token_vectors for t in q_tokens])
+
+        scores = np.zeros(len(texts))
+        for i, text in enumerate(texts):
+            d_tokens = set(tokenize(text))
+            exact = np.array([t in d_tokens for t in q_tokens], dtype=float)
+            d_mat = self._matrix(sorted(d_tokens))
+            if q_mat is not None and d_mat is not None:
+                maxsim = (q_mat @ d_mat.T).max(axis=1)
+                exact[q_has_vec] = np.maximum(exact[q_has_vec], maxsim)
+            scores[i] = exact.mean()
+        return scores
+
+
+class CrossEncoderScorer:
+    """sentence-transformers cross-encoder (optional dependency)."""
+
+    name = "cross_encoder"
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(model_name)
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray(self.model.predict([(query, t) for t in texts]))
+
+
+def load_scorer(
+    token_vectors: Dict[str, Any], cross_encoder_model: Optional[str] = None
+):
+    """Return a cross-encoder scorer when available, else late interaction."""
+    if cross_encoder_model:
+        try:
+            return CrossEncoderScorer(cross_encoder_model)
+        except Exception:
+            pass
+    return LateInteractionScorer(token_vectors)
+
+
+def rerank(
+    query: str,
+    candidates: List[Dict[str, Any]],
+    scorer,
+    top_k: int = 5,
+    budget_ms: float = 50.0,
+    text_key: str = "text",
+    batch_size: int = 16,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Rerank first-stage candidates within a latency budget.
+
+    Args:
+        query: Query text
+        candidates: First-stage results, best first
+        scorer: Object with ``score(query, texts) -> np.ndarray``
+        top_k: Number of results to return
+        budget_ms: Stop scoring new batches once this much time has passed
+        text_key: Candidate field holding the text to score
+        batch_size: Candidates scored per scorer call
+
+    Returns:
+        tuple: (top_k candidates with ``rerank_score`` set where scored, stats)
+    """
+    start = time.perf_counter()
+    scored: List[Tuple[float, int]] = []
+    pos = 0
+    while pos < len(candidates):
+        if (time.perf_counter() - start) * 1000 >= budget_ms:
+            break
+        batch = candidates[pos : pos + batch_size]
+        scores = scorer.score(query, [c.get(text_key) or "" for c in batch])
+        scored.extend((float(s), pos + j) for j, s in enumerate(scores))
+        pos += len(batch)
+
+    # 점수 동률이면 1단계 순서 유지
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    order = [idx for _, idx in scored] + list(range(pos, len(candidates)))
+    score_by_idx = {idx: s for s, idx in scored}
+
+    results = []
+    for idx in order[:top_k]:
+        item = dict(candidates[idx])
+        if idx in score_by_idx:
+            item["rerank_score"] = score_by_idx[idx]
+        results.append(item)
+
+    stats = {
+        "scorer": getattr(scorer, "name", type(scorer).__name__),
+        "candidates": len(candidates),
+        "reranked": pos,
+        "rerank_ms": round((time.perf_counter() - start) * 1000, 3),
+        "budget_exhausted": pos < len(candidates),
+    }
+    return results, stats
+
+
+def recall_at_k(ranked_ids: Sequence[Any], relevant: Sequence[Any], k: int) -> float:
+    """Fraction of relevant ids found in the first k results."""
+    if not relevant:
+        return 0.0
+    return len(set(ranked_ids[:k]) & set(relevant)) / len(set(relevant))
+
+
+def reciprocal_rank(ranked_ids: Sequence[Any], relevant: Sequence[Any]) -> float:
+    """1 / rank of the first relevant id (0 when none is retrieved)."""
+    relevant = set(relevant)
+    for rank, rid in enumerate(ranked_ids, 1):
+        if rid in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def evaluate_rerank(
+    search_fn: Callable[..., List[Dict[str, Any]]],
+    labeled_queries: Dict[str, Sequence[Any]],
+    top_k: int = 5,
+    id_key: str = "chunk_id",
+) -> Dict[str, Any]:
+    """
+    Compare first-stage and reranked retrieval on a labeled query set.
+
+    Args:
+        search_fn: ``search_fn(query, top_k=..., rerank=bool)`` returning results
+        labeled_queries: query -> relevant ids
+        top_k: Cutoff for recall/MRR
+        id_key: Result field holding the id
+
+    Returns:
+        dict: Per-mode recall@k, MRR and latency, plus the deltas
+    """
+    report: Dict[str, Any] = {}
+    for mode, use_rerank in (("baseline", False), ("reranked", True)):
+        recalls, rrs, latencies = [], [], []
+        for query, relevant in labeled_queries.items():
+            start = time.perf_counter()
+            results = search_fn(query, top_k=top_k, rerank=use_rerank)
+            latencies.append((time.perf_counter() - start) * 1000)
+            ids = [r[id_key] for r in results]
+            recalls.append(recall_at_k(ids, relevant, top_k))
+            rrs.append(reciprocal_rank(ids, relevant))
+        report[mode] = {
+            f"recall_at_{top_k}": round(float(np.mean(recalls)), 4),
+            "mrr": round(float(np.mean(rrs)), 4),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+        }
+
+    base, rr = report["baseline"], report["reranked"]
+    report["queries"] = len(labeled_queries)
+    report["delta_mrr"] = round(rr["mrr"] - base["mrr"], 4)
+    report[f"delta_recall_at_{top_k}"] = round(
+        rr[f"recall_at_{top_k}"] - base[f"recall_at_{top_k}"], 4
+    )
+    report["added_latency_ms_p50"] = round(
+        rr["latency_ms_p50"] - base["latency_ms_p50"], 3
+    )
+    return report
@@ -0,0 +1,341 @@
+"""Sharded chunk index with scatter-gather search across worker processes.
+
+Chunks are partitioned by a stable hash of ``doc_id``. Each shard lives in
+its own directory (``vectors.npy`` + ``chunks.json``) and is served by one
+worker process that memory-maps its vectors, so per-query work in a worker
+scales with the shard size. The coordinator broadcasts each query batch to
+all workers and merges the per-shard top-k with a heap.
+
+Layout::
+
+    <root>/manifest.json
+    <root>/shard_000/vectors.npy
+    <root>/shard_000/chunks.json
+"""
+
+import heapq
+import json
+import multiprocessing as mp
+import os
+import shutil
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def shard_for(doc_id: Any, n_shards: int) -> int:
+    """Stable shard assignment for a document id."""
+    return zlib.crc32(str(doc_id).encode("utf-8")) % n_shards
+
+
+def _shard_dir(root: Path, shard_id: int) -> Path:
+    return root / f"shard_{shard_id:03d}"
+
+
+def write_shard(
+    root: str,
+    shard_id: int,
+    chunks: Sequence[str],
+    metadata: Sequence[Dict[str, Any]],
+    vectors: np.ndarray,
+) -> Path:
+    """
+    Write one shard atomically (temp dir + rename).
+
+    Args:
+        root: Index root directory
+        shard_id: Shard number
+        chunks: Chunk texts belonging to this shard
+        metadata: Matching chunk metadata
+        vectors: Matching vectors (n, d)
+
+    Returns:
+        Path: The shard directory
+    """
+    root = Path(root)
+    final = _shard_dir(root, shard_id)
+    tmp = final.with_name(final.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    np.save(tmp / "vectors.npy", np.asarray(vectors, dtype=np.float32))
+    with open(tmp / "chunks.json", "w", encoding="utf-8") as f:
+        json.dump(
+            [{"text": c, **m} for c, m in zip(chunks, metadata)],
+            f,
+            ensure_ascii=False,
+        )
+
+    if final.exists():
+        old = final.with_name(final.name + ".old")
+        if old.exists():
+            shutil.rmtree(old)
+        os.replace(final, old)
+        os.replace(tmp, final)
+        shutil.rmtree(old)
+    else:
+        os.replace(tmp, final)
+    return final
+
+
+def build_shards(
+    root: str,
+    chunks: Sequence[str],
+    metadata: Sequence[Dict[str, Any]],
+    vectors: np.ndarray,
+    n_shards: int,
+    only: Optional[Sequence[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Partition the corpus by doc_id hash and write the shards.
+
+    Pass ``only`` to rebuild a subset of shards; the others are untouched.
+    In that case the corpus only needs the rows of those shards (rows hashed
+    elsewhere are ignored) and ``n_shards`` must match the manifest.
+    Manifest sizes are counted from the written shard files.
+
+    Raises:
+        ValueError: If ``only`` is used with a different shard count than the
+            existing manifest
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest_path = root / "manifest.json"
+    previous: Dict[str, Any] = {}
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+    if only is not None and previous.get("n_shards") != n_shards:
+        raise ValueError(
+            f"partial rebuild needs an index with {n_shards} shards, "
+            f"found {previous.get('n_shards')}"
+        )
+
+    assignment = np.array(
+        [shard_for(m["doc_id"], n_shards) for m in metadata], dtype=np.int64
+    )
+    vectors = np.asarray(vectors, dtype=np.float32)
+    sizes = dict(previous.get("sizes", {})) if only is not None else {}
+    for shard_id in only if only is not None else range(n_shards):
+        rows = np.flatnonzero(assignment == shard_id)
+        shard_dir = write_shard(
+            root,
+            shard_id,
+            [chunks[i] for i in rows],
+            [metadata[i] for i in rows],
+            vectors[rows],
+        )
+        written = np.load(shard_dir / "vectors.npy", mmap_mode="r")
+        sizes[str(shard_id)] = int(written.shape[0])
+
+    if only is None:
+        # 샤드 수가 줄었으면 남은 옛 샤드 디렉터리 정리
+        for stale in root.glob("shard_*"):
+            suffix = stale.name[len("shard_") :]
+            if suffix.isdigit() and int(suffix) >= n_shards:
+                shutil.rmtree(stale)
+
+    manifest = {
+        **previous,
+        "n_shards": n_shards,
+        "dimension": int(vectors.shape[1]),
+        "sizes": dict(sorted(sizes.items(), key=lambda kv: int(kv[0]))),
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class _ShardData:
+    def __init__(self, shard_dir: Path):
+        self.load(shard_dir)
+
+    def load(self, shard_dir: Path):
+        self.vectors = np.load(shard_dir / "vectors.npy", mmap_mode="r")
+        with open(shard_dir / "chunks.json", encoding="utf-8") as f:
+            self.chunks = json.load(f)
+
+    def search(self, queries: np.ndarray, top_k: int) -> List[List[tuple]]:
+        n = len(self.chunks)
+        if n == 0:
+            return [[] for _ in queries]
+        scores = queries @ self.vectors.T
+        k = min(top_k, n)
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        out = []
+        for q in range(len(queries)):
+            out.append([(float(scores[q, i]), self.chunks[i]) for i in idx[q]])
+        return out
+
+
+def _worker(shard_dir: str, conn) -> None:
+    """Shard worker loop: ('search', queries, k) | ('reload',) | ('stop',)."""
+    shard, load_error = None, None
+    try:
+        shard = _ShardData(Path(shard_dir))
+    except Exception as e:  # 적재 실패도 요청마다 오류로 전달 (reload로 재시도)
+        load_error = repr(e)
+    while True:
+        msg = conn.recv()
+        op = msg[0]
+        try:
+            if op == "search":
+                if shard is None:
+                    raise RuntimeError(f"shard not loaded: {load_error}")
+                conn.send(("ok", shard.search(msg[1], msg[2])))
+            elif op == "reload":
+                shard = _ShardData(Path(shard_dir))
+                conn.send(("ok", len(shard.chunks)))
+            elif op == "stop":
+                conn.send(("ok", None))
+                break
+        except Exception as e:  # 워커는 죽지 않고 오류만 전달
+            if op == "reload":
+                shard, load_error = None, repr(e)
+            conn.send(("error", repr(e)))
+    conn.close()
+
+
+class ShardedIndex:
+    """
+    Coordinator for one worker process per shard.
+
+    Usage::
+
+        with ShardedIndex("data/shards") as index:
+            hits = index.search(query_vector, top_k=5)
+    """
+
+    def __init__(self, root: str, timeout: float = 30.0):
+        self.root = Path(root)
+        with open(self.root / "manifest.json", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.n_shards = int(self.manifest["n_shards"])
+        self.timeout = timeout
+        self._workers: List[Any] = []
+        self._conns: List[Any] = []
+        # 요청/응답이 파이프에서 섞이지 않도록 한 번에 한 요청만
+        self._lock = threading.Lock()
+
+    def _spawn(self, shard_id: int):
+        parent, child = mp.get_context().Pipe()
+        proc = mp.get_context().Process(
+            target=_worker,
+            args=(str(_shard_dir(self.root, shard_id)), child),
+            daemon=True,
+        )
+        proc.start()
+        child.close()
+        return proc, parent
+
+    def start(self) -> "ShardedIndex":
+        for shard_id in range(self.n_shards):
+            proc, conn = self._spawn(shard_id)
+            self._workers.append(proc)
+            self._conns.append(conn)
+        return self
+
+    def _restart(self, shard_id: int) -> None:
+        """Replace a hung or dead worker; its late reply goes with the old pipe."""
+        proc, conn = self._workers[shard_id], self._conns[shard_id]
+        proc.terminate()
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.kill()
+            proc.join()
+        conn.close()
+        self._workers[shard_id], self._conns[shard_id] = self._spawn(shard_id)
+
+    def _gather(self, conns) -> List[Any]:
+        """
+        Read one reply per worker; raise only after every reply is read.
+
+        Workers that do not reply within ``timeout`` seconds (shared by the
+        whole request) are restarted and reported as failed.
+        """
+        deadline = time.monotonic() + self.timeout
+        replies, errors = [], []
+        for shard_id, conn in conns:
+            try:
+                if conn.poll(max(deadline - time.monotonic(), 0)):
+                    status, payload = conn.recv()
+                else:
+                    status, payload = "error", f"no reply in {self.timeout}s"
+                    self._restart(shard_id)
+            except (EOFError, OSError) as e:
+                status, payload = "error", f"worker exited ({e!r})"
+                self._restart(shard_id)
+            if status != "ok":
+                errors.append(f"shard {shard_id}: {payload}")
+            replies.append(payload)
+        if errors:
+            raise RuntimeError("shard worker failed: " + "; ".join(errors))
+        return replies
+
+    def search_batch(
+        self, queries: np.ndarray, top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """Scatter a query batch to all shards and merge each top-k."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        with self._lock:
+            sent = []
+            broken = []
+            for shard_id, conn in enumerate(self._conns):
+                try:
+                    conn.send(("search", queries, top_k))
+                    sent.append((shard_id, conn))
+                except (BrokenPipeError, OSError):
+                    broken.append(shard_id)
+            for shard_id in broken:
+                self._restart(shard_id)
+            per_shard = self._gather(sent)
+            if broken:
+                raise RuntimeError("shard worker failed: broken pipe")
+
+        merged = []
+        for q in range(len(queries)):
+            hits = heapq.nlargest(
+                top_k,
+                (hit for shard_hits in per_shard for hit in shard_hits[q]),
+                key=lambda h: h[0],
+            )
+            merged.append([{**chunk, "similarity": s} for s, chunk in hits])
+        return merged
+
+    def search(self, query: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+        return self.search_batch(query, top_k)[0]
+
+    def reload_shard(self, shard_id: int) -> int:
+        """Re-map a shard after ``build_shards(..., only=[shard_id])``."""
+        with self._lock:
+            self._conns[shard_id].send(("reload",))
+            return self._gather([(shard_id, self._conns[shard_id])])[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def _stop(self) -> None:
+        for conn in self._conns:
+            try:
+                conn.send(("stop",))
+                if conn.poll(self.timeout):
+                    conn.recv()
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+        for proc in self._workers:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self._workers, self._conns = [], []
+
+    def __enter__(self) -> "ShardedIndex":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,308 @@
+"""Lightweight tracing spans with file exporters (no collector needed).
+
+``span(name, **attrs)`` is a context manager that times a stage, nests
+under the currently active span (tracked with contextvars, so it follows
+asyncio tasks and copied thread contexts) and, when a tracer is
+configured, appends the finished span to a trace file::
+
+    configure("traces.jsonl")
+    with span("rag", query=q):
+        with span("embedding"):
+            ...
+        with span("vector_search") as s:
+            s.set(rows_scanned=n, bytes_billed=b)
+
+Tracing is off unless ``configure()`` is called or ``NEBULA_TRACE_FILE``
+is set; disabled spans are a shared no-op object. Two formats are
+written: ``jsonl`` (one flat span per line) and ``otlp`` (one OTLP/JSON
+``resourceSpans`` document per line). ``load_spans`` reads both.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+TRACE_FILE_ENV = "NEBULA_TRACE_FILE"
+TRACE_FORMAT_ENV = "NEBULA_TRACE_FORMAT"
+
+_current: ContextVar[Optional["Span"]] = ContextVar("nebula_span", default=None)
+
+
+class Span:
+    """One timed stage."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_time",
+        "duration_ms",
+        "attributes",
+        "status",
+        "_t0",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_time = time.time()
+        self.duration_ms: Optional[float] = None
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self._t0 = time.perf_counter()
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class JsonlExporter:
+    """Append one flat JSON object per finished span."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _line(self, span: Span) -> Dict[str, Any]:
+        return span.to_dict()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(self._line(span), ensure_ascii=False, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpFileExporter(JsonlExporter):
+    """Append one OTLP/JSON ``resourceSpans`` document per finished span."""
+
+    def __init__(self, path: str, service_name: str = "nebula"):
+        super().__init__(path)
+        self.service_name = service_name
+
+    def _line(self, span: Span) -> Dict[str, Any]:
+        start_ns = int(span.start_time * 1e9)
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(span.duration_ms * 1e6)),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()
+            ],
+            "status": {"code": 1 if span.status == "ok" else 2},
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        resource = {
+            "attributes": [
+                {"key": "service.name", "value": {"stringValue": self.service_name}}
+            ]
+        }
+        return {
+            "resourceSpans": [
+                {"resource": resource, "scopeSpans": [{"spans": [otlp_span]}]}
+            ]
+        }
+
+
+class MemoryExporter:
+    """Keep finished spans in memory, optionally teeing to another exporter."""
+
+    def __init__(self, forward=None):
+        self.forward = forward
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span.to_dict())
+        if self.forward is not None:
+            self.forward.export(span)
+
+
+EXPORTERS = {"jsonl": JsonlExporter, "otlp": OtlpFileExporter}
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporter (if any)."""
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        if self.exporter is None:
+            yield _NOOP
+            return
+        span = Span(name, _current.get(), attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = repr(e)
+            raise
+        finally:
+            _current.reset(token)
+            span.duration_ms = (time.perf_counter() - span._t0) * 1000
+            self.exporter.export(span)
+
+
+tracer = Tracer()
+
+
+def configure(path: Optional[str] = None, fmt: str = "jsonl") -> Tracer:
+    """Enable (path given) or disable (None) the global tracer."""
+    tracer.exporter = EXPORTERS[fmt](path) if path else None
+    return tracer
+
+
+def configure_from_env() -> Tracer:
+    """Configure from ``NEBULA_TRACE_FILE`` / ``NEBULA_TRACE_FORMAT``."""
+    return configure(
+        os.environ.get(TRACE_FILE_ENV), os.environ.get(TRACE_FORMAT_ENV, "jsonl")
+    )
+
+
+@contextmanager
+def capture() -> Iterator[MemoryExporter]:
+    """Collect every span finished inside the block (process-wide)."""
+    previous = tracer.exporter
+    exporter = MemoryExporter(forward=previous)
+    tracer.exporter = exporter
+    try:
+        yield exporter
+    finally:
+        tracer.exporter = previous
+
+
+def span(name: str, **attributes: Any):
+    """Context-managed span on the global tracer."""
+    return tracer.span(name, **attributes)
+
+
+def current_span():
+    """The active span, or a no-op span when none is active."""
+    return _current.get() or _NOOP
+
+
+def _from_otlp(doc: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    for rs in doc["resourceSpans"]:
+        for ss in rs["scopeSpans"]:
+            for s in ss["spans"]:
+                start, end = int(s["startTimeUnixNano"]), int(s["endTimeUnixNano"])
+                yield {
+                    "trace_id": s["traceId"],
+                    "span_id": s["spanId"],
+                    "parent_id": s.get("parentSpanId"),
+                    "name": s["name"],
+                    "start_time": start / 1e9,
+                    "duration_ms": (end - start) / 1e6,
+                    "status": "ok" if s["status"]["code"] != 2 else "error",
+                    "attributes": {
+                        a["key"]: next(iter(a["value"].values()))
+                        for a in s.get("attributes", [])
+                    },
+                }
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Read spans from a JSONL or OTLP-file trace."""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            doc = json.loads(line)
+            spans.extend(_from_otlp(doc) if "resourceSpans" in doc else [doc])
+    return spans
+
+
+def _span_path(s: Dict[str, Any], by_id: Dict[str, Dict[str, Any]]) -> str:
+    names = [s["name"]]
+    parent = by_id.get(s.get("parent_id"))
+    while parent is not None:
+        names.append(parent["name"])
+        parent = by_id.get(parent.get("parent_id"))
+    return "/".join(reversed(names))
+
+
+def summarize(
+    spans: List[Dict[str, Any]], by_path: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-stage latency distribution.
+
+    Args:
+        spans: Span dicts from ``load_spans``
+        by_path: Group by nesting path (``rag/retrieval/embedding``) instead of name
+
+    Returns:
+        dict: stage -> count/errors/mean/p50/p95/p99/max (ms)
+    """
+    by_id = {s["span_id"]: s for s in spans}
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for s in spans:
+        key = _span_path(s, by_id) if by_path else s["name"]
+        groups.setdefault(key, []).append(s)
+
+    summary = {}
+    for key, members in sorted(groups.items()):
+        ms = np.array([m["duration_ms"] for m in members], dtype=np.float64)
+        summary[key] = {
+            "count": len(members),
+            "errors": sum(m.get("status") == "error" for m in members),
+            "mean_ms": round(float(ms.mean()), 3),
+            "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(ms, 95)), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            "max_ms": round(float(ms.max()), 3),
+        }
+    return summary
+
+
+configure_from_env()
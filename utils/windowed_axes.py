@@ -0,0 +1,368 @@
+"""A/B-axis metrics over sliding or tumbling windows (an axes time series).
+
+``axes_timeseries`` evaluates the A/B-axis definitions of
+``dataset_ingest.compute_axes`` on every window of the target series. The
+windows are row-count windows (``window=1440``) or time windows
+(``window="1D", step="1h"``). Each window gets the same values as
+``compute_axes`` on that slice, but they are computed incrementally:
+
+- ``st_var_ratio``, ``sk_k_score``: prefix sums of the first four powers
+  of the (globally standardized) series give every window's moments, and
+  every inner rolling variance, in O(1);
+- ``seasonal_corr``: prefix sums of lagged products give each window's
+  lag autocorrelation in O(1);
+- ``psi_trigger_rate`` (half split), ``outlier_ratio`` and the optional
+  ``dip_stat`` need per-window order statistics. They are evaluated on
+  windows of equal length in vectorized blocks.
+
+``psi_vs_previous`` compares each window with the one before it, using
+shared quantile bins (``utils.psi.batch_psi``, a single scan).
+``psi_level`` grades it against ``config/axis_thresholds.json``, so drift
+shows up as a labelled point in time. The half-split ``psi_trigger_rate``
+keeps its min/max-binned definition and is noisy on heavy tails, so it is
+not graded.
+"""
+
+import warnings
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.dip import dip_columns
+from utils.drift import load_psi_thresholds, psi_level
+from utils.psi import EPSILON, batch_psi, psi_from_counts
+
+Window = Union[int, str, pd.Timedelta]
+
+# 블록 계산 시 한 번에 모으는 최대 원소 수 (메모리 상한)
+BLOCK_ELEMENTS = 4_000_000
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    return np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+
+
+def _range_sum(values: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    prefix = _prefix(values)
+    return prefix[b] - prefix[a]
+
+
+def window_bounds(
+    times: Optional[np.ndarray], n: int, window: Window, step: Optional[Window]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ``(starts, ends)`` row ranges of every complete window.
+
+    Args:
+        times: Sorted time values (required for time windows)
+        n: Number of rows
+        window: Rows (int) or a time span (``"1D"``, ``pd.Timedelta``)
+        step: Offset between windows, same kind as ``window`` (default:
+            ``window``, i.e. tumbling)
+    """
+    step = step or window
+    if isinstance(window, (int, np.integer)):
+        if window <= 0 or int(step) <= 0:
+            raise ValueError("window and step must be positive")
+        starts = np.arange(0, n - window + 1, int(step))
+        return starts, starts + window
+
+    if times is None:
+        raise ValueError("time windows need a time column")
+    times = pd.DatetimeIndex(times).as_unit("ns").asi8
+    span, stride = pd.Timedelta(window).value, pd.Timedelta(step).value
+    if span <= 0 or stride <= 0:
+        raise ValueError("window and step must be positive")
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    # 마지막 창은 마지막 시각 + 중앙 간격 안에 끝나야 완전한 창
+    spacing = int(np.median(np.diff(times))) if n > 1 else 0
+    # 창 개수는 정수로 계산 (float64 arange 길이는 ns 값에서 +1을 잃는다)
+    last_start = int(times[-1]) + spacing - span
+    count = max((last_start - int(times[0])) // stride + 1, 0)
+    grid = times[0] + stride * np.arange(count, dtype=np.int64)
+    starts = np.searchsorted(times, grid, side="left")
+    ends = np.searchsorted(times, grid + span, side="left")
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+
+class _Sums:
+    """Prefix sums of count and z^1..z^4 over the valid values."""
+
+    def __init__(self, z: np.ndarray, valid: np.ndarray):
+        z0 = np.where(valid, z, 0.0)
+        self.p = [_prefix(valid.astype(np.float64))]
+        power = np.ones_like(z0)
+        for _ in range(4):
+            power = power * z0
+            self.p.append(_prefix(power))
+
+    def range(self, a: np.ndarray, b: np.ndarray, k: int) -> np.ndarray:
+        return self.p[k][b] - self.p[k][a]
+
+    def var(self, a: np.ndarray, b: np.ndarray, min_count: int = 2) -> np.ndarray:
+        n, s1, s2 = (self.range(a, b, k) for k in range(3))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = np.maximum(s2 - s1 * s1 / n, 0.0) / (n - 1)
+        return np.where(n >= min_count, var, np.nan)
+
+
+def _rolling_var_mean(
+    sums: _Sums, starts: np.ndarray, ends: np.ndarray, win: int, n: int
+) -> np.ndarray:
+    """
+    Mean over ``[s, e)`` of ``rolling(win, min_periods=5).var()`` restricted
+    to the window, for windows sharing the same ``win``.
+    """
+    # 창 안에서 온전한 내부 창(길이 win)은 시작점과 무관 → 전역 한 번
+    t = np.arange(n)
+    full = sums.var(np.maximum(t - win + 1, 0), t + 1, min_count=5)
+    full[: win - 1] = np.nan
+    full_sum = _prefix(np.nan_to_num(full))
+    full_cnt = _prefix(~np.isnan(full))
+    first = np.minimum(starts + win - 1, ends)
+    total = full_sum[ends] - full_sum[first]
+    count = full_cnt[ends] - full_cnt[first]
+    # 창 시작 직후의 잘린 내부 창 [s, s+k)
+    for k in range(5, win):
+        inside = starts + k <= ends
+        part = sums.var(starts, np.minimum(starts + k, ends), min_count=5)
+        part = np.where(inside, part, np.nan)
+        total += np.nan_to_num(part)
+        count += ~np.isnan(part)
+    with np.errstate(invalid="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _autocorr(
+    z: np.ndarray, valid: np.ndarray, starts: np.ndarray, ends: np.ndarray, lag: int
+) -> np.ndarray:
+    """Pearson correlation of ``(z[i], z[i-lag])`` for ``i`` in each window."""
+    z0 = np.where(valid, z, 0.0)
+    pair = np.zeros(len(z), dtype=bool)
+    pair[lag:] = valid[lag:] & valid[:-lag]
+    a = np.where(pair, z0, 0.0)
+    b = np.zeros_like(a)
+    b[lag:] = np.where(pair[lag:], z0[:-lag], 0.0)
+    lo = np.minimum(starts + lag, ends)
+    n, sa, sb, saa, sbb, sab = (
+        _range_sum(v, lo, ends) for v in (pair, a, b, a * a, b * b, a * b)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sab - sa * sb / n
+        var_a = saa - sa * sa / n
+        var_b = sbb - sb * sb / n
+        corr = cov / np.sqrt(var_a * var_b)
+    return np.where((n >= 2) & (var_a > 0) & (var_b > 0), corr, np.nan)
+
+
+def _shape(sums: _Sums, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """``|skew| + |kurt - 3|`` with pandas' bias-corrected estimators."""
+    n, s1, s2, s3, s4 = (sums.range(starts, ends, k) for k in range(5))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mu = s1 / n
+        m2 = s2 - n * mu**2
+        m3 = s3 - 3 * mu * s2 + 3 * mu**2 * s1 - n * mu**3
+        m4 = s4 - 4 * mu * s3 + 6 * mu**2 * s2 - 4 * mu**3 * s1 + n * mu**4
+        # 상수 창: 반올림 오차를 0으로 (pandas와 같이 skew/kurt = 0)
+        flat = m2 <= 1e-12 * np.maximum(n, 1)
+        skew = n * np.sqrt(n - 1) / (n - 2) * m3 / m2**1.5
+        kurt = (n + 1) * n * (n - 1) * m4 / ((n - 2) * (n - 3) * m2**2) - 3 * (
+            n - 1
+        ) ** 2 / ((n - 2) * (n - 3))
+    skew = np.where(flat, 0.0, skew)
+    kurt = np.where(flat, 0.0, kurt)
+    score = np.abs(skew) + np.abs(kurt - 3)
+    return np.where(n >= 4, score, np.nan)
+
+
+def _blocks(starts: np.ndarray, ends: np.ndarray):
+    """Yield ``(window indices, row index matrix)`` for equal-length windows."""
+    lengths = ends - starts
+    for length in np.unique(lengths):
+        if length == 0:
+            continue
+        group = np.flatnonzero(lengths == length)
+        rows = max(1, BLOCK_ELEMENTS // int(length))
+        for i in range(0, len(group), rows):
+            chunk = group[i : i + rows]
+            yield chunk, starts[chunk, None] + np.arange(length)
+
+
+def _half_split_psi(block: np.ndarray, bins: int, min_samples: int) -> np.ndarray:
+    """``population_stability_index(first half, second half)`` per row."""
+    g, length = block.shape
+    mid = length // 2
+    valid = ~np.isnan(block)
+    lo = np.where(valid, block, np.inf).min(axis=1)
+    hi = np.where(valid, block, -np.inf).max(axis=1)
+    with np.errstate(invalid="ignore"):
+        edges = np.linspace(lo - EPSILON, hi + EPSILON, bins + 1, axis=1)[:, 1:-1]
+    # searchsorted(edges, x, "right") == 경계 ≤ x 개수
+    codes = np.zeros(block.shape, dtype=np.int64)
+    for j in range(bins - 1):
+        codes += block >= edges[:, j : j + 1]
+    flat = codes + np.arange(g)[:, None] * bins
+    first = np.bincount(flat[:, :mid][valid[:, :mid]], minlength=g * bins)
+    second = np.bincount(flat[:, mid:][valid[:, mid:]], minlength=g * bins)
+    first, second = first.reshape(g, bins), second.reshape(g, bins)
+    psi = psi_from_counts(first, second)
+    n_first, n_second = first.sum(axis=1), second.sum(axis=1)
+    same = np.zeros(g, dtype=bool)
+    if length % 2 == 0:
+        # 두 절반이 완전히 같으면 0 (population_stability_index와 동일)
+        same = (n_first == mid) & (block[:, :mid] == block[:, mid:]).all(axis=1)
+    skip = (n_first < min_samples) | (n_second < min_samples) | (lo == hi) | same
+    return np.where(skip, 0.0, psi)
+
+
+def _outlier_ratio(block: np.ndarray) -> np.ndarray:
+    """Share of values outside the 1.5 IQR fences, per row (NaN ignored)."""
+    if np.isnan(block).any():
+        with warnings.catch_warnings():
+            # 전부 NaN인 창 → NaN 분위수 (비율도 NaN)
+            warnings.simplefilter("ignore", RuntimeWarning)
+            q1, q3 = np.nanquantile(block, [0.25, 0.75], axis=1)
+    else:
+        q1, q3 = np.quantile(block, [0.25, 0.75], axis=1)
+    iqr = (q3 - q1) + 1e-9
+    outside = (block < (q1 - 1.5 * iqr)[:, None]) | (block > (q3 + 1.5 * iqr)[:, None])
+    count = (~np.isnan(block)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, outside.sum(axis=1) / count, np.nan)
+
+
+def segment_metrics(
+    x: np.ndarray, starts: np.ndarray, ends: np.ndarray, dip: bool = False
+) -> pd.DataFrame:
+    """
+    ``compute_axes`` A/B metrics of ``x[s:e]`` for every ``(s, e)`` range.
+
+    Ranges may overlap (sliding windows) or partition the rows (groups
+    sorted contiguously); either way the data is scanned a bounded number
+    of times, not once per range.
+    """
+    n = len(x)
+    valid = ~np.isnan(x)
+    mean = float(x[valid].mean()) if valid.any() else 0.0
+    sd = float(x[valid].std()) if valid.any() else 0.0
+    sd = sd if sd > 0 else 1.0
+    # 전역 표준화: 거듭제곱 누적합의 상쇄 오차를 줄인다 (지표는 척도 불변)
+    z = (x - mean) / sd
+    sums = _Sums(z, valid)
+    lengths = ends - starts
+    count = len(starts)
+
+    st_var_ratio = np.full(count, np.nan)
+    seasonal_corr = np.full(count, np.nan)
+    win = np.minimum(24, np.maximum(5, lengths // 10))
+    lag = np.minimum(24, np.maximum(2, lengths // 12))
+    enough = lengths >= 30
+    window_var = sums.var(starts, ends)
+    for w in np.unique(win[enough]):
+        sel = enough & (win == w)
+        roll = _rolling_var_mean(sums, starts[sel], ends[sel], int(w), n)
+        # 원래 단위의 +1e-9 보정을 그대로 재현
+        st_var_ratio[sel] = roll * sd**2 / (window_var[sel] * sd**2 + 1e-9)
+    for k in np.unique(lag[enough]):
+        sel = enough & (lag == k)
+        seasonal_corr[sel] = _autocorr(z, valid, starts[sel], ends[sel], int(k))
+
+    psi_half = np.where(enough, 0.0, np.nan)
+    outlier = np.full(count, np.nan)
+    dip_stat = np.full(count, np.nan)
+    for chunk, index in _blocks(starts, ends):
+        block = x[index]
+        outlier[chunk] = _outlier_ratio(block)
+        if index.shape[1] >= 120:
+            psi_half[chunk] = _half_split_psi(block, bins=10, min_samples=50)
+        if dip:
+            result = dip_columns(block.T)
+            dip_stat[chunk] = np.where(result["n"] >= 40, result["dip"], np.nan)
+
+    frame = pd.DataFrame(
+        {
+            "st_var_ratio": st_var_ratio,
+            "seasonal_corr": seasonal_corr,
+            "psi_trigger_rate": psi_half,
+            "sk_k_score": _shape(sums, starts, ends),
+            "outlier_ratio": outlier,
+        }
+    )
+    if dip:
+        frame["dip_stat"] = dip_stat
+    return frame
+
+
+def axes_timeseries(
+    df: pd.DataFrame,
+    window: Window,
+    step: Optional[Window] = None,
+    time_col: Optional[str] = None,
+    target_col: Optional[str] = None,
+    dip: bool = False,
+    thresholds: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    A/B-axis metrics of the target series on every window.
+
+    Args:
+        df: Frame; like ``compute_axes`` the first column is the time and
+            the last the target unless given
+        window: Rows per window (int) or a time span (``"1D"``)
+        step: Offset between windows (default ``window``: tumbling)
+        time_col: Time column (rows are ordered by it)
+        target_col: Target column (text targets are category-coded)
+        dip: Also compute the exact dip statistic per window
+        thresholds: PSI thresholds for ``psi_level`` (default: config)
+
+    Returns:
+        pd.DataFrame: One row per window with ``start``/``end`` (time
+        values), ``rows``, the A/B metrics, ``psi_vs_previous`` and
+        ``psi_level``
+    """
+    time_col = time_col or df.columns[0]
+    target_col = target_col or df.columns[-1]
+    times = df[time_col]
+    if pd.api.types.is_object_dtype(times) or pd.api.types.is_string_dtype(times):
+        times = pd.to_datetime(times)
+    order = np.argsort(times.to_numpy(), kind="stable")
+    times = times.to_numpy()[order]
+
+    target = df[target_col]
+    if not pd.api.types.is_numeric_dtype(target):
+        target = pd.Series(pd.Categorical(target).codes, index=target.index)
+    x = target.to_numpy(dtype=np.float64, na_value=np.nan)[order]
+
+    is_time = not isinstance(window, (int, np.integer))
+    starts, ends = window_bounds(times if is_time else None, len(x), window, step)
+    metrics = segment_metrics(x, starts, ends, dip)
+
+    # 직전 창 대비 PSI (공유 분위수 구간, 한 번의 스캔)
+    previous = np.zeros(len(starts))
+    if len(starts) > 1:
+        pairs = [
+            ((int(a0), int(b0)), (int(a1), int(b1)))
+            for a0, b0, a1, b1 in zip(starts[:-1], ends[:-1], starts[1:], ends[1:])
+        ]
+        previous[1:] = batch_psi(x, pairs, bins=10, min_samples=50)[:, 0]
+    metrics["psi_vs_previous"] = previous
+
+    thresholds = thresholds or load_psi_thresholds()
+    metrics["psi_level"] = [psi_level(float(v), thresholds) for v in previous]
+    last = np.maximum(ends - 1, starts)
+    metrics.insert(0, "rows", ends - starts)
+    metrics.insert(0, "end", times[last])
+    metrics.insert(0, "start", times[starts])
+    return metrics
+
+
+def drift_points(series: pd.DataFrame, level: str = "moderate") -> List[Any]:
+    """Window starts whose ``psi_level`` is at least ``level``."""
+    rank = {"minor": 0, "moderate": 1, "major": 2}
+    hit = series["psi_level"].map(
+        lambda v: isinstance(v, str) and rank[v] >= rank[level]
+    )
+    return list(series.loc[hit, "start"])